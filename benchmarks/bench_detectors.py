@@ -0,0 +1,120 @@
+"""
+Detector benchmark on the synthetic ledger: runtime, peak memory and recall of the
+planted anomalies, per detector and ledger size.
+
+    python benchmarks/bench_detectors.py --sizes 10000,100000,1000000 --seed 7 --output bench_results.jsonl
+
+Each ledger goes through the same path as a real run: DataLoader.apply_columns with
+the engine's column spec, then FraudEngine.process (date parsing, interning and the
+chosen executor). Timings come from the report's performance metadata, so they are
+the engine's own measurements (instrumentation.measure), sub-timers included.
+
+Every run appends one JSON line per (size, detector) to --output, so results from
+successive commits can be compared to catch regressions or to plan capacity. Recall
+is measured against the capped top-N lists in the report. Keep the planted counts
+(5 by default) below those caps.
+"""
+import argparse
+import json
+import os
+import platform
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from ih_korupsi.core.engine import FraudEngine
+from ih_korupsi.core.instrumentation import measure
+from ih_korupsi.utils.data_loader import DataLoader
+from ih_korupsi.utils.synthetic import generate_ledger
+
+def recall(found, planted):
+    planted = list(planted)
+    if not planted:
+        return None
+    return sum(1 for item in planted if item in found) / len(planted)
+
+def score(name, findings, truth):
+    """Recall of each planted anomaly type that the detector is responsible for."""
+    if "error" in findings:
+        return {"error": findings["error"]}
+
+    if name == "The Mathematician":
+        return {
+            "rsf_recall": recall({e["entity"] for e in findings["rsf_test"]["high_risk_entities"]}, truth["rsf_vendors"]),
+            "benford_first_digit": findings["benford_test"]["conformity_status"]
+        }
+    if name == "The Connector":
+        # Planted cycles are the only vendor-to-vendor edges, so the counts measure recall directly.
+        planted = len(truth["cycles"])
+        static = findings["circular_trading"]
+        temporal = findings.get("temporal_circular_trading", {})
+        return {
+            "cycle_recall": min(static.get("cycles_count", 0), planted) / planted if planted else None,
+            "temporal_cycle_recall": min(temporal.get("cycles_count", 0), planted) / planted if planted else None
+        }
+    if name == "The Chronologist":
+        velocity = findings["velocity_anomalies"]
+        flagged = {e["vendor_id"] for w in velocity["windows"].values() for e in w["events"]}
+        offenders = {e["vendor_id"] for e in findings["fiscal_cliff"]["top_offenders"]}
+        return {
+            "velocity_recall": recall(flagged, truth["velocity_vendors"]),
+            "year_end_recall": recall(offenders, truth["dumping_vendors"])
+        }
+    if name == "String Detective":
+        pairs = {frozenset((e["name_1"], e["name_2"])) for e in findings["potential_ghost_vendors"]}
+        return {"duplicate_name_recall": recall(pairs, [frozenset(p) for p in truth["duplicate_name_pairs"]])}
+    return {}
+
+def main():
+    parser = argparse.ArgumentParser(description="Detector runtime / memory / recall benchmark")
+    parser.add_argument("--sizes", type=str, default="10000,100000", help="Comma-separated ledger sizes (rows)")
+    parser.add_argument("--seed", type=int, default=7)
+    parser.add_argument("--detectors", type=str, help="Comma-separated detectors to run, by key or name (e.g. mathematician,connector; default: all)")
+    parser.add_argument("--graph-backend", type=str, choices=['networkx', 'sparse'], default='sparse')
+    parser.add_argument("--executor", type=str, choices=FraudEngine.EXECUTORS, default='serial', help="How detectors are scheduled")
+    parser.add_argument("--workers", type=int, help="Maximum number of parallel workers")
+    parser.add_argument("--no-tracemalloc", action="store_true", help="Skip peak-memory tracing (it slows allocation-heavy code)")
+    parser.add_argument("--output", type=str, help="Append results as JSON Lines to this file")
+    args = parser.parse_args()
+
+    engine = FraudEngine(executor=args.executor, max_workers=args.workers,
+                         detector_options={"The Connector": {"backend": args.graph_backend}},
+                         trace_memory=not args.no_tracemalloc,
+                         detectors=args.detectors.split(',') if args.detectors else None)
+    environment = {"python": platform.python_version(), "machine": platform.machine(),
+                   "executor": args.executor, "timestamp": time.time()}
+
+    print(f"{'rows':>12} {'detector':<18} {'seconds':>9} {'rows/s':>12} {'peak MB':>9}  quality")
+    for size in (int(s) for s in args.sizes.split(',')):
+        with measure(size) as timer:
+            df, truth = generate_ledger(size, seed=args.seed)
+        print(f"{size:>12,} {'(generate)':<18} {timer.wall:>9.2f} {size / timer.wall:>12,.0f}")
+
+        with measure(size, engine.trace_memory) as timer:
+            df = DataLoader.apply_columns(df, engine.columns())
+        engine.record_stage("load", timer)
+
+        report = engine.process(df)
+        performance = report["metadata"]["performance"]
+        for name, stage in performance["stages"].items():
+            print(f"{size:>12,} {'(' + name + ')':<18} {stage['wall_seconds']:>9.2f}")
+
+        for detector in engine.detectors:
+            stats = performance["detectors"][detector.name]
+            quality = score(detector.name, report["findings"][detector.name], truth)
+            # The tracemalloc peak of the detector when traced, else the process RSS high-water mark.
+            peak = stats.get("traced_peak_mb", stats["rss_high_water_mb"])
+            peak_text = f"{peak:>9.1f}" if peak is not None else f"{'-':>9}"
+            rate = stats["rows_per_second"] or 0
+            print(f"{size:>12,} {detector.name:<18} {stats['wall_seconds']:>9.2f} {rate:>12,.0f} {peak_text}  {quality}")
+
+            if args.output:
+                record = {"rows": size, "seed": args.seed, "detector": detector.name, "version": detector.version,
+                          "seconds": stats["wall_seconds"], "rows_per_second": stats["rows_per_second"], "peak_mb": peak,
+                          "performance": stats, "stages": performance["stages"], "quality": quality, **environment}
+                with open(args.output, 'a') as f:
+                    f.write(json.dumps(record) + "\n")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,165 @@
+"""
+Load test of the relay against local stubs: a validator that answers /validate-batch
+after a fixed delay and a JSON-RPC node that answers eth_getBlockByNumber after a fixed
+delay. Both stubs and the relay run as separate uvicorn processes. Concurrent
+clients then post anchor requests, and the script reports latency percentiles. Every
+returned inclusion proof is checked against its batch root, so the batching and
+proof logic is exercised end to end without a chain.
+
+    python loadtest.py --clients 50 --requests 2000 --validator-delay 0.05 --rpc-delay 0.5
+
+A slow RPC (--rpc-delay) should not show up in p50/p99: the relay reads the block
+timestamp from its cache and fetches new headers in the background, off the event loop.
+Latency includes the batch window: with few clients a request waits up to --batch-wait
+seconds for its batch to fill.
+"""
+import argparse
+import asyncio
+import hashlib
+import json
+import os
+import secrets
+import subprocess
+import sys
+import time
+import httpx
+from fastapi import FastAPI, Request
+from merkle import leaf_hash, verify
+
+# --- STUBS ---
+stub_validator = FastAPI()
+stub_rpc = FastAPI()
+
+@stub_validator.post("/validate")
+async def validate(request: Request):
+    await asyncio.sleep(float(os.getenv("STUB_DELAY", "0")))
+    body = await request.json()
+    return {"status": "SUCCESS", "txHash": "0x" + hashlib.sha256(body["processingId"].encode()).hexdigest()}
+
+@stub_validator.post("/validate-batch")
+async def validate_batch(request: Request):
+    await asyncio.sleep(float(os.getenv("STUB_DELAY", "0")))
+    body = await request.json()
+    return {"status": "SUCCESS", "txHash": "0x" + hashlib.sha256(body["batchId"].encode()).hexdigest()}
+
+@stub_rpc.post("/")
+async def rpc(request: Request):
+    await asyncio.sleep(float(os.getenv("STUB_DELAY", "0")))
+    body = await request.json()
+    now = int(time.time())
+    # One block every 3 seconds, like Scroll.
+    block = {"number": hex(now // 3), "timestamp": hex(now - now % 3), "hash": "0x" + "00" * 32, "transactions": []}
+    return {"jsonrpc": "2.0", "id": body.get("id"), "result": block}
+
+# --- HARNESS ---
+def start(app: str, port: int, env: dict) -> subprocess.Popen:
+    return subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", app, "--port", str(port), "--log-level", "warning"],
+        cwd=os.path.dirname(os.path.abspath(__file__)),
+        env={**os.environ, **env},
+        stdout=subprocess.DEVNULL
+    )
+
+async def wait_ready(url: str, timeout: float = 20.0):
+    deadline = time.monotonic() + timeout
+    async with httpx.AsyncClient() as client:
+        while time.monotonic() < deadline:
+            try:
+                await client.get(url)
+                return
+            except httpx.TransportError:
+                await asyncio.sleep(0.1)
+    raise RuntimeError(f"{url} did not start within {timeout}s")
+
+async def run_clients(url: str, clients: int, total: int):
+    latencies, statuses, batches = [], {}, {}
+    remaining = iter(range(total))
+
+    async def client_loop(client: httpx.AsyncClient):
+        for _ in remaining:
+            payload = {"input_hash": "0x" + secrets.token_hex(32), "output_hash": "0x" + secrets.token_hex(32)}
+            start = time.perf_counter()
+            try:
+                response = await client.post(url, json=payload)
+                body = response.json()
+                status = response.status_code if body.get("status") == "SUCCESS" else "FAILED"
+                if status == 200:
+                    merkle = body["merkle"]
+                    root = bytes.fromhex(merkle["root"][2:])
+                    proof = [bytes.fromhex(sibling[2:]) for sibling in merkle["proof"]]
+                    if not verify(leaf_hash(payload["input_hash"], payload["output_hash"]), proof, root):
+                        status = "BAD_PROOF"
+                    batches[body["relay_processed_id"]] = merkle["leaf_count"]
+            except httpx.HTTPError as e:
+                status = type(e).__name__
+            latencies.append(time.perf_counter() - start)
+            statuses[status] = statuses.get(status, 0) + 1
+
+    limits = httpx.Limits(max_connections=clients)
+    async with httpx.AsyncClient(timeout=60, limits=limits) as client:
+        start = time.perf_counter()
+        await asyncio.gather(*(client_loop(client) for _ in range(clients)))
+        elapsed = time.perf_counter() - start
+    return latencies, statuses, batches, elapsed
+
+def percentile(values, q):
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(round(q * (len(ordered) - 1))))]
+
+def main():
+    parser = argparse.ArgumentParser(description="Relay load test against a stub validator and RPC node")
+    parser.add_argument("--clients", type=int, default=50, help="Concurrent clients")
+    parser.add_argument("--requests", type=int, default=1000, help="Total anchor requests")
+    parser.add_argument("--validator-delay", type=float, default=0.05, help="Seconds the stub validator takes per request")
+    parser.add_argument("--rpc-delay", type=float, default=0.5, help="Seconds the stub RPC node takes per call")
+    parser.add_argument("--block-ttl", type=float, default=5.0, help="BLOCK_TTL of the relay")
+    parser.add_argument("--batch-size", type=int, default=64, help="BATCH_MAX_SIZE of the relay")
+    parser.add_argument("--batch-wait", type=float, default=0.5, help="BATCH_MAX_WAIT of the relay")
+    parser.add_argument("--port", type=int, default=38100, help="First of three local ports (validator, RPC, relay)")
+    parser.add_argument("--output", type=str, help="Append the result as a JSON line to this file")
+    args = parser.parse_args()
+
+    validator_port, rpc_port, relay_port = args.port, args.port + 1, args.port + 2
+    processes = [
+        start("loadtest:stub_validator", validator_port, {"STUB_DELAY": str(args.validator_delay)}),
+        start("loadtest:stub_rpc", rpc_port, {"STUB_DELAY": str(args.rpc_delay)}),
+        start("relay:app", relay_port, {
+            "VALIDATOR_URL": f"http://127.0.0.1:{validator_port}",
+            "RPC_URL": f"http://127.0.0.1:{rpc_port}",
+            "RELAY_RATE_LIMIT": "1000000/minute",
+            "BLOCK_TTL": str(args.block_ttl),
+            "BATCH_MAX_SIZE": str(args.batch_size),
+            "BATCH_MAX_WAIT": str(args.batch_wait)
+        })
+    ]
+    try:
+        for port in (validator_port, rpc_port, relay_port):
+            asyncio.run(wait_ready(f"http://127.0.0.1:{port}/docs"))
+        latencies, statuses, batches, elapsed = asyncio.run(run_clients(f"http://127.0.0.1:{relay_port}/relay/anchor", args.clients, args.requests))
+    finally:
+        for process in processes:
+            process.terminate()
+        for process in processes:
+            process.wait()
+
+    result = {
+        "clients": args.clients,
+        "requests": len(latencies),
+        "validator_delay": args.validator_delay,
+        "rpc_delay": args.rpc_delay,
+        "batch_size": args.batch_size,
+        "batch_wait": args.batch_wait,
+        "batches_anchored": len(batches),
+        "p50_ms": round(percentile(latencies, 0.50) * 1000, 1),
+        "p99_ms": round(percentile(latencies, 0.99) * 1000, 1),
+        "max_ms": round(max(latencies) * 1000, 1),
+        "requests_per_second": round(len(latencies) / elapsed, 1),
+        "statuses": {str(k): v for k, v in statuses.items()}
+    }
+    print(json.dumps(result, indent=2))
+    if args.output:
+        with open(args.output, 'a') as f:
+            f.write(json.dumps({**result, "timestamp": time.time()}) + "\n")
+
+if __name__ == "__main__":
+    main()
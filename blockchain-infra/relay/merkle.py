@@ -0,0 +1,59 @@
+"""
+Merkle tree over (input_hash, output_hash) pairs, so one anchored root covers a whole
+batch of audits.
+
+    leaf = sha256(0x00 || input_hash || output_hash)
+    node = sha256(0x01 || min(a, b) || max(a, b))
+
+Prefixes 0x00/0x01 keep a leaf from being passed off as an inner node. Pairs are
+sorted before hashing, so a proof is just the list of sibling hashes, with no
+left/right flags. A node without a sibling moves up to the next level unchanged.
+The same rules are implemented by IHKorupsiEvidenceAnchor.verifyBatchInclusion and
+ih_korupsi.utils.merkle.
+"""
+import hashlib
+from typing import List, Tuple
+
+def _bytes32(value: str) -> bytes:
+    raw = bytes.fromhex(value[2:] if value.startswith("0x") else value)
+    if len(raw) != 32:
+        raise ValueError(f"Expected a 32-byte hex hash, got {value!r}")
+    return raw
+
+def leaf_hash(input_hash: str, output_hash: str) -> bytes:
+    return hashlib.sha256(b"\x00" + _bytes32(input_hash) + _bytes32(output_hash)).digest()
+
+def node_hash(a: bytes, b: bytes) -> bytes:
+    return hashlib.sha256(b"\x01" + min(a, b) + max(a, b)).digest()
+
+def build_tree(leaves: List[bytes]) -> Tuple[bytes, List[List[bytes]]]:
+    """Returns the root and, for every leaf, its inclusion proof (sibling hashes, bottom-up)."""
+    if not leaves:
+        raise ValueError("Cannot build a Merkle tree without leaves")
+    proofs = [[] for _ in leaves]
+    # Leaf indices under each node of the current level.
+    level, members = list(leaves), [[i] for i in range(len(leaves))]
+    while len(level) > 1:
+        next_level, next_members = [], []
+        for i in range(0, len(level) - 1, 2):
+            left, right = level[i], level[i + 1]
+            for leaf in members[i]:
+                proofs[leaf].append(right)
+            for leaf in members[i + 1]:
+                proofs[leaf].append(left)
+            next_level.append(node_hash(left, right))
+            next_members.append(members[i] + members[i + 1])
+        if len(level) % 2:
+            next_level.append(level[-1])
+            next_members.append(members[-1])
+        level, members = next_level, next_members
+    return level[0], proofs
+
+def verify(leaf: bytes, proof: List[bytes], root: bytes) -> bool:
+    node = leaf
+    for sibling in proof:
+        node = node_hash(node, sibling)
+    return node == root
+
+def to_hex(value: bytes) -> str:
+    return "0x" + value.hex()
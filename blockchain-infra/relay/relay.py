@@ -1,20 +1,206 @@
 import os
+import time
+import asyncio
 import hashlib
 import random
-import requests
+from collections import OrderedDict
+from contextlib import asynccontextmanager
+from typing import List, Optional
+import httpx
 from fastapi import FastAPI, HTTPException, Request
 from pydantic import BaseModel
 from slowapi import Limiter, _rate_limit_exceeded_handler
 from slowapi.util import get_remote_address
 from slowapi.errors import RateLimitExceeded
 from web3 import Web3
+from merkle import build_tree, leaf_hash, to_hex
 
 # --- KONFIGURASI ---
-VALIDATOR_URL = "http://localhost:20371"
-RPC_URL = "https://sepolia-rpc.scroll.io"
+VALIDATOR_URL = os.getenv("VALIDATOR_URL", "http://localhost:20371")
+RPC_URL = os.getenv("RPC_URL", "https://sepolia-rpc.scroll.io")
+RATE_LIMIT = os.getenv("RELAY_RATE_LIMIT", "5/minute")
+
+# Umur maksimum header block yang di-cache (detik). Background task me-refresh
+# setiap BLOCK_TTL / 2, jadi request biasanya tidak pernah menunggu RPC.
+BLOCK_TTL = float(os.getenv("BLOCK_TTL", "5"))
+RPC_TIMEOUT = float(os.getenv("RPC_TIMEOUT", "5"))
+
+# Pool koneksi ke Validator (keep-alive, dipakai ulang antar request)
+VALIDATOR_TIMEOUT = float(os.getenv("VALIDATOR_TIMEOUT", "10"))
+VALIDATOR_MAX_CONNECTIONS = int(os.getenv("VALIDATOR_MAX_CONNECTIONS", "100"))
+
+# Batch Merkle: pasangan hash dikumpulkan sampai BATCH_MAX_SIZE item atau
+# BATCH_MAX_WAIT detik sejak item pertama, lalu hanya root-nya yang di-anchor.
+BATCH_MAX_SIZE = int(os.getenv("BATCH_MAX_SIZE", "64"))
+BATCH_MAX_WAIT = float(os.getenv("BATCH_MAX_WAIT", "5"))
+
+# Jumlah Idempotency-Key terakhir yang diingat. Kiriman ulang dengan key yang sama
+# (retry dari client) mendapat receipt yang sama, bukan leaf baru.
+IDEMPOTENCY_CACHE_SIZE = int(os.getenv("IDEMPOTENCY_CACHE_SIZE", "10000"))
+
+# Jumlah item maksimum per request ke /relay/anchor-batch. Satu request batch
+# dihitung sekali oleh rate limit, berapa pun isinya.
+BATCH_REQUEST_MAX_ITEMS = int(os.getenv("BATCH_REQUEST_MAX_ITEMS", "256"))
 
 # Setup Web3
-w3 = Web3(Web3.HTTPProvider(RPC_URL))
+w3 = Web3(Web3.HTTPProvider(RPC_URL, request_kwargs={"timeout": RPC_TIMEOUT}))
+
+# --- CACHE WAKTU BLOCKCHAIN ---
+class BlockClock:
+    """
+    Header block terakhir (number, timestamp) yang di-cache selama `ttl` detik.
+    Web3.HTTPProvider bersifat blocking, jadi RPC selalu dijalankan di thread
+    (asyncio.to_thread) agar event loop tidak pernah tertahan oleh RPC yang lambat.
+    """
+    def __init__(self, w3: Web3, ttl: float):
+        self.w3 = w3
+        self.ttl = ttl
+        self.number = None
+        self.timestamp = None
+        self.fetched_at = float("-inf")
+        self._lock = asyncio.Lock()
+
+    @property
+    def fresh(self) -> bool:
+        return time.monotonic() - self.fetched_at < self.ttl
+
+    async def refresh(self):
+        block = await asyncio.wait_for(asyncio.to_thread(self.w3.eth.get_block, 'latest'), RPC_TIMEOUT)
+        self.number, self.timestamp = block.number, block.timestamp
+        self.fetched_at = time.monotonic()
+
+    async def latest(self):
+        """
+        Returns (block_number, block_timestamp). Kalau cache sudah basi (background task
+        gagal), satu request mencoba refresh; request lain yang datang bersamaan
+        menunggu hasil yang sama, bukan mengirim RPC sendiri-sendiri.
+        """
+        if not self.fresh:
+            async with self._lock:
+                if not self.fresh:
+                    await self.refresh()
+        return self.number, self.timestamp
+
+    async def run(self):
+        """Background task: refresh cache sebelum TTL habis."""
+        while True:
+            try:
+                await self.refresh()
+            except Exception as e:
+                print(f"[Relay] Block refresh failed: {e!r}")
+            await asyncio.sleep(self.ttl / 2)
+
+block_clock = BlockClock(w3, BLOCK_TTL)
+
+# --- BATCH MERKLE ---
+class ValidatorError(Exception):
+    pass
+
+class MerkleBatcher:
+    """
+    Mengumpulkan (input_hash, output_hash) dari banyak request dan meng-anchor satu
+    Merkle root per batch. `anchor(root_hex, leaf_count)` adalah coroutine yang
+    mengembalikan (batch_id, validator_response); di load test ia bicara ke stub
+    validator, jadi logika batch dan proof bisa diuji tanpa chain.
+    """
+    def __init__(self, anchor, max_size: int, max_wait: float):
+        self.anchor = anchor
+        self.max_size = max(1, max_size)
+        self.max_wait = max_wait
+        self.pending = []  # [(leaf, future)]
+        self._timer = None
+        self._tasks = set()
+
+    async def submit(self, input_hash: str, output_hash: str) -> dict:
+        """Menunggu sampai batch yang memuat pasangan ini ter-anchor, lalu mengembalikan receipt-nya."""
+        leaf = leaf_hash(input_hash, output_hash)
+        future = asyncio.get_running_loop().create_future()
+        self.pending.append((leaf, future))
+        if len(self.pending) >= self.max_size:
+            self.flush()
+        elif self._timer is None:
+            self._timer = asyncio.get_running_loop().call_later(self.max_wait, self.flush)
+        return await future
+
+    def flush(self):
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        batch, self.pending = self.pending, []
+        if batch:
+            task = asyncio.create_task(self._anchor(batch))
+            self._tasks.add(task)
+            task.add_done_callback(self._tasks.discard)
+
+    async def _anchor(self, batch):
+        leaves = [leaf for leaf, _ in batch]
+        root, proofs = build_tree(leaves)
+        try:
+            batch_id, validator_response = await self.anchor(to_hex(root), len(leaves))
+        except Exception as e:
+            for _, future in batch:
+                if not future.done():
+                    future.set_exception(e)
+            return
+
+        print(f"[Relay] Batch {batch_id}: {len(leaves)} leaves, root {to_hex(root)}")
+        for index, (leaf, future) in enumerate(batch):
+            # Client yang sudah putus (future dibatalkan) dilewati saja
+            if not future.done():
+                future.set_result({
+                    "batch_id": batch_id,
+                    "validator_response": validator_response,
+                    "merkle": {
+                        "root": to_hex(root),
+                        "leaf": to_hex(leaf),
+                        "leaf_index": index,
+                        "leaf_count": len(leaves),
+                        "proof": [to_hex(sibling) for sibling in proofs[index]]
+                    }
+                })
+
+    async def close(self):
+        """Anchor sisa antrean sebelum shutdown."""
+        self.flush()
+        if self._tasks:
+            await asyncio.gather(*self._tasks, return_exceptions=True)
+
+class IdempotencyCache:
+    """Receipt (atau anchor yang sedang berjalan) per Idempotency-Key, LRU. Kegagalan tidak diingat."""
+    def __init__(self, size: int):
+        self.size = size
+        self.entries = OrderedDict()
+
+    async def run(self, key, factory):
+        if not key or self.size <= 0:
+            return await factory()
+        task = self.entries.get(key)
+        if task is None or (task.done() and (task.cancelled() or task.exception() is not None)):
+            task = asyncio.ensure_future(factory())
+            self.entries[key] = task
+            while len(self.entries) > self.size:
+                self.entries.popitem(last=False)
+        else:
+            self.entries.move_to_end(key)
+        # shield: client yang putus tidak membatalkan anchor milik request lain dengan key sama
+        return await asyncio.shield(task)
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    app.state.validator = httpx.AsyncClient(
+        base_url=VALIDATOR_URL,
+        timeout=VALIDATOR_TIMEOUT,
+        limits=httpx.Limits(max_connections=VALIDATOR_MAX_CONNECTIONS, max_keepalive_connections=VALIDATOR_MAX_CONNECTIONS)
+    )
+    app.state.idempotency = IdempotencyCache(IDEMPOTENCY_CACHE_SIZE)
+    app.state.batcher = MerkleBatcher(lambda root, count: anchor_root(app.state.validator, root, count), BATCH_MAX_SIZE, BATCH_MAX_WAIT)
+    refresher = asyncio.create_task(block_clock.run())
+    try:
+        yield
+    finally:
+        refresher.cancel()
+        await app.state.batcher.close()
+        await app.state.validator.aclose()
 
 # Limiter (Cloudflare Support)
 def get_real_user_ip(request: Request):
@@ -23,7 +209,7 @@ def get_real_user_ip(request: Request):
     return get_remote_address(request)
 
 limiter = Limiter(key_func=get_real_user_ip)
-app = FastAPI()
+app = FastAPI(lifespan=lifespan)
 app.state.limiter = limiter
 app.add_exception_handler(RateLimitExceeded, _rate_limit_exceeded_handler)
 
@@ -31,59 +217,101 @@ class ClientRequest(BaseModel):
     input_hash: str
     output_hash: str
 
+class BatchItem(ClientRequest):
+    # Pengganti header Idempotency-Key, per item
+    idempotency_key: Optional[str] = None
+
+class BatchRequest(BaseModel):
+    items: List[BatchItem]
+
 # --- FUNGSI BARU: GENERATE ID DARI BLOCKCHAIN TIME ---
-def generate_blockchain_based_id(source: str, result: str):
+async def generate_blockchain_based_id(source: str, result: str):
     try:
-        # 1. Ambil Timestamp dari Block Terakhir (Real-time Blockchain)
-        latest_block = w3.eth.get_block('latest')
-        block_timestamp = latest_block.timestamp
-        block_number = latest_block.number
-        
+        # 1. Ambil Timestamp dari Block Terakhir (cache, maksimal BLOCK_TTL detik)
+        block_number, block_timestamp = await block_clock.latest()
+
         print(f"[Relay] Using Block #{block_number} Time: {block_timestamp}")
     except Exception as e:
-        print(f"[Relay] RPC Error: {e}, fallback to local time")
+        print(f"[Relay] RPC Error: {e!r}, fallback to local time")
         block_timestamp = int(os.times().elapsed) # Fallback darurat
 
-    # 2. Tambahkan Salt (Angka Acak) 
+    # 2. Tambahkan Salt (Angka Acak)
     # Agar jika ada 2 request di blok yang sama, ID tetap beda
     salt = random.randint(1000, 9999)
 
     # 3. Racik ID
     # Format: Source + Result + BlockTime + Salt
     raw_str = f"{source}{result}{block_timestamp}{salt}"
-    
+
     # 4. Hash jadi bytes32 hex
     return "0x" + hashlib.sha256(raw_str.encode()).hexdigest()
 
-# --- ENDPOINTS ---
-@app.post("/relay/anchor")
-@limiter.limit("5/minute")
-async def anchor_evidence(request: Request, data: ClientRequest):
-    
+async def anchor_root(validator: httpx.AsyncClient, root: str, leaf_count: int):
     # Generate ID pakai Waktu Blockchain
-    proc_id = generate_blockchain_based_id(data.input_hash, data.output_hash)
-    
+    batch_id = await generate_blockchain_based_id(root, str(leaf_count))
+
     payload = {
-        "processingId": proc_id,
-        "sourceHash": data.input_hash,
-        "resultHash": data.output_hash
+        "batchId": batch_id,
+        "merkleRoot": root,
+        "leafCount": leaf_count
     }
 
-    print(f"[Relay] ID Generated: {proc_id}")
+    # Kirim ke Validator lewat connection pool (async, tidak memblokir event loop)
+    response = await validator.post("/validate-batch", json=payload)
+    if response.status_code != 200:
+        raise ValidatorError(response.text)
+    return batch_id, response.json()
 
+# --- ENDPOINTS ---
+async def anchor_one(app: FastAPI, key: Optional[str], input_hash: str, output_hash: str) -> dict:
+    """
+    Satu pasangan hash masuk antrean batch; selesai setelah Merkle root batch-nya
+    ter-anchor. ValueError (hash tidak valid) diteruskan ke pemanggil.
+    """
+    # Key hanya berlaku untuk pasangan hash yang sama
+    if key:
+        key = (key, input_hash, output_hash)
     try:
-        # Kirim ke Validator (yang mungkin ada di localhost port 3000)
-        response = requests.post(f"{VALIDATOR_URL}/validate", json=payload, timeout=10)
-        
-        if response.status_code == 200:
-            return {
-                "status": "SUCCESS",
-                "relay_processed_id": proc_id,
-                "timestamp_source": "Blockchain Block Time", # Info ke user
-                "validator_response": response.json()
-            }
-        else:
-            return {"status": "FAILED", "validator_error": response.text}
+        receipt = await app.state.idempotency.run(key, lambda: app.state.batcher.submit(input_hash, output_hash))
+    except ValidatorError as e:
+        return {"status": "FAILED", "validator_error": str(e)}
 
+    return {
+        "status": "SUCCESS",
+        "relay_processed_id": receipt["batch_id"],
+        "timestamp_source": "Blockchain Block Time", # Info ke user
+        "validator_response": receipt["validator_response"],
+        "merkle": receipt["merkle"]
+    }
+
+@app.post("/relay/anchor")
+@limiter.limit(RATE_LIMIT)
+async def anchor_evidence(request: Request, data: ClientRequest):
+    try:
+        return await anchor_one(request.app, request.headers.get("Idempotency-Key"), data.input_hash, data.output_hash)
+    except ValueError as e:
+        raise HTTPException(status_code=422, detail=str(e))
     except Exception as e:
-        raise HTTPException(status_code=500, detail=str(e))
\ No newline at end of file
+        raise HTTPException(status_code=500, detail=str(e))
+
+@app.post("/relay/anchor-batch")
+@limiter.limit(RATE_LIMIT)
+async def anchor_evidence_batch(request: Request, data: BatchRequest):
+    """
+    Banyak pasangan hash dalam satu request (satu jatah rate limit). Semua item masuk
+    antrean batch bersamaan, jadi biasanya ter-anchor di Merkle batch yang sama.
+    Hasil per item sesuai urutan; item yang ditolak berstatus REJECTED dan tidak
+    perlu dikirim ulang, item ERROR boleh dicoba lagi.
+    """
+    if len(data.items) > BATCH_REQUEST_MAX_ITEMS:
+        raise HTTPException(status_code=413, detail=f"At most {BATCH_REQUEST_MAX_ITEMS} items per request")
+
+    async def one(item: BatchItem) -> dict:
+        try:
+            return await anchor_one(request.app, item.idempotency_key, item.input_hash, item.output_hash)
+        except ValueError as e:
+            return {"status": "REJECTED", "error": str(e)}
+        except Exception as e:
+            return {"status": "ERROR", "error": str(e)}
+
+    return {"results": await asyncio.gather(*(one(item) for item in data.items))}
@@ -30,10 +30,18 @@ contract IHKorupsiEvidenceAnchor is Initializable, AccessControlUpgradeable {
         bool transformed;     // True jika Input != Output
     }
 
+    struct Batch {
+        bytes32 merkleRoot;   // Root dari leaf sha256(0x00 || sourceHash || resultHash)
+        uint256 leafCount;    // Jumlah pasangan hash dalam batch
+        address validator;
+        uint256 timestamp;
+    }
+
     // =========================
     // STORAGE
     // =========================
     mapping(bytes32 => Evidence) public evidenceRecords;
+    mapping(bytes32 => Batch) public batchRecords; // batchId => Batch
 
     // =========================
     // EVENTS
@@ -46,6 +54,14 @@ contract IHKorupsiEvidenceAnchor is Initializable, AccessControlUpgradeable {
         uint256 timestamp
     );
 
+    event BatchAnchored(
+        bytes32 indexed batchId,
+        bytes32 indexed merkleRoot,
+        address indexed validator,
+        uint256 leafCount,
+        uint256 timestamp
+    );
+
     // =========================
     // INITIALIZER (REPLACES CONSTRUCTOR)
     // =========================
@@ -112,6 +128,29 @@ contract IHKorupsiEvidenceAnchor is Initializable, AccessControlUpgradeable {
         );
     }
 
+    // Satu transaksi untuk banyak audit: hanya Merkle root yang disimpan,
+    // tiap client memegang inclusion proof-nya sendiri.
+    function anchorBatch(
+        bytes32 batchId,
+        bytes32 merkleRoot,
+        uint256 leafCount
+    ) external onlyRole(ANCHOR_ROLE) {
+
+        require(batchId != bytes32(0), "Batch ID empty");
+        require(merkleRoot != bytes32(0), "Merkle root empty");
+        require(leafCount > 0, "Batch empty");
+        require(batchRecords[batchId].timestamp == 0, "Batch exists");
+
+        batchRecords[batchId] = Batch({
+            merkleRoot: merkleRoot,
+            leafCount: leafCount,
+            validator: msg.sender,
+            timestamp: block.timestamp
+        });
+
+        emit BatchAnchored(batchId, merkleRoot, msg.sender, leafCount, block.timestamp);
+    }
+
     // =========================
     // VERIFICATION
     // =========================
@@ -132,9 +171,31 @@ contract IHKorupsiEvidenceAnchor is Initializable, AccessControlUpgradeable {
         );
     }
 
+    // Leaf dan node memakai prefix berbeda (0x00 / 0x01) dan pasangan node diurutkan
+    // sebelum di-hash, jadi proof cukup berisi hash sibling dari bawah ke atas.
+    function verifyBatchInclusion(
+        bytes32 batchId,
+        bytes32 sourceHash,
+        bytes32 resultHash,
+        bytes32[] calldata proof
+    ) external view returns (bool) {
+
+        Batch storage batch = batchRecords[batchId];
+        if (batch.timestamp == 0) return false;
+
+        bytes32 node = sha256(abi.encodePacked(bytes1(0x00), sourceHash, resultHash));
+        for (uint256 i = 0; i < proof.length; i++) {
+            node = node < proof[i]
+                ? sha256(abi.encodePacked(bytes1(0x01), node, proof[i]))
+                : sha256(abi.encodePacked(bytes1(0x01), proof[i], node));
+        }
+        return node == batch.merkleRoot;
+    }
+
     // =========================
     // STORAGE GAP (UPGRADE SAFE)
     // =========================
     // Slot cadangan agar upgrade di masa depan tidak merusak storage layout
-    uint256[50] private __gap;
+    // (dikurangi 1 untuk batchRecords)
+    uint256[49] private __gap;
 }
\ No newline at end of file
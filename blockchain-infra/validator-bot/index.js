@@ -41,6 +41,18 @@ db.exec(`
     )
 `);
 
+db.exec(`
+    CREATE TABLE IF NOT EXISTS batch_logs (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        batch_id TEXT NOT NULL UNIQUE,
+        merkle_root TEXT NOT NULL,
+        leaf_count INTEGER NOT NULL,
+        tx_hash TEXT,
+        status TEXT DEFAULT 'PENDING',
+        timestamp DATETIME DEFAULT CURRENT_TIMESTAMP
+    )
+`);
+
 // --- VARIABEL GLOBAL ---
 const PORT = process.env.PORT || 20371;
 const BIND = process.env.BIND;
@@ -67,7 +79,8 @@ async function startServer() {
         
         // ABI (Hanya fungsi yang dibutuhkan)
         const abi = [
-            "function anchorEvidence(bytes32 processingId, bytes32 sourceHash, bytes32 resultHash) external"
+            "function anchorEvidence(bytes32 processingId, bytes32 sourceHash, bytes32 resultHash) external",
+            "function anchorBatch(bytes32 batchId, bytes32 merkleRoot, uint256 leafCount) external"
         ];
         contract = new ethers.Contract(process.env.PROXY_ADDRESS, abi, wallet);
         
@@ -132,4 +145,40 @@ app.post('/validate', async (req, res) => {
     }
 });
 
+// Batch dari Relay: satu transaksi untuk Merkle root dari banyak pasangan hash
+app.post('/validate-batch', async (req, res) => {
+    const { batchId, merkleRoot, leafCount } = req.body;
+
+    try {
+        const insert = db.prepare(`
+            INSERT OR IGNORE INTO batch_logs (batch_id, merkle_root, leaf_count, status) 
+            VALUES (?, ?, ?, ?)
+        `);
+        insert.run(batchId, merkleRoot, leafCount, 'PENDING');
+
+        if (!isBlockchainReady) throw new Error("Blockchain not ready");
+
+        console.log(`[Validator] Sending Batch Tx: ${batchId} (${leafCount} leaves)`);
+
+        const tx = await contract.anchorBatch(batchId, merkleRoot, leafCount);
+
+        const update = db.prepare(`
+            UPDATE batch_logs SET status = 'SENT', tx_hash = ? WHERE batch_id = ?
+        `);
+        update.run(tx.hash, batchId);
+
+        res.json({ status: "SUCCESS", txHash: tx.hash });
+
+    } catch (error) {
+        console.error("[Validator] Batch Error:", error.message);
+
+        const updateFail = db.prepare(`
+            UPDATE batch_logs SET status = 'FAILED' WHERE batch_id = ?
+        `);
+        updateFail.run(batchId);
+
+        res.status(500).json({ status: "ERROR", message: error.message });
+    }
+});
+
 startServer();
\ No newline at end of file
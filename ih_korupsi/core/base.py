@@ -1,12 +1,24 @@
 from abc import ABC, abstractmethod
-from typing import Dict, Any
+from typing import Dict, Any, Optional, TYPE_CHECKING
 import pandas as pd
 
+if TYPE_CHECKING:
+    from ..utils.sql_source import SQLiteSource
+
+# Preferred dtypes a detector can declare for its input columns (see BaseDetector.columns).
+FLOAT = 'float64'
+CATEGORY = 'category'
+DATETIME = 'datetime'
+
 class BaseDetector(ABC):
     """
     Base class for all forensic detectors in IH-Korupsi.
     Each detector must provide a deterministic mathematical explanation for its findings.
     """
+
+    # Part of the result-cache key: bump it whenever a detector's findings change for
+    # the same input and parameters, so stale cached results are not reused.
+    version: str = "1"
     
     @property
     @abstractmethod
@@ -28,9 +40,73 @@ class BaseDetector(ABC):
         """
         pass
 
+    def columns(self, **kwargs) -> Optional[Dict[str, Optional[str]]]:
+        """
+        The input columns run() reads with the given options (the same keyword arguments),
+        each mapped to its preferred dtype: FLOAT, CATEGORY (string ids), DATETIME or None
+        for no preference. The engine loads only the union of these columns. The default,
+        None, means the detector may read any column, so the whole input is loaded.
+        """
+        return None
+
+    def accumulator(self, **kwargs) -> "DetectorAccumulator":
+        """
+        Returns an empty mergeable partial state for chunked (out-of-core) processing.
+        Accepts the same keyword arguments as run(). Detectors that need the full
+        DataFrame at once do not override this.
+        """
+        raise NotImplementedError(f"{self.name} does not support chunked processing.")
+
     def explain(self, finding_id: str) -> str:
         """
         Provides a mathematical explanation for a specific finding.
         Can be overridden for complex logic.
         """
         return f"Finding {finding_id} was flagged based on the {self.name} algorithm rules."
+
+
+class DetectorAccumulator(ABC):
+    """
+    Partial state of one detector over a subset of the rows.
+    update() folds in a chunk, merge() combines two partial states (e.g. from separate
+    chunks or partitions), and finalize() turns the state into the same result
+    dictionary that BaseDetector.run() would produce on the full data.
+    """
+
+    @abstractmethod
+    def update(self, chunk: pd.DataFrame) -> None:
+        pass
+
+    @abstractmethod
+    def merge(self, other: "DetectorAccumulator") -> None:
+        pass
+
+    @property
+    def needs_second_pass(self) -> bool:
+        """
+        True when some statistics depend on first-pass results (e.g. counting values
+        beyond quantiles sketched in pass one). The engine then re-reads the input and
+        feeds every chunk to update_second_pass() before finalize().
+        """
+        return False
+
+    def update_second_pass(self, chunk: pd.DataFrame) -> None:
+        pass
+
+    def update_from_sql(self, source: "SQLiteSource", chunksize: int) -> None:
+        """
+        Fills the state from a SQLite table (see utils.sql_source). By default every
+        column is streamed in chunks through update(), plus update_second_pass() if
+        needed. Accumulators override this to compute their aggregates with GROUP BY
+        queries inside the database and to stream only the columns that row-level
+        statistics still need.
+        """
+        for chunk in source.iter_chunks(chunksize):
+            self.update(chunk)
+        if self.needs_second_pass:
+            for chunk in source.iter_chunks(chunksize):
+                self.update_second_pass(chunk)
+
+    @abstractmethod
+    def finalize(self) -> Dict[str, Any]:
+        pass
@@ -0,0 +1,195 @@
+import glob
+import hashlib
+import json
+import os
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from typing import Any, Dict, List, Optional, Tuple
+from .cache import ResultCache
+from .engine import FraudEngine
+from ..utils.data_loader import DataLoader
+from ..utils.hashing import hash_files
+from ..utils.report_generator import ReportGenerator
+from ..utils.sql_source import SQLiteSource
+
+FILE_TYPES = {'.csv': 'csv', '.json': 'json', '.jsonl': 'json', '.db': 'sql', '.sqlite': 'sql', '.sqlite3': 'sql'}
+
+def audit_file(task: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Runs FraudEngine on one input file and writes its report (and HTML, if asked).
+    Top-level so it can run in a worker process; returns the file's index entry.
+    """
+    started = time.perf_counter()
+    entry = {"input": task["input"], "input_hash": task["input_hash"], "report": task["report"]}
+    try:
+        cache = ResultCache(task["cache_dir"], task["cache_bytes"]) if task["cache_dir"] else None
+        engine = FraudEngine(detector_options=task["detector_options"], cache=cache, detectors=task["detectors"], skip=task["skip"])
+        if task["type"] == 'sql':
+            with SQLiteSource(task["input"], task["table"]) as source:
+                # The cache key also covers the table, like main.py's --type sql.
+                report = engine.process_sql(source, task["chunksize"] or 100_000, input_hash=source.fingerprint() if cache else None)
+        elif task["chunksize"]:
+            report = engine.process_stream(lambda: DataLoader.iter_chunks(task["input"], task["type"], task["chunksize"], engine.columns()),
+                                           input_hash=task["input_hash"])
+        else:
+            report = engine.process(DataLoader.load(task["input"], task["type"], engine.columns()), input_hash=task["input_hash"])
+
+        entry["report_sha256"] = engine.save_report(report, task["report"])
+        if task["html"]:
+            with open(task["html"], 'w', encoding='utf-8') as f:
+                ReportGenerator.write_html(report, f)
+            entry["html"] = task["html"]
+        entry.update({
+            "status": "ok",
+            "total_rows": report["metadata"].get("total_rows"),
+            "detector_errors": sorted(name for name, result in report["findings"].items() if isinstance(result, dict) and "error" in result)
+        })
+    except Exception as e:
+        entry.update({"status": "error", "error": f"{type(e).__name__}: {e}"})
+    entry["seconds"] = round(time.perf_counter() - started, 3)
+    return entry
+
+class BatchAuditor:
+    """
+    Audits many input files with one process pool: each worker pays the pandas/networkx/
+    SciPy import once and then takes file after file. At most `jobs` files are analysed
+    (and held in memory) at a time.
+
+    Reports go to output_dir, one per input, next to an index.json that lists every file
+    with its input hash, report hash, status and timing. A file whose input hash and
+    analysis options match its entry in the previous index is skipped; its entry is
+    carried over.
+    """
+    INDEX = 'index.json'
+
+    def __init__(self, output_dir: str, jobs: Optional[int] = None, file_type: Optional[str] = None,
+                 detector_options: Optional[Dict[str, Dict[str, Any]]] = None, chunksize: Optional[int] = None,
+                 table: str = 'transactions', html: bool = False, cache_dir: Optional[str] = None,
+                 cache_bytes: int = 512 * 1024 * 1024, force: bool = False,
+                 detectors: Optional[List[str]] = None, skip: Optional[List[str]] = None):
+        self.output_dir = output_dir
+        self.jobs = max(1, jobs or os.cpu_count() or 1)
+        self.file_type = file_type
+        self.detector_options = detector_options or {}
+        self.chunksize = chunksize
+        self.table = table
+        self.html = html
+        self.cache_dir = cache_dir
+        self.cache_bytes = cache_bytes
+        self.force = force
+        self.detectors = detectors
+        self.skip = skip or []
+        os.makedirs(output_dir, exist_ok=True)
+
+    @staticmethod
+    def discover(pattern: str) -> Tuple[str, List[str]]:
+        """
+        Input files of a directory (recursively, by known extension) or of a glob pattern,
+        sorted, and the directory they are named relative to in the index: the directory
+        itself, or the part of the pattern before its first wildcard.
+        """
+        if os.path.isdir(pattern):
+            paths = [os.path.join(root, name) for root, _, names in os.walk(pattern) for name in names]
+            return pattern, sorted(path for path in paths if os.path.splitext(path)[1].lower() in FILE_TYPES)
+
+        parts = pattern.split(os.sep)
+        fixed = next((i for i, part in enumerate(parts) if glob.has_magic(part)), len(parts) - 1)
+        base = os.sep.join(parts[:fixed]) or '.'
+        return base, sorted(path for path in glob.glob(pattern, recursive=True) if os.path.isfile(path))
+
+    def _type(self, path: str) -> Optional[str]:
+        return self.file_type or FILE_TYPES.get(os.path.splitext(path)[1].lower())
+
+    def _report_path(self, path: str, base: str) -> str:
+        relative = os.path.splitext(os.path.relpath(path, base))[0]
+        return os.path.join(self.output_dir, relative.replace(os.sep, '__') + '.json')
+
+    def config_hash(self) -> str:
+        """Fingerprint of everything besides the input that shapes a report."""
+        material = json.dumps({"options": self.detector_options, "table": self.table, "type": self.file_type,
+                               "detectors": self.detectors, "skip": self.skip},
+                              sort_keys=True, default=str)
+        return hashlib.sha256(material.encode('utf-8')).hexdigest()
+
+    def _load_index(self) -> Dict[str, Any]:
+        try:
+            with open(os.path.join(self.output_dir, self.INDEX), 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except (FileNotFoundError, json.JSONDecodeError):
+            return {}
+
+    def _save_index(self, index: Dict[str, Any]):
+        # Rewritten after every file, atomically, so an interrupted batch keeps its progress.
+        fd, tmp_path = tempfile.mkstemp(dir=self.output_dir, suffix='.tmp')
+        try:
+            with os.fdopen(fd, 'w', encoding='utf-8') as f:
+                json.dump(index, f, indent=2, sort_keys=True)
+            os.replace(tmp_path, os.path.join(self.output_dir, self.INDEX))
+        except BaseException:
+            os.unlink(tmp_path)
+            raise
+
+    def run(self, paths: List[str], base: str = '.') -> Dict[str, Any]:
+        """Audits paths (named in the index relative to base) and returns the index."""
+        config = self.config_hash()
+        previous = self._load_index()
+        previous_files = previous.get("files", {}) if previous.get("config_hash") == config else {}
+
+        input_hashes = hash_files(paths)
+        base = os.path.abspath(base)
+        files: Dict[str, Dict[str, Any]] = {}
+        tasks = []
+        for path in paths:
+            key = os.path.relpath(os.path.abspath(path), base)
+            input_hash = input_hashes[path]
+            old = previous_files.get(key)
+            if (not self.force and old and old.get("status") == "ok" and old.get("input_hash") == input_hash
+                    and os.path.exists(old.get("report", ""))):
+                files[key] = {**old, "skipped": True}
+                continue
+            file_type = self._type(path)
+            if file_type is None:
+                files[key] = {"input": path, "input_hash": input_hash, "status": "error", "error": "Unknown file type"}
+                continue
+            report = self._report_path(os.path.abspath(path), base)
+            tasks.append((key, {
+                "input": path, "input_hash": input_hash, "type": file_type, "report": report,
+                "html": os.path.splitext(report)[0] + '.html' if self.html else None,
+                "detector_options": self.detector_options, "chunksize": self.chunksize, "table": self.table,
+                "cache_dir": self.cache_dir, "cache_bytes": self.cache_bytes,
+                "detectors": self.detectors, "skip": self.skip
+            }))
+
+        index = {"config_hash": config, "files": files}
+        print(f"[Batch] {len(paths)} file(s): {len(tasks)} to audit, {len(paths) - len(tasks)} unchanged or skipped")
+        started = time.perf_counter()
+        if tasks:
+            # Recycling workers returns memory that pandas/NumPy would otherwise keep cached.
+            with ProcessPoolExecutor(max_workers=min(self.jobs, len(tasks)), max_tasks_per_child=16) as pool:
+                futures = {pool.submit(audit_file, task): key for key, task in tasks}
+                for done, future in enumerate(as_completed(futures), 1):
+                    key = futures[future]
+                    try:
+                        files[key] = {**future.result(), "skipped": False}
+                    except Exception as e:  # The worker itself died, e.g. killed for memory.
+                        files[key] = {"input": dict(tasks)[key]["input"], "status": "error", "error": f"{type(e).__name__}: {e}",
+                                      "seconds": None, "skipped": False}
+                    status = files[key]["status"]
+                    print(f"[Batch] ({done}/{len(tasks)}) {key}: {status} in {files[key]['seconds']}s")
+                    index["summary"] = self._summary(files)
+                    self._save_index(index)
+
+        index["summary"] = {**self._summary(files), "wall_seconds": round(time.perf_counter() - started, 3)}
+        index["generated_at"] = time.strftime('%Y-%m-%dT%H:%M:%S')
+        self._save_index(index)
+        return index
+
+    @staticmethod
+    def _summary(files: Dict[str, Dict[str, Any]]) -> Dict[str, int]:
+        return {
+            "files": len(files),
+            "audited": sum(1 for entry in files.values() if entry.get("skipped") is False),
+            "skipped": sum(1 for entry in files.values() if entry.get("skipped")),
+            "errors": sum(1 for entry in files.values() if entry.get("status") != "ok")
+        }
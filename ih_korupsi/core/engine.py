@@ -1,44 +1,366 @@
-import json
-from typing import List, Dict, Any
+import os
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor
+from typing import List, Dict, Any, Optional, Iterable, Iterator, Callable, Union, Tuple, TYPE_CHECKING
 import pandas as pd
-from .base import BaseDetector
-from ..detectors.mathematician import Mathematician
-from ..detectors.connector import Connector
-from ..detectors.chronologist import Chronologist
-from ..detectors.string_detective import StringDetective
+from .base import BaseDetector, FLOAT
+from .cache import ResultCache
+from .instrumentation import StageTimer, measure
+from .parallel import SharedFrame, run_detector_measured, run_detector_shared
+from .registry import registry
+from ..utils import serialization
+from ..utils.interning import intern_columns
+
+if TYPE_CHECKING:
+    from ..utils.sql_source import SQLiteSource
 
 class FraudEngine:
     """
     Orchestration layer for IH-Korupsi.
+
+    executor selects how detectors are scheduled:
+      - 'serial':  one after another on the calling thread (default).
+      - 'thread':  a thread pool sharing the same DataFrame (NumPy/pandas release the GIL
+                   for most of the heavy lifting).
+      - 'process': a process pool; the DataFrame is placed in shared memory once and
+                   attached by each worker instead of being pickled per detector.
+
+    detectors selects which registered detectors run, by key or display name (default:
+    all); skip removes some. Only the selected detectors' modules are imported (see
+    registry.DetectorRegistry).
+
+    detector_options maps a detector name to keyword arguments forwarded to its run().
+
+    process() parses the date column and interns the id columns (ENTITY_GROUPS) once,
+    for all detectors: every detector groups and builds graphs on the same integer codes,
+    and labels are only looked up for the findings.
+
+    With a ResultCache and the SHA-256 of the input file (input_hash), findings of a
+    detector whose version and options are unchanged are read back from the cache
+    instead of being recomputed. Hits and misses are recorded in the report metadata.
+
+    Every run records wall/CPU time, rows per second and peak RSS per detector, plus
+    any sub-timers the detectors emit (instrumentation.section), in metadata["performance"].
+    trace_memory adds tracemalloc peaks. It is ignored with the thread executor, where
+    concurrent detectors would share one tracer. Callers can add their own stages, such
+    as loading, with record_stage().
     """
-    def __init__(self):
-        self.detectors: List[BaseDetector] = [
-            Mathematician(),
-            Connector(),
-            Chronologist(),
-            StringDetective()
-        ]
-
-    def process(self, df: pd.DataFrame) -> Dict[str, Any]:
+    EXECUTORS = ('serial', 'thread', 'process')
+    DATE_COL = 'date'
+    AMOUNT_COL = 'amount'
+    # Id columns interned once per run (see utils.interning). Senders and receivers share
+    # one table, so their codes name the same account in the transaction graph.
+    ENTITY_GROUPS = (('sender_id', 'receiver_id'), ('vendor_id',), ('vendor_name',))
+
+    def __init__(self, executor: str = 'serial', max_workers: Optional[int] = None, detector_options: Optional[Dict[str, Dict[str, Any]]] = None,
+                 cache: Optional[ResultCache] = None, trace_memory: bool = False,
+                 detectors: Optional[Iterable[str]] = None, skip: Iterable[str] = ()):
+        if executor not in self.EXECUTORS:
+            raise ValueError(f"Unsupported executor: {executor}")
+
+        self.executor = executor
+        self.max_workers = max_workers
+        self.detector_options = detector_options or {}
+        self.cache = cache
+        self.trace_memory = trace_memory and executor != 'thread'
+        self.stages: Dict[str, StageTimer] = {}
+        self.detectors: List[BaseDetector] = registry.create(detectors, skip)
+
+    def process(self, df: pd.DataFrame, input_hash: Optional[str] = None) -> Dict[str, Any]:
         full_report = {
             "metadata": {
                 "total_rows": len(df),
-                "total_amount": float(df['amount'].sum()),
+                "total_amount": float(df[self.AMOUNT_COL].sum()),
                 "currency": "IDR"
             },
             "findings": {}
         }
 
+        with measure(len(df)) as timer:
+            df = self._parse_dates(df)
+        self.record_stage("parse_dates", timer)
+        with measure(len(df)) as timer:
+            df = intern_columns(df, self.ENTITY_GROUPS)
+        self.record_stage("intern", timer)
+
+        findings, cache_keys = self._cache_lookup(input_hash)
+        pending = [detector for detector in self.detectors if detector.name not in findings]
+        timings: Dict[str, StageTimer] = {}
+
+        if self.executor == 'serial':
+            for detector in pending:
+                print(f"Running {detector.name}...")
+                findings[detector.name], timings[detector.name] = run_detector_measured(detector, df, self._options(detector), self.trace_memory)
+        elif pending:
+            self._process_parallel(df, pending, findings, timings)
+
+        self._cache_store(findings, cache_keys, full_report["metadata"])
+        full_report["metadata"]["performance"] = self._performance(timings)
+        full_report["findings"] = {detector.name: findings[detector.name] for detector in self.detectors}
+        return full_report
+
+    def columns(self) -> Optional[Dict[str, Optional[str]]]:
+        """
+        The input columns the selected detectors read with their options, and their
+        preferred dtypes, for DataLoader to load only those (see BaseDetector.columns).
+        A column two detectors want as different dtypes keeps the type the reader infers.
+        None when some detector may read any column.
+        """
+        columns: Dict[str, Optional[str]] = {self.AMOUNT_COL: FLOAT}
+        for detector in self.detectors:
+            wanted = detector.columns(**self._options(detector))
+            if wanted is None:
+                return None
+            for col, dtype in wanted.items():
+                columns[col] = dtype if columns.get(col, dtype) == dtype else None
+        return columns
+
+    def record_stage(self, name: str, timer: StageTimer):
+        """Adds a measured stage (e.g. loading the input) to the next report's performance metadata."""
+        if name in self.stages:
+            self.stages[name].add(timer)
+        else:
+            self.stages[name] = timer
+
+    def _performance(self, timings: Dict[str, StageTimer]) -> Dict[str, Any]:
+        stages, self.stages = self.stages, {}
+        return {
+            "executor": self.executor,
+            "trace_memory": self.trace_memory,
+            "stages": {name: timer.as_dict() for name, timer in stages.items()},
+            "detectors": {detector.name: timings[detector.name].as_dict() for detector in self.detectors if detector.name in timings}
+        }
+
+    def process_stream(self, chunks: Union[Iterable[pd.DataFrame], Callable[[], Iterable[pd.DataFrame]]], input_hash: Optional[str] = None) -> Dict[str, Any]:
+        """
+        Out-of-core variant of process(). Each chunk is folded into a per-detector
+        mergeable state (see DetectorAccumulator) and dropped, so only the compact
+        states stay in memory. The last chunk produces a report with the same shape as process().
+
+        chunks may be a callable returning a fresh chunk iterator; accumulators that
+        need a second pass over the data (e.g. sketch-based outliers) require one.
+        """
+        open_chunks = chunks if callable(chunks) else None
+        accumulators = {}
+        findings, cache_keys = self._cache_lookup(input_hash)
         for detector in self.detectors:
-            print(f"Running {detector.name}...")
+            if detector.name in findings:
+                continue
             try:
-                full_report["findings"][detector.name] = detector.run(df)
+                accumulators[detector.name] = detector.accumulator(**self._options(detector))
             except Exception as e:
-                full_report["findings"][detector.name] = {"error": str(e)}
+                findings[detector.name] = {"error": str(e)}
 
-        return full_report
+        timings = {name: StageTimer(0) for name in accumulators}
+        total_rows = 0
+        total_amount = 0.0
+        for i, chunk in enumerate(self._timed_chunks(open_chunks() if open_chunks else chunks), 1):
+            print(f"Processing chunk {i} ({len(chunk):,} rows)...")
+            total_rows += len(chunk)
+            total_amount += float(chunk[self.AMOUNT_COL].sum())
+            with measure(len(chunk)) as timer:
+                chunk = self._parse_dates(chunk)
+            self.record_stage("parse_dates", timer)
+            for name, accumulator in list(accumulators.items()):
+                with measure(len(chunk), self.trace_memory) as timer:
+                    try:
+                        accumulator.update(chunk)
+                    except Exception as e:
+                        findings[name] = {"error": str(e)}
+                        del accumulators[name]
+                timings[name].add(timer)
+
+        second_pass = {name: acc for name, acc in accumulators.items() if acc.needs_second_pass}
+        if second_pass and open_chunks is None:
+            for name in second_pass:
+                findings[name] = {"error": "This configuration needs a second pass; pass a callable that reopens the chunk source."}
+                del accumulators[name]
+        elif second_pass:
+            for i, chunk in enumerate(self._timed_chunks(open_chunks()), 1):
+                print(f"Second pass, chunk {i} ({len(chunk):,} rows)...")
+                chunk = self._parse_dates(chunk)
+                for name, accumulator in list(second_pass.items()):
+                    # Rows are not added again: rows/s refers to the first pass.
+                    with measure(None, self.trace_memory) as timer:
+                        try:
+                            accumulator.update_second_pass(chunk)
+                        except Exception as e:
+                            findings[name] = {"error": str(e)}
+                            del second_pass[name]
+                            del accumulators[name]
+                    timings[name].add(timer)
+
+        for detector in self.detectors:
+            if detector.name not in accumulators:
+                continue
+            print(f"Running {detector.name}...")
+            with measure(None, self.trace_memory) as timer:
+                try:
+                    findings[detector.name] = accumulators[detector.name].finalize()
+                except Exception as e:
+                    findings[detector.name] = {"error": str(e)}
+            timings[detector.name].add(timer)
+
+        metadata = {
+            "total_rows": total_rows,
+            "total_amount": total_amount,
+            "currency": "IDR"
+        }
+        self._cache_store(findings, cache_keys, metadata)
+        metadata["performance"] = self._performance(timings)
+        return {
+            "metadata": metadata,
+            "findings": {detector.name: findings[detector.name] for detector in self.detectors}
+        }
+
+    def process_sql(self, source: "SQLiteSource", chunksize: int = 100_000, input_hash: Optional[str] = None) -> Dict[str, Any]:
+        """
+        Variant of process_stream() for a SQLite table. Each detector fills its
+        accumulator with update_from_sql(), which pushes aggregations down to SQLite and
+        streams only the columns (and rows) its row-level statistics need, in chunks of
+        chunksize rows. Detectors run one after another on the source's connection.
+        The report has the same shape as process(), plus the table and filters in
+        metadata["source"].
+        """
+        findings, cache_keys = self._cache_lookup(input_hash)
+        total_rows, total_amount = source.totals()
+        timings: Dict[str, StageTimer] = {}
+
+        for detector in self.detectors:
+            if detector.name in findings:
+                continue
+            print(f"Running {detector.name}...")
+            with measure(total_rows, self.trace_memory) as timer:
+                try:
+                    accumulator = detector.accumulator(**self._options(detector))
+                    accumulator.update_from_sql(source, chunksize)
+                    findings[detector.name] = accumulator.finalize()
+                except Exception as e:
+                    findings[detector.name] = {"error": str(e)}
+            timings[detector.name] = timer
+
+        metadata = {
+            "total_rows": total_rows,
+            "total_amount": total_amount,
+            "currency": "IDR",
+            "source": source.describe()
+        }
+        self._cache_store(findings, cache_keys, metadata)
+        metadata["performance"] = self._performance(timings)
+        return {
+            "metadata": metadata,
+            "findings": {detector.name: findings[detector.name] for detector in self.detectors}
+        }
+
+    def _timed_chunks(self, chunks: Iterable[pd.DataFrame]) -> Iterator[pd.DataFrame]:
+        """Yields the chunks while recording the time spent reading them as the 'load' stage."""
+        iterator = iter(chunks)
+        while True:
+            with measure() as timer:
+                chunk = next(iterator, None)
+            if chunk is None:
+                return
+            timer.rows = len(chunk)
+            self.record_stage("load", timer)
+            yield chunk
+
+    def _parse_dates(self, df: pd.DataFrame) -> pd.DataFrame:
+        """
+        Parses the date column once for all detectors. The parsed column goes into a
+        shallow copy, so the caller's frame is left untouched. Unparseable dates are left
+        as they are, so only the detectors that need dates report the error.
+        """
+        if self.DATE_COL not in df.columns or pd.api.types.is_datetime64_any_dtype(df[self.DATE_COL]):
+            return df
+        try:
+            return df.assign(**{self.DATE_COL: pd.to_datetime(df[self.DATE_COL])})
+        except (ValueError, TypeError):
+            return df
+
+    def _options(self, detector: BaseDetector) -> Dict[str, Any]:
+        return self.detector_options.get(detector.name, {})
+
+    def _cache_lookup(self, input_hash: Optional[str]) -> Tuple[Dict[str, Any], Optional[Dict[str, str]]]:
+        """
+        Returns the cached findings (hits) and the cache keys of the detectors that
+        still have to run (misses). Misses is None when caching is off.
+        """
+        hits: Dict[str, Any] = {}
+        if self.cache is None or input_hash is None:
+            return hits, None
+
+        misses: Dict[str, str] = {}
+        for detector in self.detectors:
+            key = ResultCache.key(input_hash, detector.name, detector.version, self._options(detector))
+            cached = self.cache.get(key)
+            if cached is not None:
+                print(f"{detector.name}: cached result")
+                hits[detector.name] = cached
+            else:
+                misses[detector.name] = key
+        return hits, misses
+
+    def _cache_store(self, findings: Dict[str, Any], cache_keys: Optional[Dict[str, str]], metadata: Dict[str, Any]):
+        """
+        Normalizes all findings to JSON-native values (see serialization.normalize), which
+        is also what a cache hit reads back, then stores fresh, error-free findings and
+        records cache hits/misses in the metadata. A report is thus the same whether its
+        findings were computed or read from the cache.
+        """
+        for name, result in findings.items():
+            findings[name] = serialization.normalize(result)
+        if cache_keys is None:
+            return
+
+        for name, key in cache_keys.items():
+            if "error" not in findings[name]:
+                self.cache.put(key, findings[name])
+
+        metadata["cache"] = {
+            "hits": len(self.detectors) - len(cache_keys),
+            "misses": len(cache_keys),
+            "detectors": {detector.name: "miss" if detector.name in cache_keys else "hit" for detector in self.detectors}
+        }
+
+    def _process_parallel(self, df: pd.DataFrame, detectors: List[BaseDetector], findings: Dict[str, Any], timings: Dict[str, StageTimer]):
+        """
+        Runs the given detectors concurrently and merges their results and timings in
+        registration order, so the report shape is identical to the serial path.
+        """
+        workers = self.max_workers or min(len(detectors), os.cpu_count() or 1)
+        shared = None
+
+        try:
+            if self.executor == 'process':
+                shared = SharedFrame(df)
+                pool = ProcessPoolExecutor(max_workers=workers)
+            else:
+                pool = ThreadPoolExecutor(max_workers=workers)
+
+            with pool:
+                futures = {}
+                for detector in detectors:
+                    print(f"Running {detector.name}...")
+                    if shared is not None:
+                        futures[detector.name] = pool.submit(run_detector_shared, detector, shared.spec, shared.index, self._options(detector), self.trace_memory)
+                    else:
+                        # Detectors never modify their input, so all threads share one frame.
+                        futures[detector.name] = pool.submit(run_detector_measured, detector, df, self._options(detector))
+
+                for detector in detectors:
+                    try:
+                        findings[detector.name], timings[detector.name] = futures[detector.name].result()
+                    except Exception as e:
+                        findings[detector.name] = {"error": str(e)}
+        finally:
+            if shared is not None:
+                shared.release()
 
-    def save_report(self, report: Dict[str, Any], output_path: str):
-        with open(output_path, 'w') as f:
-            json.dump(report, f, indent=4)
-        print(f"Report saved to {output_path}")
+    def save_report(self, report: Dict[str, Any], output_path: str, fmt: Optional[str] = None) -> str:
+        """
+        Writes the canonical encoding of the report (compact sorted-key JSON, or MessagePack
+        for a .msgpack path) and returns its SHA-256, taken while writing. This is the
+        output hash that gets anchored; `sha256sum <output_path>` reproduces it.
+        """
+        digest = serialization.save_report(report, output_path, fmt)
+        print(f"Report saved to {output_path} (sha256 {digest})")
+        return digest
@@ -0,0 +1,112 @@
+import sys
+import time
+import tracemalloc
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any, Dict, Iterator, Optional
+
+try:
+    import resource
+except ImportError:  # Not available on Windows.
+    resource = None
+
+class StageTimer:
+    """
+    Measurements of one stage (loading, or one detector): wall time, CPU time of the
+    running thread, rows per second, the process's peak RSS so far, the tracemalloc
+    peak (when memory tracing is on) and named sub-timers (see section()).
+    """
+    def __init__(self, rows: Optional[int] = None):
+        self.rows = rows
+        self.wall = 0.0
+        self.cpu = 0.0
+        self.rss_high_water_mb: Optional[float] = None
+        self.traced_peak_mb: Optional[float] = None
+        self.sections: Dict[str, float] = {}
+
+    def add(self, other: "StageTimer") -> None:
+        """Accumulates another measurement of the same stage (e.g. one per chunk)."""
+        self.wall += other.wall
+        self.cpu += other.cpu
+        if other.rows is not None:
+            self.rows = (self.rows or 0) + other.rows
+        self.rss_high_water_mb = _max(self.rss_high_water_mb, other.rss_high_water_mb)
+        self.traced_peak_mb = _max(self.traced_peak_mb, other.traced_peak_mb)
+        for name, seconds in other.sections.items():
+            self.sections[name] = self.sections.get(name, 0.0) + seconds
+
+    def as_dict(self) -> Dict[str, Any]:
+        result = {
+            "wall_seconds": round(self.wall, 6),
+            "cpu_seconds": round(self.cpu, 6),
+            "rows": self.rows,
+            "rows_per_second": round(self.rows / self.wall, 1) if self.rows and self.wall > 0 else None,
+            "rss_high_water_mb": self.rss_high_water_mb
+        }
+        if self.traced_peak_mb is not None:
+            result["traced_peak_mb"] = self.traced_peak_mb
+        if self.sections:
+            result["sections"] = {name: round(seconds, 6) for name, seconds in self.sections.items()}
+        return result
+
+_current: ContextVar[Optional[StageTimer]] = ContextVar("ih_korupsi_stage", default=None)
+
+@contextmanager
+def measure(rows: Optional[int] = None, trace_memory: bool = False) -> Iterator[StageTimer]:
+    """
+    Times the enclosed block into a StageTimer. With trace_memory, the tracemalloc peak
+    of the block is recorded as well. Tracing slows allocation-heavy code, and its peak
+    is process-wide, so it is only meaningful when stages do not overlap in threads.
+    """
+    timer = StageTimer(rows)
+    token = _current.set(timer)
+    own_trace = trace_memory and not tracemalloc.is_tracing()
+    if own_trace:
+        tracemalloc.start()
+    elif trace_memory:
+        tracemalloc.reset_peak()
+    baseline = tracemalloc.get_traced_memory()[0] if trace_memory else 0
+
+    wall, cpu = time.perf_counter(), time.thread_time()
+    try:
+        yield timer
+    finally:
+        timer.wall = time.perf_counter() - wall
+        timer.cpu = time.thread_time() - cpu
+        if trace_memory:
+            timer.traced_peak_mb = round((tracemalloc.get_traced_memory()[1] - baseline) / 2 ** 20, 3)
+            if own_trace:
+                tracemalloc.stop()
+        timer.rss_high_water_mb = rss_high_water_mb()
+        _current.reset(token)
+
+@contextmanager
+def section(name: str) -> Iterator[None]:
+    """
+    Named sub-timer inside the stage being measured, e.g. `with section("pagerank"):`
+    in a detector. Repeated sections add up. Outside measure() this does nothing.
+    """
+    timer = _current.get()
+    if timer is None:
+        yield
+        return
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        timer.sections[name] = timer.sections.get(name, 0.0) + time.perf_counter() - start
+
+def rss_high_water_mb() -> Optional[float]:
+    """Peak resident set size of this process so far (the OS high-water mark)."""
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux reports kilobytes, macOS bytes.
+    return round(peak / (2 ** 20 if sys.platform == 'darwin' else 2 ** 10), 1)
+
+def _max(a: Optional[float], b: Optional[float]) -> Optional[float]:
+    if a is None:
+        return b
+    if b is None:
+        return a
+    return max(a, b)
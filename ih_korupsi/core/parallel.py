@@ -0,0 +1,95 @@
+import weakref
+from multiprocessing import shared_memory
+from typing import Dict, Any, List, Tuple
+import numpy as np
+import pandas as pd
+from .base import BaseDetector
+from .instrumentation import StageTimer, measure
+
+class SharedFrame:
+    """
+    Column-wise copy of a DataFrame placed in POSIX shared memory.
+    Workers attach to the blocks by name, so the rows are written once by the
+    parent and never pickled per task. Numeric and datetime columns are stored
+    as raw buffers; any other column is factorized into int32 codes and only its
+    (much smaller) table of unique values travels with the handle.
+    """
+    def __init__(self, df: pd.DataFrame):
+        self._blocks: List[shared_memory.SharedMemory] = []
+        self.spec: List[Dict[str, Any]] = []
+
+        for col in df.columns:
+            series = df[col]
+            entry = {"name": col, "dtype": series.dtype, "categories": None}
+
+            if isinstance(series.dtype, np.dtype) and series.dtype.kind in 'biufcmM':
+                values = series.to_numpy()
+            elif isinstance(series.dtype, pd.CategoricalDtype):
+                # Already coded: share the codes, the dtype carries the categories.
+                values = series.cat.codes.to_numpy()
+                entry["categories"] = series.dtype
+            else:
+                codes, uniques = pd.factorize(series, use_na_sentinel=True)
+                # Stored as the narrow codes a Categorical keeps, so workers wrap them as is.
+                values = pd.Categorical.from_codes(codes, categories=uniques).codes
+                entry["categories"] = uniques
+
+            block = shared_memory.SharedMemory(create=True, size=max(values.nbytes, 1))
+            np.ndarray(values.shape, dtype=values.dtype, buffer=block.buf)[:] = values
+            self._blocks.append(block)
+
+            entry.update({"shm": block.name, "shape": values.shape, "buffer_dtype": values.dtype.str})
+            self.spec.append(entry)
+
+        self.index = df.index
+
+    def release(self):
+        """Closes and unlinks every shared block. Call once all workers are done."""
+        for block in self._blocks:
+            block.close()
+            block.unlink()
+        self._blocks = []
+
+def attach_frame(spec: List[Dict[str, Any]], index: pd.Index) -> pd.DataFrame:
+    """
+    Rebuilds a DataFrame from a SharedFrame handle inside a worker process.
+    Numeric, datetime and categorical columns are read-only views of the shared
+    blocks, not copies; only factorized columns of other dtypes are materialized
+    again. Each block stays open until the array over it, and every view of that
+    array, is garbage collected: closing it earlier would unmap memory still in use.
+    """
+    columns = {}
+    for entry in spec:
+        block = shared_memory.SharedMemory(name=entry["shm"])
+        values = np.ndarray(entry["shape"], dtype=np.dtype(entry["buffer_dtype"]), buffer=block.buf)
+        values.flags.writeable = False
+        weakref.finalize(values, block.close)
+
+        if entry["categories"] is None:
+            columns[entry["name"]] = pd.Series(values, index=index, dtype=entry["dtype"], copy=False)
+        elif isinstance(entry["categories"], pd.CategoricalDtype):
+            columns[entry["name"]] = pd.Series(pd.Categorical.from_codes(values, dtype=entry["categories"]), index=index, copy=False)
+        else:
+            categorical = pd.Categorical.from_codes(values, categories=entry["categories"])
+            columns[entry["name"]] = pd.Series(categorical, index=index).astype(entry["dtype"])
+
+    return pd.DataFrame(columns, index=index, copy=False)
+
+def run_detector_measured(detector: BaseDetector, df: pd.DataFrame, kwargs: Dict[str, Any],
+                          trace_memory: bool = False) -> Tuple[Dict[str, Any], StageTimer]:
+    """
+    Runs one detector under measure(). Returns its findings (or an error entry) and the timings.
+    """
+    with measure(len(df), trace_memory) as timer:
+        try:
+            findings = detector.run(df, **kwargs)
+        except Exception as e:
+            findings = {"error": str(e)}
+    return findings, timer
+
+def run_detector_shared(detector: BaseDetector, spec: List[Dict[str, Any]], index: pd.Index, kwargs: Dict[str, Any],
+                        trace_memory: bool = False) -> Tuple[Dict[str, Any], StageTimer]:
+    """
+    Process-pool entry point: attaches to the shared frame and runs one detector.
+    """
+    return run_detector_measured(detector, attach_frame(spec, index), kwargs, trace_memory)
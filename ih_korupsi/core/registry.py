@@ -0,0 +1,92 @@
+import importlib
+from importlib.metadata import entry_points
+from typing import Callable, Dict, Iterable, List, Optional, Union
+from .base import BaseDetector
+
+DetectorFactory = Callable[[], BaseDetector]
+
+class DetectorRegistry:
+    """
+    Detectors by key, imported only when selected. A detector is registered as a
+    "module:attribute" string, or as a class or factory that returns a BaseDetector.
+    Nothing is imported at registration, so a run that selects only The Mathematician
+    never imports NetworkX.
+
+    Third-party packages add detectors without touching the engine by declaring an entry
+    point in the ENTRY_POINT_GROUP group, e.g. in pyproject.toml:
+
+        [project.entry-points."ih_korupsi.detectors"]
+        shell_company = "my_package.detectors:ShellCompanyDetector"
+
+    Entry points are listed the first time the registry is queried and loaded on demand,
+    like the built-in detectors.
+    """
+    ENTRY_POINT_GROUP = 'ih_korupsi.detectors'
+
+    def __init__(self):
+        self._targets: Dict[str, Union[str, DetectorFactory]] = {}
+        self._aliases: Dict[str, str] = {}
+        self._entry_points_loaded = False
+
+    def register(self, key: str, target: Union[str, DetectorFactory], aliases: Iterable[str] = ()):
+        """Registers a detector under key (and aliases, e.g. its display name). Later registrations win."""
+        self._targets[key] = target
+        for alias in (key, *aliases):
+            self._aliases[self._normalize(alias)] = key
+
+    @staticmethod
+    def _normalize(name: str) -> str:
+        return name.strip().lower().replace('-', '_').replace(' ', '_')
+
+    def _discover(self):
+        if self._entry_points_loaded:
+            return
+        self._entry_points_loaded = True
+        for entry_point in entry_points(group=self.ENTRY_POINT_GROUP):
+            if entry_point.name not in self._targets:
+                self.register(entry_point.name, entry_point.value)
+
+    def keys(self) -> List[str]:
+        self._discover()
+        return list(self._targets)
+
+    def resolve(self, name: str) -> str:
+        """The registry key for a key, alias or display name such as 'The Connector'."""
+        self._discover()
+        key = self._aliases.get(self._normalize(name))
+        if key is None:
+            raise KeyError(f"Unknown detector '{name}'. Available: {', '.join(self._targets)}")
+        return key
+
+    def load(self, key: str) -> DetectorFactory:
+        target = self._targets[self.resolve(key)]
+        if isinstance(target, str):
+            module, _, attribute = target.partition(':')
+            target = getattr(importlib.import_module(module), attribute)
+        return target
+
+    def create(self, selected: Optional[Iterable[str]] = None, skip: Iterable[str] = ()) -> List[BaseDetector]:
+        """
+        Instantiates the selected detectors (default: all registered) minus the skipped
+        ones, in registration order whatever the order of the selection, so report keys
+        and cache entries do not depend on how --detectors was spelled. Only their
+        modules are imported.
+        """
+        keys = self.keys()
+        chosen = keys if selected is None else {self.resolve(name) for name in selected}
+        skipped = {self.resolve(name) for name in skip}
+        detectors = []
+        for key in keys:
+            if key not in chosen or key in skipped:
+                continue
+            detector = self.load(key)()
+            if not isinstance(detector, BaseDetector):
+                raise TypeError(f"Detector '{key}' is not a BaseDetector: {type(detector).__name__}")
+            detectors.append(detector)
+        return detectors
+
+registry = DetectorRegistry()
+registry.register('mathematician', 'ih_korupsi.detectors.mathematician:Mathematician', aliases=['The Mathematician', 'benford'])
+registry.register('connector', 'ih_korupsi.detectors.connector:Connector', aliases=['The Connector'])
+registry.register('chronologist', 'ih_korupsi.detectors.chronologist:Chronologist', aliases=['The Chronologist'])
+registry.register('string_detective', 'ih_korupsi.detectors.string_detective:StringDetective', aliases=['String Detective', 'strings'])
@@ -1,7 +1,12 @@
 import pandas as pd
 import numpy as np
-from typing import Dict, Any, List
-from ..core.base import BaseDetector
+from typing import Dict, Any, List, Optional, TYPE_CHECKING
+from ..core.base import BaseDetector, DetectorAccumulator, FLOAT, CATEGORY, DATETIME
+from ..core.instrumentation import section
+from ..utils.timeseries import DAY_SECONDS, as_datetime, is_date_only, sliding_window_counts, window_seconds
+
+if TYPE_CHECKING:
+    from ..utils.sql_source import SQLiteSource
 
 class Chronologist(BaseDetector):
     @property
@@ -12,53 +17,310 @@ class Chronologist(BaseDetector):
     def description(self) -> str:
         return "Time-series anomaly detection: Velocity checks and Fiscal Cliff dumping."
 
-    def run(self, df: pd.DataFrame, date_col: str = 'date', amount_col: str = 'amount', entity_col: str = 'vendor_id') -> Dict[str, Any]:
+    # 4: on date-only data, windows shorter than a day are skipped.
+    # 5: fiscal_cliff and velocity_anomalies name the entity column their rows are keyed by (entity_col).
+    version = "5"
+
+    # Trailing windows of the velocity check and the transaction count a single entity
+    # must exceed inside each one to be flagged.
+    VELOCITY_THRESHOLDS = {"1h": 3, "24h": 5, "7d": 15}
+    TOP_EVENTS = 10
+
+    # Fiscal years with fewer months of data than this are left out of the per-entity ranking.
+    MIN_COVERED_MONTHS = 6
+
+    def run(self, df: pd.DataFrame, date_col: str = 'date', amount_col: str = 'amount', entity_col: str = 'vendor_id',
+            velocity_thresholds: Optional[Dict[str, int]] = None, fiscal_year_start: int = 1,
+            fiscal_entity_col: Optional[str] = None, velocity: bool = True) -> Dict[str, Any]:
         """
-        Analyzes timing patterns of transactions.
+        Analyzes timing patterns of transactions. The input frame is never modified.
+        fiscal_entity_col selects the unit budget dumping is ranked by (e.g. a spending
+        unit column); it defaults to entity_col. velocity=False skips the velocity check,
+        the only part whose streaming state grows with the row count.
         """
-        df[date_col] = pd.to_datetime(df[date_col])
+        dates = as_datetime(df[date_col])
+        with section("fiscal_cliff"):
+            fiscal_cliff = self.detect_fiscal_cliff(df[amount_col], dates, df[fiscal_entity_col or entity_col], fiscal_year_start)
+        if velocity:
+            with section("velocity"):
+                velocity = self.velocity_check(df[entity_col], dates, velocity_thresholds)
+        else:
+            velocity = {"error": "Velocity check disabled."}
         
         results = {
             "detector_name": self.name,
-            "fiscal_cliff": self.detect_fiscal_cliff(df, date_col, amount_col),
-            "velocity_anomalies": self.velocity_check(df, date_col, entity_col)
+            "fiscal_cliff": fiscal_cliff,
+            "velocity_anomalies": velocity
         }
         return results
 
-    def detect_fiscal_cliff(self, df: pd.DataFrame, date_col: str, amount_col: str) -> Dict[str, Any]:
+    def columns(self, date_col: str = 'date', amount_col: str = 'amount', entity_col: str = 'vendor_id',
+                fiscal_entity_col: Optional[str] = None, velocity: bool = True, **kwargs) -> Dict[str, Optional[str]]:
+        columns = {date_col: DATETIME, amount_col: FLOAT, fiscal_entity_col or entity_col: CATEGORY}
+        if velocity:
+            columns[entity_col] = CATEGORY
+        return columns
+
+    def accumulator(self, date_col: str = 'date', amount_col: str = 'amount', entity_col: str = 'vendor_id',
+                    velocity_thresholds: Optional[Dict[str, int]] = None, fiscal_year_start: int = 1,
+                    fiscal_entity_col: Optional[str] = None, velocity: bool = True) -> "ChronologistAccumulator":
+        return ChronologistAccumulator(self, date_col, amount_col, entity_col, velocity_thresholds, fiscal_year_start, fiscal_entity_col, velocity)
+
+    def detect_fiscal_cliff(self, amounts: pd.Series, dates: pd.Series, entities: pd.Series, fiscal_year_start: int = 1) -> Dict[str, Any]:
         """
-        Detects year-end spending spikes.
+        Detects year-end spending spikes, per fiscal year and per entity.
         """
-        df['month'] = df[date_col].dt.month
-        monthly_spending = df.groupby('month')[amount_col].sum()
-        
-        avg_spending = monthly_spending.mean()
-        dec_spending = monthly_spending.get(12, 0)
-        
-        ratio = dec_spending / avg_spending if avg_spending > 0 else 0
-        
-        status = "Normal"
-        if ratio > 2.5: status = "Extreme Dumping"
-        elif ratio > 1.5: status = "Significant Increase"
+        return self._fiscal_cliff_from_sums(self.fiscal_sums(amounts, dates, entities, fiscal_year_start), fiscal_year_start)
+
+    @staticmethod
+    def fiscal_sums(amounts: pd.Series, dates: pd.Series, entities: pd.Series, fiscal_year_start: int = 1) -> pd.Series:
+        """
+        Spending per (fiscal_year, entity, fiscal_month). fiscal_month 1 is the month the
+        fiscal year starts in. A fiscal year is labelled by the calendar year it ends in.
+        """
+        if not 1 <= fiscal_year_start <= 12:
+            raise ValueError("fiscal_year_start must be a month number (1-12).")
+        month = dates.dt.month
+        fiscal_month = ((month - fiscal_year_start) % 12 + 1).rename('fiscal_month')
+        fiscal_year = dates.dt.year.rename('fiscal_year')
+        if fiscal_year_start > 1:
+            fiscal_year = (fiscal_year + (month >= fiscal_year_start)).rename('fiscal_year')
+        return amounts.groupby([fiscal_year, entities.rename(entities.name or 'entity'), fiscal_month], observed=True).sum()
+
+    def _fiscal_cliff_from_sums(self, sums: pd.Series, fiscal_year_start: int = 1) -> Dict[str, Any]:
+        """
+        One pivot gives a (fiscal_year, entity) x fiscal_month table. Every row's ratio
+        is its year-end month divided by its average over the months that fiscal year
+        covers in the data, with zeros for months the entity did not spend in. A partial
+        first or last year is therefore not diluted by months outside the data.
+        """
+        entity_name = sums.index.names[1]
+        year_end_month = (fiscal_year_start + 10) % 12 + 1
+        months = pd.RangeIndex(1, 13, name='fiscal_month')
+
+        # Whole-ledger view, pooled over years (as before, by calendar month).
+        pooled = sums.groupby(level='fiscal_month').sum().reindex(months, fill_value=0)
+        observed = sums.groupby(level='fiscal_month').size().reindex(months, fill_value=0) > 0
+        monthly_spending = pooled[observed]
+        monthly_spending.index = (monthly_spending.index + fiscal_year_start - 2) % 12 + 1
+        monthly_spending = monthly_spending.sort_index()
+        ratio = self._ratio(pooled.iloc[-1], monthly_spending.mean())
+
+        table = sums.unstack('fiscal_month', fill_value=0.0).reindex(columns=months, fill_value=0.0)
+        covered = sums.groupby(level=['fiscal_year', 'fiscal_month']).size().unstack(fill_value=0).reindex(columns=months, fill_value=0) > 0
+        covered_months = covered.sum(axis=1)
+        coverage = covered.reindex(table.index.get_level_values('fiscal_year')).to_numpy()
+
+        average = np.where(coverage, table.to_numpy(), 0.0).sum(axis=1) / coverage.sum(axis=1)
+        year_end = table[12].to_numpy()
+        with np.errstate(divide='ignore', invalid='ignore'):
+            ratios = np.where(average > 0, year_end / average, 0.0)
+
+        pairs = pd.DataFrame({
+            "fiscal_year": table.index.get_level_values('fiscal_year'),
+            "entity": table.index.get_level_values(entity_name),
+            "year_end_spending": year_end,
+            "average_monthly_spending": average,
+            "ratio": ratios,
+            "covered_months": coverage.sum(axis=1)
+        })
+        ranked = pairs[(pairs["covered_months"] >= self.MIN_COVERED_MONTHS) & (pairs["ratio"] > 1.5)]
+        ranked = ranked.sort_values(["ratio", "year_end_spending"], ascending=False, kind='stable')
+
+        yearly = table.groupby(level='fiscal_year').sum()
+        yearly_average = np.where(covered.reindex(yearly.index).to_numpy(), yearly.to_numpy(), 0.0).sum(axis=1) / covered_months.reindex(yearly.index).to_numpy()
+        by_year = {
+            str(year): {
+                "year_end_vs_avg_ratio": self._ratio(end, avg),
+                "status": self._status(self._ratio(end, avg)),
+                "covered_months": int(covered_months[year])
+            } for year, end, avg in zip(yearly.index, yearly[12].to_numpy(), yearly_average)
+        }
 
         return {
+            "fiscal_year_start": fiscal_year_start,
+            "year_end_month": year_end_month,
+            "entity_col": entity_name,
             "monthly_spending": {str(k): float(v) for k, v in monthly_spending.to_dict().items()},
-            "december_vs_avg_ratio": float(ratio),
-            "status": status,
-            "explanation": "Compares December spending to the yearly average. High ratios suggest 'budget dumping' to avoid losing funds."
+            "year_end_vs_avg_ratio": ratio,
+            "status": self._status(ratio),
+            "by_fiscal_year": by_year,
+            "flagged_pairs": int(len(ranked)),
+            "top_offenders": [{
+                entity_name: _plain(row.entity),
+                "fiscal_year": int(row.fiscal_year),
+                "year_end_spending": float(row.year_end_spending),
+                "average_monthly_spending": float(row.average_monthly_spending),
+                "ratio": float(row.ratio),
+                "status": self._status(row.ratio)
+            } for row in ranked.head(self.TOP_EVENTS).itertuples(index=False)],
+            "explanation": "Compares spending in the last month of the fiscal year to the monthly average, for the whole ledger, for each fiscal year and for each (fiscal year, entity) pair. High ratios suggest 'budget dumping' to avoid losing funds."
         }
 
-    def velocity_check(self, df: pd.DataFrame, date_col: str, entity_col: str) -> Dict[str, Any]:
+    @staticmethod
+    def _ratio(year_end: float, average: float) -> float:
+        return float(year_end / average) if average > 0 else 0.0
+
+    @staticmethod
+    def _status(ratio: float) -> str:
+        if ratio > 2.5: return "Extreme Dumping"
+        if ratio > 1.5: return "Significant Increase"
+        return "Normal"
+
+    def velocity_check(self, entities: pd.Series, dates: pd.Series, thresholds: Optional[Dict[str, int]] = None,
+                       date_only: Optional[bool] = None) -> Dict[str, Any]:
         """
-        Detects high transaction frequency.
+        Detects high transaction frequency in sliding windows (see sliding_window_counts).
+        For every window length, each entity is reported once, at its densest burst,
+        if that burst exceeds the window's threshold. When the dates carry no time of day
+        (date_only, detected from the dates unless given), every transaction of a day sits
+        at midnight, so windows shorter than a day are skipped: a 1-hour window would
+        just count the day's transactions against a sub-day threshold.
         """
-        df['date_only'] = df[date_col].dt.date
-        freq = df.groupby([entity_col, 'date_only']).size().reset_index(name='count')
-        
-        high_velocity = freq[freq['count'] > 5].sort_values(by='count', ascending=False)
-        high_velocity['date_only'] = high_velocity['date_only'].astype(str)
-        
+        thresholds = thresholds or self.VELOCITY_THRESHOLDS
+        date_only = is_date_only(dates) if date_only is None else date_only
+        skipped = [w for w in thresholds if date_only and window_seconds(w) < DAY_SECONDS]
+        thresholds = {w: n for w, n in thresholds.items() if w not in skipped}
+        # No window left (only sub-day ones on date-only data): nothing to count.
+        rows, counts = sliding_window_counts(entities, dates, list(thresholds)) if thresholds else (None, {})
+        entity_col = entities.name or 'entity'
+
+        windows = {}
+        events = []
+        for window, threshold in thresholds.items():
+            count, first = counts[window]
+            flagged = np.flatnonzero(count > threshold)
+            peaks = pd.DataFrame({"row": flagged, "count": count[flagged], "entity": rows["entity"].to_numpy()[flagged]})
+            peaks = peaks.sort_values(["count", "row"], ascending=[False, True], kind='stable').drop_duplicates("entity")
+
+            window_events = [{
+                entity_col: _plain(entity),
+                "window": window,
+                "window_start": str(rows["time"].iat[first[row]]),
+                "window_end": str(rows["time"].iat[row]),
+                "count": int(n),
+                "threshold": threshold
+            } for row, n, entity in peaks.head(self.TOP_EVENTS).itertuples(index=False)]
+
+            windows[window] = {
+                "threshold": threshold,
+                "entities_flagged": len(peaks),
+                "events": window_events
+            }
+            events.extend(window_events)
+
+        # Headline list: every entity once, in the window where it exceeds its threshold the most.
+        events.sort(key=lambda e: e["count"] / e["threshold"], reverse=True)
+        headline, seen = [], set()
+        for event in events:
+            if event[entity_col] not in seen:
+                seen.add(event[entity_col])
+                headline.append(event)
+
+        return {
+            "entity_col": entity_col,
+            "high_velocity_events": headline[:self.TOP_EVENTS],
+            "windows": windows,
+            "date_only": date_only,
+            "skipped_windows": skipped,
+            "explanation": "Counts each entity's transactions in trailing windows (e.g. 1 hour, 24 hours, 7 days) that slide with every transaction instead of calendar days, so bursts spanning midnight are caught. Each entity is listed at its burst with the highest count relative to the window's threshold." + (
+                f" The dates have no time of day, so the sub-day windows ({', '.join(skipped)}) were skipped." if skipped else "")
+        }
+
+def _plain(value: Any) -> Any:
+    """NumPy scalars to Python scalars, for the JSON report."""
+    return value.item() if isinstance(value, np.generic) else value
+
+class ChronologistAccumulator(DetectorAccumulator):
+    """
+    Mergeable state of The Chronologist: spending per (fiscal year, entity, fiscal
+    month), plus the (entity, timestamp) pairs that the sliding velocity windows need.
+    Those pairs grow with the row count; they are not kept when velocity=False.
+    """
+    def __init__(self, detector: Chronologist, date_col: str, amount_col: str, entity_col: str,
+                 velocity_thresholds: Optional[Dict[str, int]] = None, fiscal_year_start: int = 1,
+                 fiscal_entity_col: Optional[str] = None, velocity: bool = True):
+        self.detector = detector
+        self.date_col = date_col
+        self.amount_col = amount_col
+        self.entity_col = entity_col
+        self.velocity_thresholds = velocity_thresholds
+        self.fiscal_year_start = fiscal_year_start
+        self.fiscal_entity_col = fiscal_entity_col or entity_col
+        self.velocity = velocity
+        self.fiscal_sums: pd.Series = None
+        self.events: List[pd.DataFrame] = []
+        # Set by update_from_sql, which streams only busy entities' dates; None means detect from the events.
+        self.date_only: Optional[bool] = None
+
+    def update(self, chunk: pd.DataFrame) -> None:
+        dates = as_datetime(chunk[self.date_col])
+        partial = ChronologistAccumulator(self.detector, self.date_col, self.amount_col, self.entity_col,
+                                          self.velocity_thresholds, self.fiscal_year_start, self.fiscal_entity_col, self.velocity)
+        partial.fiscal_sums = self.detector.fiscal_sums(chunk[self.amount_col], dates, chunk[self.fiscal_entity_col], self.fiscal_year_start)
+        if self.velocity:
+            partial.events = [pd.DataFrame({self.entity_col: chunk[self.entity_col].to_numpy(), self.date_col: dates.to_numpy()})]
+        self.merge(partial)
+
+    def update_from_sql(self, source: "SQLiteSource", chunksize: int) -> None:
+        """
+        Monthly sums per (calendar year, month, entity) come from one GROUP BY and are
+        folded into fiscal sums here. Only entities with more dated transactions than
+        the smallest velocity threshold can be flagged, so only their (entity, date)
+        rows are streamed. Dates that SQLite cannot parse fall back to plain streaming.
+        """
+        if not source.iso_dates():
+            super().update_from_sql(source, chunksize)
+            return
+
+        d, a, e, f = (source.quote(col) for col in (self.date_col, self.amount_col, self.entity_col, self.fiscal_entity_col))
+        with section("fiscal_cliff"):
+            monthly = source.query(
+                f"CAST(strftime('%Y', {d}) AS INTEGER) AS year, CAST(strftime('%m', {d}) AS INTEGER) AS month, {f} AS entity, TOTAL({a}) AS amount",
+                f"{d} IS NOT NULL AND {f} IS NOT NULL", "GROUP BY 1, 2, 3"
+            )
+            dates = pd.to_datetime(monthly[["year", "month"]].assign(day=1))
+            self.fiscal_sums = self.detector.fiscal_sums(monthly["amount"], dates, monthly["entity"].rename(self.fiscal_entity_col), self.fiscal_year_start)
+
+        if not self.velocity:
+            return
+        with section("velocity"):
+            thresholds = self.velocity_thresholds or self.detector.VELOCITY_THRESHOLDS
+            busy = source.query(f"{e} AS entity", f"{e} IS NOT NULL AND {d} IS NOT NULL", f"GROUP BY {e} HAVING COUNT(*) > ?",
+                                params=(min(thresholds.values()),))
+            # Decided over all dated rows, not just the streamed ones (NULL when there are none).
+            midnight = source.query(f"MIN(time({d}) = '00:00:00') AS midnight", f"{d} IS NOT NULL")["midnight"].iat[0]
+            self.date_only = bool(midnight == 1)
+            staged = source.stage(busy)
+            for chunk in source.iter_chunks(chunksize, [self.entity_col, self.date_col], f"{e} IN (SELECT entity FROM {staged})"):
+                self.events.append(pd.DataFrame({self.entity_col: chunk[self.entity_col].to_numpy(), self.date_col: as_datetime(chunk[self.date_col]).to_numpy()}))
+
+    def merge(self, other: "ChronologistAccumulator") -> None:
+        if other.date_only is not None:
+            self.date_only = other.date_only if self.date_only is None else self.date_only and other.date_only
+        if other.fiscal_sums is None:
+            return
+        self.events.extend(other.events)
+        if self.fiscal_sums is None:
+            self.fiscal_sums = other.fiscal_sums
+            return
+        self.fiscal_sums = self.fiscal_sums.add(other.fiscal_sums, fill_value=0).sort_index()
+
+    def finalize(self) -> Dict[str, Any]:
+        if self.fiscal_sums is None:
+            # Empty input, or filters that leave no rows: the same result as run() on an empty frame.
+            empty = pd.DataFrame({col: pd.Series([], dtype=object) for col in (self.entity_col, self.fiscal_entity_col)})
+            empty[self.amount_col] = pd.Series([], dtype=float)
+            empty[self.date_col] = pd.Series([], dtype='datetime64[ns]')
+            return self.detector.run(empty, self.date_col, self.amount_col, self.entity_col, self.velocity_thresholds,
+                                     self.fiscal_year_start, self.fiscal_entity_col, self.velocity)
+        if self.velocity:
+            events = pd.concat(self.events, ignore_index=True) if self.events else pd.DataFrame({self.entity_col: [], self.date_col: pd.to_datetime([])})
+            velocity = self.detector.velocity_check(events[self.entity_col], events[self.date_col], self.velocity_thresholds, self.date_only)
+        else:
+            velocity = {"error": "Velocity check disabled."}
         return {
-            "high_velocity_events": high_velocity.head(10).to_dict(orient='records'),
-            "explanation": "Identifies entities with an unusually high volume of transactions on a single day."
+            "detector_name": self.detector.name,
+            "fiscal_cliff": self.detector._fiscal_cliff_from_sums(self.fiscal_sums, self.fiscal_year_start),
+            "velocity_anomalies": velocity
         }
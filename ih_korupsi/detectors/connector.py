@@ -1,9 +1,25 @@
 import networkx as nx
+import numpy as np
 import pandas as pd
-from typing import Dict, Any, List, Set
-from ..core.base import BaseDetector
+from typing import Dict, Any, List, Set, Optional, TYPE_CHECKING
+from ..core.base import BaseDetector, DetectorAccumulator, FLOAT, CATEGORY, DATETIME
+from ..core.instrumentation import section
+from ..utils.cycle_search import CycleEnumerator
+from ..utils.temporal_cycles import TemporalCycleEnumerator
+from ..utils.sparse_graph import SparseGraph
+from ..utils.timeseries import as_datetime
+from ..utils.interning import factorize_shared
+
+if TYPE_CHECKING:
+    from ..utils.sql_source import SQLiteSource
 
 class Connector(BaseDetector):
+    # 2: temporal cycles skip transfers with a missing party and allow same-day legs on date-only data.
+    # 3: community members are listed in graph (first-seen) order instead of set order.
+    # 4: data without any dated transfer is not date-only.
+    version = "4"
+    DAY_NS = 86_400 * 10**9
+
     @property
     def name(self) -> str:
         return "The Connector"
@@ -12,39 +28,174 @@ class Connector(BaseDetector):
     def description(self) -> str:
         return "Graph-based detection for circular trading and hidden communities."
 
-    def run(self, df: pd.DataFrame, source_col: str = 'sender_id', target_col: str = 'receiver_id', amount_col: str = 'amount') -> Dict[str, Any]:
+    def run(self, df: pd.DataFrame, source_col: str = 'sender_id', target_col: str = 'receiver_id', amount_col: str = 'amount',
+            max_cycle_length: Optional[int] = None, cycle_time_budget: Optional[float] = 30.0, cycle_sample_cap: int = 10,
+            date_col: str = 'date', temporal_window_days: float = 30.0, amount_tolerance: Optional[float] = None,
+            backend: str = 'networkx', betweenness_epsilon: float = 0.05, betweenness_delta: float = 0.1,
+            temporal_cycles: bool = True) -> Dict[str, Any]:
         """
         Builds a network and analyzes connections.
+        backend='networkx' uses an nx.DiGraph with exact betweenness; backend='sparse' uses a
+        SciPy CSR matrix with sampled betweenness (see SparseGraph) and yields the same keys.
         """
-        G = nx.from_pandas_edgelist(df, source_col, target_col, [amount_col], create_using=nx.DiGraph())
-        
+        static = self.analyze_edges(df, source_col, target_col, amount_col, max_cycle_length, cycle_time_budget, cycle_sample_cap,
+                                    backend, betweenness_epsilon, betweenness_delta)
+        if temporal_cycles:
+            with section("temporal_cycles"):
+                temporal = self.detect_temporal_cycles(
+                    df, source_col, target_col, amount_col, date_col, temporal_window_days, amount_tolerance,
+                    max_cycle_length, cycle_time_budget, cycle_sample_cap
+                )
+        else:
+            temporal = {"error": "Temporal cycle detection disabled."}
+        return self._assemble(static, temporal)
+
+    def _assemble(self, static: Dict[str, Any], temporal: Dict[str, Any]) -> Dict[str, Any]:
         results = {
             "detector_name": self.name,
-            "circular_trading": self.detect_cycles(G),
-            "centrality_analysis": self.analyze_centrality(G),
-            "communities": self.detect_communities(G)
+            "circular_trading": static["circular_trading"],
+            "temporal_circular_trading": temporal,
+            "centrality_analysis": static["centrality_analysis"],
+            "communities": static["communities"]
         }
         return results
 
-    def detect_cycles(self, G: nx.DiGraph) -> Dict[str, Any]:
+    def analyze_edges(self, edges: pd.DataFrame, source_col: str, target_col: str, amount_col: str,
+                      max_cycle_length: Optional[int], cycle_time_budget: Optional[float], cycle_sample_cap: int,
+                      backend: str, betweenness_epsilon: float, betweenness_delta: float) -> Dict[str, Any]:
+        """
+        Static graph analysis. Only the set of (source, target) pairs matters, so edges may
+        be raw transactions or pre-aggregated edge rows.
+        """
+        if backend == 'networkx':
+            with section("graph_build"):
+                G = nx.from_pandas_edgelist(edges, source_col, target_col, [amount_col], create_using=nx.DiGraph())
+            with section("cycles"):
+                circular = self.detect_cycles(G, max_cycle_length, cycle_time_budget, cycle_sample_cap)
+            centrality = self.analyze_centrality(G)
+            with section("communities"):
+                communities = self.detect_communities(G)
+        elif backend == 'sparse':
+            with section("graph_build"):
+                graph = SparseGraph(edges[source_col], edges[target_col])
+            with section("cycles"):
+                circular = self.count_cycles(graph.adjacency_lists(), graph.labels, max_cycle_length, cycle_time_budget, cycle_sample_cap)
+            centrality = self.analyze_centrality_sparse(graph, betweenness_epsilon, betweenness_delta)
+            with section("communities"):
+                communities = self.detect_communities_sparse(graph)
+        else:
+            raise ValueError(f"Unsupported graph backend: {backend}")
+
+        return {
+            "circular_trading": circular,
+            "centrality_analysis": centrality,
+            "communities": communities
+        }
+
+    def columns(self, source_col: str = 'sender_id', target_col: str = 'receiver_id', amount_col: str = 'amount',
+                date_col: str = 'date', temporal_cycles: bool = True, **kwargs) -> Dict[str, Optional[str]]:
+        columns = {source_col: CATEGORY, target_col: CATEGORY, amount_col: FLOAT}
+        if temporal_cycles:
+            columns[date_col] = DATETIME
+        return columns
+
+    def accumulator(self, **kwargs) -> "ConnectorAccumulator":
+        return ConnectorAccumulator(self, **kwargs)
+
+    def detect_cycles(self, G: nx.DiGraph, max_length: Optional[int] = None, time_budget: Optional[float] = 30.0, sample_cap: int = 10) -> Dict[str, Any]:
         """
         Detects circular transaction paths.
+        Cycles are streamed from a bounded search (see CycleEnumerator) and only counted,
+        so memory stays flat however many loops the graph contains. If the time budget
+        runs out, cycles_count is a lower bound and count_is_lower_bound is set.
         """
-        cycles = list(nx.simple_cycles(G))
-        top_cycles = cycles[:10]
-        
+        nodes = list(G.nodes)
+        position = {node: i for i, node in enumerate(nodes)}
+        adjacency = [[position[w] for w in G.successors(node)] for node in nodes]
+        return self.count_cycles(adjacency, nodes, max_length, time_budget, sample_cap)
+
+    def count_cycles(self, adjacency: List[List[int]], labels, max_length: Optional[int] = None,
+                     time_budget: Optional[float] = 30.0, sample_cap: int = 10) -> Dict[str, Any]:
+        """
+        Backend-independent part of detect_cycles over integer adjacency lists.
+        """
+        enumerator = CycleEnumerator(adjacency, max_length=max_length, time_budget=time_budget)
+        count = 0
+        samples = []
+        for cycle in enumerator:
+            count += 1
+            if len(samples) < sample_cap:
+                samples.append([labels[i] for i in cycle])
+
         return {
-            "cycles_count": len(cycles),
-            "sample_cycles": top_cycles,
+            "cycles_count": count,
+            "count_is_lower_bound": not enumerator.exhausted,
+            "max_cycle_length": max_length,
+            "sample_cycles": samples,
             "explanation": "Simple cycles in the graph indicate potential circular trading or money laundering loops."
         }
 
+    def detect_temporal_cycles(self, df: pd.DataFrame, source_col: str, target_col: str, amount_col: str, date_col: str,
+                               window_days: float = 30.0, amount_tolerance: Optional[float] = None, max_length: Optional[int] = None,
+                               time_budget: Optional[float] = 30.0, sample_cap: int = 10, date_only: Optional[bool] = None) -> Dict[str, Any]:
+        """
+        Detects circular transaction paths whose legs happen in chronological order
+        within window_days of the first leg (see TemporalCycleEnumerator).
+        Unlike the static graph, every transfer keeps its own date and amount. Transfers
+        with a missing date, sender or receiver are left out. When every timestamp is a
+        midnight (date-only data, detected from the transfers unless given), legs on the
+        same day count as chronological.
+        """
+        if date_col not in df.columns:
+            return {"error": f"Column '{date_col}' not found; temporal cycle detection skipped."}
+
+        timestamps = as_datetime(df[date_col])
+        valid = (timestamps.notna() & df[source_col].notna() & df[target_col].notna()).to_numpy()
+        codes, labels = factorize_shared(df[source_col][valid], df[target_col][valid])
+        edge_count = int(valid.sum())
+
+        times = timestamps[valid].to_numpy().astype('datetime64[ns]').astype(np.int64)
+        amounts = df[amount_col][valid].to_numpy(dtype=float)
+        window = int(pd.Timedelta(days=window_days).value)
+        if date_only is None:
+            date_only = edge_count > 0 and bool((times % self.DAY_NS == 0).all())
+
+        enumerator = TemporalCycleEnumerator(
+            codes[:edge_count], codes[edge_count:], times, amounts, window,
+            amount_tolerance=amount_tolerance, max_length=max_length, time_budget=time_budget, strict=not date_only
+        )
+
+        count = 0
+        samples = []
+        for cycle in enumerator:
+            count += 1
+            if len(samples) < sample_cap:
+                samples.append([{
+                    "from": labels[codes[e]],
+                    "to": labels[codes[edge_count + e]],
+                    "date": str(pd.Timestamp(times[e]).date()),
+                    "amount": float(amounts[e])
+                } for e in cycle])
+
+        return {
+            "cycles_count": count,
+            "count_is_lower_bound": not enumerator.exhausted,
+            "window_days": window_days,
+            "amount_tolerance": amount_tolerance,
+            "date_only": date_only,
+            "sample_cycles": samples,
+            "explanation": "Loops where every transfer happens after the previous one and within the time window. Impossible orderings are excluded, leaving loops that money could actually have travelled." + (
+                " The dates have no time of day, so legs on the same day are treated as possibly in order." if date_only else "")
+        }
+
     def analyze_centrality(self, G: nx.DiGraph) -> Dict[str, Any]:
         """
         Identifies key actors.
         """
-        pagerank = nx.pagerank(G)
-        betweenness = nx.betweenness_centrality(G)
+        with section("pagerank"):
+            pagerank = nx.pagerank(G)
+        with section("betweenness"):
+            betweenness = nx.betweenness_centrality(G)
         
         top_pagerank = sorted(pagerank.items(), key=lambda x: x[1], reverse=True)[:5]
         top_betweenness = sorted(betweenness.items(), key=lambda x: x[1], reverse=True)[:5]
@@ -61,7 +212,9 @@ class Connector(BaseDetector):
         """
         undirected_G = G.to_undirected()
         components = list(nx.connected_components(undirected_G))
-        large_clusters = [list(c) for c in components if len(c) > 3]
+        # Members in graph order rather than set order, so the report does not depend on the hash seed.
+        position = {node: i for i, node in enumerate(G)}
+        large_clusters = [sorted(c, key=position.__getitem__) for c in components if len(c) > 3]
         
         return {
             "total_clusters": len(components),
@@ -69,3 +222,148 @@ class Connector(BaseDetector):
             "sample_large_clusters": large_clusters[:5],
             "explanation": "Identifies groups of actors who frequently interact with each other."
         }
+
+    def analyze_centrality_sparse(self, graph: SparseGraph, epsilon: float = 0.05, delta: float = 0.1) -> Dict[str, Any]:
+        """
+        Identifies key actors on the CSR backend.
+        Betweenness is sampled from enough pivots to be within epsilon of the exact value
+        with probability 1 - delta; it is exact whenever that many pivots cover every node.
+        """
+        with section("pagerank"):
+            pagerank = graph.pagerank()
+        with section("betweenness"):
+            betweenness, pivots, exact = graph.betweenness(epsilon, delta)
+
+        top_pagerank = [(graph.labels[i], float(pagerank[i])) for i in np.argsort(-pagerank, kind='stable')[:5]]
+        top_betweenness = [(graph.labels[i], float(betweenness[i])) for i in np.argsort(-betweenness, kind='stable')[:5]]
+
+        return {
+            "top_influencers_pagerank": top_pagerank,
+            "top_bridges_betweenness": top_betweenness,
+            "betweenness_sampling": {
+                "pivots": pivots,
+                "exact": exact,
+                "epsilon": None if exact else epsilon,
+                "confidence": None if exact else 1 - delta
+            },
+            "explanation": "PageRank finds important entities, while Betweenness finds 'bridge' actors who control flows between groups."
+        }
+
+    def detect_communities_sparse(self, graph: SparseGraph) -> Dict[str, Any]:
+        """
+        Detects clusters as weakly connected components via scipy.sparse.csgraph.
+        """
+        total, membership = graph.weak_components()
+        sizes = np.bincount(membership, minlength=total)
+        order = np.argsort(membership, kind='stable')
+        boundaries = np.cumsum(sizes)[:-1]
+        components = np.split(order, boundaries)
+        large_clusters = [[graph.labels[i] for i in c] for c in components if len(c) > 3]
+
+        return {
+            "total_clusters": int(total),
+            "large_clusters_count": len(large_clusters),
+            "sample_large_clusters": large_clusters[:5],
+            "explanation": "Identifies groups of actors who frequently interact with each other."
+        }
+
+class ConnectorAccumulator(DetectorAccumulator):
+    """
+    Mergeable state of The Connector: one aggregated row (total amount, transfer count)
+    per (source, target) pair, in first-seen order so graph nodes are inserted as in
+    run(). Temporal cycles need every dated transfer, so those four columns are kept
+    unless temporal_cycles=False.
+    """
+    def __init__(self, detector: Connector, source_col: str = 'sender_id', target_col: str = 'receiver_id', amount_col: str = 'amount',
+                 max_cycle_length: Optional[int] = None, cycle_time_budget: Optional[float] = 30.0, cycle_sample_cap: int = 10,
+                 date_col: str = 'date', temporal_window_days: float = 30.0, amount_tolerance: Optional[float] = None,
+                 backend: str = 'networkx', betweenness_epsilon: float = 0.05, betweenness_delta: float = 0.1,
+                 temporal_cycles: bool = True):
+        self.detector = detector
+        self.source_col = source_col
+        self.target_col = target_col
+        self.amount_col = amount_col
+        self.date_col = date_col
+        self.temporal_cycles = temporal_cycles
+        self.cycle_options = (max_cycle_length, cycle_time_budget, cycle_sample_cap)
+        self.temporal_options = (temporal_window_days, amount_tolerance)
+        self.graph_options = (backend, betweenness_epsilon, betweenness_delta)
+        self.edges: pd.DataFrame = None
+        self.transfers: List[pd.DataFrame] = []
+        # Set by update_from_sql, which streams only transfers inside a component; None means detect from the transfers.
+        self.date_only: Optional[bool] = None
+
+    def update(self, chunk: pd.DataFrame) -> None:
+        partial = ConnectorAccumulator(self.detector, self.source_col, self.target_col, self.amount_col, date_col=self.date_col,
+                                       temporal_cycles=self.temporal_cycles)
+        partial.edges = chunk.groupby([self.source_col, self.target_col], sort=False, observed=True)[self.amount_col].agg(['sum', 'count'])
+        if self.temporal_cycles and self.date_col in chunk.columns:
+            partial.transfers = [chunk[[self.source_col, self.target_col, self.date_col, self.amount_col]].copy()]
+        self.merge(partial)
+
+    def update_from_sql(self, source: "SQLiteSource", chunksize: int) -> None:
+        """
+        Edge totals come from one GROUP BY (in first-seen order when the table has a
+        rowid). A time-respecting loop stays inside one strongly connected component
+        of the static graph, so only transfers between two nodes of the same component
+        (self-transfers included) are streamed for temporal cycle detection.
+        """
+        s, r, a = (source.quote(col) for col in (self.source_col, self.target_col, self.amount_col))
+        order = " ORDER BY MIN(rowid)" if source.has_rowid else ""
+        with section("edges"):
+            edges = source.query(f"{s} AS {s}, {r} AS {r}, TOTAL({a}) AS sum, COUNT({a}) AS count",
+                                 f"{s} IS NOT NULL AND {r} IS NOT NULL", f"GROUP BY {s}, {r}{order}")
+            self.edges = edges.set_index([self.source_col, self.target_col])
+
+        if not self.temporal_cycles or self.date_col not in source.columns:
+            return
+        columns = [self.source_col, self.target_col, self.date_col, self.amount_col]
+        if source.iso_dates():
+            # Decided over every dated transfer, not just the streamed ones (NULL when there are none).
+            d = source.quote(self.date_col)
+            midnight = source.query(f"MIN(time({d}) = '00:00:00') AS midnight", f"{s} IS NOT NULL AND {r} IS NOT NULL AND {d} IS NOT NULL")["midnight"].iat[0]
+            self.date_only = bool(midnight == 1)
+        with section("row_scan"):
+            transfers = []
+            if not edges.empty:
+                graph = SparseGraph(edges[self.source_col], edges[self.target_col])
+                component = graph.strong_components()[1]
+                nodes = pd.Index(graph.labels)
+                same = component[nodes.get_indexer(edges[self.source_col])] == component[nodes.get_indexer(edges[self.target_col])]
+                staged = source.stage(edges.loc[same, [self.source_col, self.target_col]].set_axis(["source", "target"], axis=1))
+                transfers = list(source.iter_chunks(chunksize, columns, f"({s}, {r}) IN (SELECT source, target FROM {staged})"))
+            self.transfers = transfers or [pd.DataFrame(columns=columns)]
+
+    def merge(self, other: "ConnectorAccumulator") -> None:
+        if other.date_only is not None:
+            self.date_only = other.date_only if self.date_only is None else self.date_only and other.date_only
+        if self.edges is None:
+            self.edges = other.edges
+        elif other.edges is not None:
+            combined = pd.concat([self.edges, other.edges])
+            self.edges = combined.groupby(level=[0, 1], sort=False, observed=True).sum()
+        self.transfers.extend(other.transfers)
+
+    def finalize(self) -> Dict[str, Any]:
+        if self.edges is None:
+            # Empty input, or filters that leave no rows: the same result as run() on an empty frame.
+            empty = pd.DataFrame({self.source_col: pd.Series([], dtype=object), self.target_col: pd.Series([], dtype=object),
+                                  self.amount_col: pd.Series([], dtype=float), self.date_col: pd.Series([], dtype='datetime64[ns]')})
+            return self.detector.run(empty, self.source_col, self.target_col, self.amount_col, *self.cycle_options, self.date_col,
+                                     *self.temporal_options, *self.graph_options, self.temporal_cycles)
+        edges = self.edges.rename(columns={'sum': self.amount_col}).reset_index()
+        static = self.detector.analyze_edges(edges, self.source_col, self.target_col, self.amount_col,
+                                             *self.cycle_options, *self.graph_options)
+
+        if self.transfers:
+            transfers = pd.concat(self.transfers, ignore_index=True)
+            temporal = self.detector.detect_temporal_cycles(
+                transfers, self.source_col, self.target_col, self.amount_col, self.date_col,
+                *self.temporal_options, *self.cycle_options, self.date_only
+            )
+        elif self.temporal_cycles:
+            temporal = {"error": f"Column '{self.date_col}' not found; temporal cycle detection skipped."}
+        else:
+            temporal = {"error": "Temporal cycle detection disabled."}
+
+        return self.detector._assemble(static, temporal)
@@ -1,8 +1,12 @@
 import numpy as np
 import pandas as pd
-from typing import Dict, Any, List
-from ..core.base import BaseDetector
-from scipy import stats
+from typing import Dict, Any, List, Optional, TYPE_CHECKING
+from ..core.base import BaseDetector, DetectorAccumulator, FLOAT, CATEGORY
+from ..core.instrumentation import section
+from ..utils.sketches import KLLSketch, MomentSketch
+
+if TYPE_CHECKING:
+    from ..utils.sql_source import SQLiteSource
 
 class Mathematician(BaseDetector):
     @property
@@ -13,83 +17,266 @@ class Mathematician(BaseDetector):
     def description(self) -> str:
         return "Statistical anomaly detection including Benford's Law, RSF, and Z-Score."
 
-    def run(self, df: pd.DataFrame, amount_col: str = 'amount', entity_col: str = 'vendor_id') -> Dict[str, Any]:
+    # Rows per block when sketching an in-memory column.
+    SKETCH_BLOCK = 1_000_000
+
+    ENTITY_OUTLIERS_DISABLED = {"error": "Per-entity outlier scoring disabled."}
+
+    # Digits covered by each test and Nigrini's MAD cut-offs (Acceptable, Marginal, Non-conformity).
+    # The last-two-digits test has no published MAD table; it borrows the first-two cut-offs since
+    # both spread over 100 bins (chi-square alone flags every large ledger).
+    BENFORD_TESTS = {
+        "first_digit": {"digits": np.arange(1, 10), "mad_limits": (0.006, 0.012, 0.015)},
+        "second_digit": {"digits": np.arange(0, 10), "mad_limits": (0.008, 0.010, 0.012)},
+        "first_two_digits": {"digits": np.arange(10, 100), "mad_limits": (0.0012, 0.0018, 0.0022)},
+        "last_two_digits": {"digits": np.arange(0, 100), "mad_limits": (0.0012, 0.0018, 0.0022)}
+    }
+
+    def run(self, df: pd.DataFrame, amount_col: str = 'amount', entity_col: str = 'vendor_id',
+            outlier_method: str = 'exact', outlier_accuracy: float = 0.01, entity_outliers: bool = True) -> Dict[str, Any]:
         """
         Runs multiple statistical tests on transaction data.
         """
+        with section("benford"):
+            battery = self.benford_battery(df[amount_col])
+        with section("rsf"):
+            rsf = self.relative_size_factor(df, amount_col, entity_col)
+        with section("outliers"):
+            outliers = self.detect_outliers(df, amount_col, outlier_method, outlier_accuracy)
+        with section("entity_outliers"):
+            per_entity = self.detect_entity_outliers(df, amount_col, entity_col) if entity_outliers else self.ENTITY_OUTLIERS_DISABLED
+
         results = {
             "detector_name": self.name,
-            "benford_test": self.benford_law_test(df[amount_col]),
-            "rsf_test": self.relative_size_factor(df, amount_col, entity_col),
-            "statistical_outliers": self.detect_outliers(df, amount_col)
+            "benford_test": battery.pop("first_digit"),
+            "benford_battery": battery,
+            "rsf_test": rsf,
+            "statistical_outliers": outliers,
+            "entity_outliers": per_entity
         }
         return results
 
+    def columns(self, amount_col: str = 'amount', entity_col: str = 'vendor_id', **kwargs) -> Dict[str, Optional[str]]:
+        return {amount_col: FLOAT, entity_col: CATEGORY}
+
+    def accumulator(self, amount_col: str = 'amount', entity_col: str = 'vendor_id',
+                    outlier_method: str = 'exact', outlier_accuracy: float = 0.01, entity_outliers: bool = True) -> "MathematicianAccumulator":
+        return MathematicianAccumulator(self, amount_col, entity_col, outlier_method, outlier_accuracy, entity_outliers)
+
     def benford_law_test(self, series: pd.Series) -> Dict[str, Any]:
         """
         Applies Benford's Law on the first digit of transaction amounts.
         """
-        clean_series = series[series > 0]
-        first_digits = clean_series.astype(str).str.lstrip('0. ').str[0].astype(int)
-        
-        counts = first_digits.value_counts().reindex(range(1, 10), fill_value=0)
-        observed_freq = counts / len(first_digits)
-        
-        expected_freq = np.log10(1 + 1/np.arange(1, 10))
+        return self.benford_battery(series)["first_digit"]
+
+    def benford_battery(self, series: pd.Series) -> Dict[str, Any]:
+        """
+        Nigrini's digit tests (first, second, first-two and last-two digits) from a
+        single vectorized pass over the amounts, each with chi-square and MAD statistics.
+        """
+        return {test: self._benford_result(test, counts) for test, counts in self.benford_digit_counts(series.to_numpy(dtype=float)).items()}
+
+    @classmethod
+    def benford_digit_counts(cls, values: np.ndarray) -> Dict[str, np.ndarray]:
+        """
+        Digit frequency tables for every Benford test.
+
+        Leading digits come from scaling, not string formatting:
+        e = floor(log10(x)) and x * 10^(1 - e) lies in [10, 100), so its integer part is
+        the first-two-digit number. A relative nudge absorbs float error (0.29 * 100 is
+        28.999...), and a last correction handles log10 landing on the wrong side of a
+        power of ten. This works the same for amounts below 1.
+        Last-two digits use the integer part of amounts >= 100; below that the "last two"
+        are the leading digits themselves and would follow Benford rather than uniform.
+        """
+        positive = values[values > 0]
+        exponent = np.floor(np.log10(positive))
+        first_two = np.floor(positive * 10.0 ** (1 - exponent) * (1 + 1e-12))
+        first_two = np.where(first_two >= 100, first_two // 10, first_two)
+        first_two = np.where(first_two < 10, np.floor(positive * 10.0 ** (2 - exponent) * (1 + 1e-12)), first_two)
+        first_two = first_two.astype(np.int64)
+
+        whole = np.floor(positive[positive >= 100]).astype(np.int64)
+        return cls._digit_tables(first_two, whole % 100)
+
+    @classmethod
+    def _digit_tables(cls, first_two: np.ndarray, last_two: np.ndarray,
+                      first_two_weights: Optional[np.ndarray] = None, last_two_weights: Optional[np.ndarray] = None) -> Dict[str, np.ndarray]:
+        """
+        Frequency tables from first-two and last-two digit numbers. The weights let
+        pre-grouped (digits, count) rows, e.g. from a SQL GROUP BY, stand in for one value per row.
+        """
+        digits = {
+            "first_digit": (first_two // 10, first_two_weights),
+            "second_digit": (first_two % 10, first_two_weights),
+            "first_two_digits": (first_two, first_two_weights),
+            "last_two_digits": (last_two, last_two_weights)
+        }
+        tables = {}
+        for test, spec in cls.BENFORD_TESTS.items():
+            values, weights = digits[test]
+            counts = np.bincount(values, weights=weights, minlength=spec["digits"][-1] + 1)[spec["digits"]]
+            tables[test] = counts.astype(np.int64)
+        return tables
+
+    @classmethod
+    def benford_expected(cls, test: str) -> np.ndarray:
+        digits = cls.BENFORD_TESTS[test]["digits"]
+        if test in ("first_digit", "first_two_digits"):
+            return np.log10(1 + 1 / digits)
+        if test == "second_digit":
+            return np.log10(1 + 1 / (10 * np.arange(1, 10)[:, None] + digits[None, :])).sum(axis=0)
+        return np.full(len(digits), 1 / len(digits))
+
+    def _benford_result(self, test: str, counts: np.ndarray) -> Dict[str, Any]:
+        digits = self.BENFORD_TESTS[test]["digits"]
+        expected_freq = self.benford_expected(test)
+        total = int(counts.sum())
+
+        if total == 0:
+            return {
+                "observed": dict(zip(digits.tolist(), [0.0] * len(digits))),
+                "expected": dict(zip(digits.tolist(), expected_freq.tolist())),
+                "sample_size": 0,
+                "conformity_status": "Insufficient data",
+                "explanation": "No qualifying amounts were available for this digit test."
+            }
+
+        observed_freq = counts / total
         mad = np.mean(np.abs(observed_freq - expected_freq))
-        
+        chi_square = float(np.sum((counts - total * expected_freq) ** 2 / (total * expected_freq)))
+        # scipy.special rather than scipy.stats: the same survival function at a fraction of the import time.
+        from scipy.special import chdtrc
+        p_value = float(chdtrc(len(digits) - 1, chi_square))
+
+        limits = self.BENFORD_TESTS[test]["mad_limits"]
         conformity = "High"
-        if mad > 0.015: conformity = "Non-conformity"
-        elif mad > 0.012: conformity = "Marginal"
-        elif mad > 0.006: conformity = "Acceptable"
+        if mad > limits[2]: conformity = "Non-conformity"
+        elif mad > limits[1]: conformity = "Marginal"
+        elif mad > limits[0]: conformity = "Acceptable"
+
+        explanations = {
+            "first_digit": "Calculates the distribution of first digits. Significant deviation indicates potential data manipulation.",
+            "second_digit": "Second-digit distribution. Deviations often point to rounding or invented amounts.",
+            "first_two_digits": "First-two-digit distribution (10-99). Spikes just below approval limits reveal threshold avoidance.",
+            "last_two_digits": "Last two digits of whole amounts should be uniform. Excess 00 or 50 suggests estimated or fabricated figures."
+        }
 
         return {
-            "observed": observed_freq.to_dict(),
-            "expected": dict(zip(range(1, 10), expected_freq)),
+            "observed": dict(zip(digits.tolist(), observed_freq.tolist())),
+            "expected": dict(zip(digits.tolist(), expected_freq.tolist())),
+            "sample_size": total,
             "mad": float(mad),
+            "chi_square": chi_square,
+            "p_value": p_value,
             "conformity_status": conformity,
-            "explanation": "Calculates the distribution of first digits. Significant deviation indicates potential data manipulation."
+            "explanation": explanations[test]
         }
 
     def relative_size_factor(self, df: pd.DataFrame, amount_col: str, entity_col: str) -> Dict[str, Any]:
         """
         RSF = (Largest Transaction) / (Average of Other Transactions)
+        Needs only per-entity max, sum and count: the average of the others is
+        (sum - max) / (count - 1), so no per-entity lists are built or sorted.
         """
-        grouped = df.groupby(entity_col)[amount_col].apply(list).to_dict()
-        rsf_results = []
-
-        for entity, amounts in grouped.items():
-            if len(amounts) < 2:
-                continue
-            
-            amounts = sorted(amounts)
-            largest = amounts[-1]
-            avg_others = np.mean(amounts[:-1])
-            
-            if avg_others == 0:
-                rsf = 0
-            else:
-                rsf = largest / avg_others
-            
-            if rsf > 10:
-                rsf_results.append({
-                    "entity": entity,
-                    "rsf_value": float(rsf),
-                    "largest_transaction": float(largest),
-                    "average_others": float(avg_others)
-                })
+        aggregates = df.groupby(entity_col, observed=True)[amount_col].agg(['max', 'sum', 'count'])
+        return self._rsf_from_aggregates(aggregates)
+
+    def _rsf_from_aggregates(self, aggregates: pd.DataFrame) -> Dict[str, Any]:
+        eligible = aggregates[aggregates['count'] >= 2]
+        largest = eligible['max'].to_numpy(dtype=float)
+        avg_others = (eligible['sum'].to_numpy(dtype=float) - largest) / (eligible['count'].to_numpy() - 1)
+        rsf = np.divide(largest, avg_others, out=np.zeros_like(largest), where=avg_others != 0)
+
+        flagged = np.flatnonzero(rsf > 10)
+        flagged = flagged[np.argsort(-rsf[flagged], kind='stable')][:10]
+        entities = eligible.index.to_numpy()
+
+        rsf_results = [{
+            "entity": entities[i].item() if hasattr(entities[i], 'item') else entities[i],
+            "rsf_value": float(rsf[i]),
+            "largest_transaction": float(largest[i]),
+            "average_others": float(avg_others[i])
+        } for i in flagged]
 
         return {
-            "high_risk_entities": sorted(rsf_results, key=lambda x: x['rsf_value'], reverse=True)[:10],
+            "high_risk_entities": rsf_results,
             "explanation": "RSF identifies entities whose largest transaction is significantly higher than their average."
         }
 
-    def detect_outliers(self, df: pd.DataFrame, amount_col: str) -> Dict[str, Any]:
+    def detect_entity_outliers(self, df: pd.DataFrame, amount_col: str, entity_col: str,
+                               threshold: float = 3.5, min_transactions: int = 3) -> Dict[str, Any]:
+        """
+        Per-entity robust outliers using the Iglewicz-Hoaglin modified z-score:
+        M = 0.6745 * (x - median) / MAD, with median and MAD taken within each entity.
+        When an entity's MAD is 0, the mean absolute deviation is used instead
+        (M = (x - median) / (1.253314 * MeanAD)).
+        Everything is computed with groupby transforms, with no per-entity Python loops.
+        """
+        amounts = df[amount_col].astype(float)
+        groups = amounts.groupby(df[entity_col], observed=True)
+
+        size = groups.transform('size')
+        median = groups.transform('median')
+        deviation = (amounts - median).abs()
+        deviation_groups = deviation.groupby(df[entity_col], observed=True)
+        mad = deviation_groups.transform('median')
+        mean_ad = deviation_groups.transform('mean')
+
+        centered = (amounts - median).to_numpy()
+        mad = mad.to_numpy()
+        mean_ad = mean_ad.to_numpy()
+        robust_z = np.full(len(amounts), np.nan)
+        use_mad = mad > 0
+        use_mean_ad = ~use_mad & (mean_ad > 0)
+        robust_z[use_mad] = 0.6745 * centered[use_mad] / mad[use_mad]
+        robust_z[use_mean_ad] = centered[use_mean_ad] / (1.253314 * mean_ad[use_mean_ad])
+
+        flagged = np.flatnonzero((np.abs(robust_z) > threshold) & (size.to_numpy() >= min_transactions))
+        top = flagged[np.argsort(-np.abs(robust_z[flagged]), kind='stable')][:10]
+        entities = df[entity_col].to_numpy()
+
+        return {
+            "flagged_transactions": int(len(flagged)),
+            "entities_flagged": int(pd.unique(entities[flagged]).size),
+            "threshold": threshold,
+            "top_outliers": [{
+                "entity": entities[i].item() if hasattr(entities[i], 'item') else entities[i],
+                "amount": float(amounts.iat[i]),
+                "entity_median": float(median.iat[i]),
+                "robust_z": float(robust_z[i])
+            } for i in top],
+            "explanation": "Modified z-score within each entity (median/MAD). Flags transactions far outside that vendor's own normal range, even if they look ordinary globally."
+        }
+
+    def detect_outliers(self, df: pd.DataFrame, amount_col: str, method: str = 'exact', accuracy: float = 0.01) -> Dict[str, Any]:
         """
         Outlier detection using standard Z-Score and IQR.
+        method='exact' sorts the full column; method='sketch' gets Q1/Q3 from a KLL sketch
+        (rank error <= accuracy) and mean/std from a moment sketch in one streaming pass,
+        then counts outliers and collects the top values exactly in a second pass.
         """
+        if method == 'sketch':
+            values = df[amount_col].to_numpy(dtype=float)
+            moments = MomentSketch()
+            quantiles = KLLSketch.from_accuracy(accuracy, seed=0)
+            for start in range(0, len(values), self.SKETCH_BLOCK):
+                moments.update(values[start:start + self.SKETCH_BLOCK])
+                quantiles.update(values[start:start + self.SKETCH_BLOCK])
+
+            tally = OutlierTally.from_sketches(moments, quantiles)
+            for start in range(0, len(values), self.SKETCH_BLOCK):
+                tally.update(values[start:start + self.SKETCH_BLOCK])
+            return self._outliers_from_tally(tally)
+
+        if method != 'exact':
+            raise ValueError(f"Unsupported outlier method: {method}")
+
         data = df[amount_col]
-        z_scores = np.abs(stats.zscore(data))
+        values = data.to_numpy(dtype=float)
+        # Constant amounts (e.g. a single row) have std 0: no z-score outliers.
+        with np.errstate(divide='ignore', invalid='ignore'):
+            z_scores = np.abs((values - values.mean()) / values.std()) if len(values) else values
         z_outliers = df[z_scores > 3]
         
         Q1 = data.quantile(0.25)
@@ -98,8 +285,244 @@ class Mathematician(BaseDetector):
         iqr_outliers = df[(data < (Q1 - 1.5 * IQR)) | (data > (Q3 + 1.5 * IQR))]
 
         return {
+            "method": "exact",
             "z_score_outliers_count": len(z_outliers),
             "iqr_outliers_count": len(iqr_outliers),
             "top_outliers": z_outliers.nlargest(5, amount_col)[amount_col].to_list(),
             "explanation": "Z-Score (>3) and IQR identify statistical extremes in transaction values."
         }
+
+    def detect_outliers_sql(self, source: "SQLiteSource", amount_col: str) -> Dict[str, Any]:
+        """
+        detect_outliers(method='exact') computed inside SQLite. Mean and population
+        standard deviation come from two aggregate queries. One ranking query returns the
+        two order statistics around each quartile's position, which are interpolated
+        linearly as pandas does. Counts and the top values are further queries, so no
+        amounts reach Python.
+        """
+        a = source.quote(amount_col)
+        present = f"{a} IS NOT NULL"
+        n, mean = source.query(f"COUNT({a}) AS n, AVG({a}) AS mean", present).iloc[0]
+        n = int(n)
+        if n == 0:
+            return {"method": "exact", "z_score_outliers_count": 0, "iqr_outliers_count": 0, "top_outliers": [],
+                    "explanation": "Z-Score (>3) and IQR identify statistical extremes in transaction values."}
+        # Placeholders may only appear in where and tail, so the mean goes in as a literal.
+        std = float(np.sqrt(source.query(f"AVG(({a} - {float(mean)!r}) * ({a} - {float(mean)!r})) AS var", present).iloc[0, 0]))
+
+        positions = [(n - 1) * q for q in (0.25, 0.75)]
+        ranks = sorted({min(int(p) + step, n - 1) for p in positions for step in (0, 1)})
+        ordered, params = source.sql(f"{a} AS v, ROW_NUMBER() OVER (ORDER BY {a}) - 1 AS rank", present)
+        ranked = pd.read_sql_query(f"SELECT rank, v FROM ({ordered}) WHERE rank IN ({', '.join(map(str, ranks))})", source.conn, params=params)
+        ranked = ranked.set_index("rank")["v"].astype(float)
+        q1, q3 = (float(np.quantile(ranked.loc[[int(p), min(int(p) + 1, n - 1)]].to_numpy(), p - int(p))) for p in positions)
+        iqr = q3 - q1
+
+        z_outlier = f"ABS({a} - ?) / ? > 3"
+        z_count = int(source.query("COUNT(*) AS n", f"{present} AND {z_outlier}", params=(mean, std)).iloc[0, 0]) if std > 0 else 0
+        iqr_count = int(source.query("COUNT(*) AS n", f"{a} < ? OR {a} > ?", params=(q1 - 1.5 * iqr, q3 + 1.5 * iqr)).iloc[0, 0])
+        top = source.query(f"{a} AS v", f"{present} AND {z_outlier}", f"ORDER BY {a} DESC LIMIT 5", params=(mean, std))["v"].tolist() if std > 0 else []
+
+        return {
+            "method": "exact",
+            "z_score_outliers_count": z_count,
+            "iqr_outliers_count": iqr_count,
+            "top_outliers": top,
+            "explanation": "Z-Score (>3) and IQR identify statistical extremes in transaction values."
+        }
+
+    def _outliers_from_tally(self, tally: "OutlierTally") -> Dict[str, Any]:
+        return {
+            "method": "sketch",
+            "z_score_outliers_count": tally.z_count,
+            "iqr_outliers_count": tally.iqr_count,
+            "top_outliers": sorted(tally.top.tolist(), reverse=True),
+            "q1": tally.q1,
+            "q3": tally.q3,
+            "quantile_rank_error": tally.rank_error,
+            "explanation": "Z-Score (>3) and IQR identify statistical extremes in transaction values. Q1/Q3 come from a KLL sketch whose rank error is at most quantile_rank_error (99% confidence). Mean, standard deviation and all counts are exact."
+        }
+
+class OutlierTally:
+    """
+    Second pass of sketch-based outlier detection: with mean/std and Q1/Q3 fixed from
+    the first pass, counts z-score and IQR outliers and keeps the largest z-outliers.
+    Tallies from separate chunks merge by addition.
+    """
+    TOP_N = 5
+
+    def __init__(self, mean: float, std: float, q1: float, q3: float, rank_error: float):
+        self.mean, self.std, self.q1, self.q3, self.rank_error = mean, std, q1, q3, rank_error
+        iqr = q3 - q1
+        self.lower, self.upper = q1 - 1.5 * iqr, q3 + 1.5 * iqr
+        self.z_count = 0
+        self.iqr_count = 0
+        self.top = np.empty(0)
+
+    @classmethod
+    def from_sketches(cls, moments: MomentSketch, quantiles: KLLSketch) -> "OutlierTally":
+        return cls(moments.mean, moments.std, quantiles.quantile(0.25), quantiles.quantile(0.75), quantiles.rank_error)
+
+    def update(self, values: np.ndarray) -> None:
+        with np.errstate(divide='ignore', invalid='ignore'):
+            z_outliers = values[np.abs(values - self.mean) / self.std > 3]
+        self.z_count += int(z_outliers.size)
+        self.iqr_count += int(((values < self.lower) | (values > self.upper)).sum())
+        self._keep_top(z_outliers)
+
+    def merge(self, other: "OutlierTally") -> None:
+        self.z_count += other.z_count
+        self.iqr_count += other.iqr_count
+        self._keep_top(other.top)
+
+    def _keep_top(self, values: np.ndarray) -> None:
+        candidates = np.concatenate([self.top, values])
+        if candidates.size > self.TOP_N:
+            candidates = np.partition(candidates, -self.TOP_N)[-self.TOP_N:]
+        self.top = candidates
+
+class MathematicianAccumulator(DetectorAccumulator):
+    """
+    Mergeable state of The Mathematician: Benford digit tables, per-entity
+    (max, sum, count) for RSF, and, with outlier_method='sketch', a moment sketch plus a
+    KLL quantile sketch followed by an exact counting pass (OutlierTally).
+    Exact global quantiles and the per-entity medians need order statistics, so those
+    modes keep the amount (and entity) columns of each chunk. Use sketch mode with
+    entity_outliers=False to keep memory independent of the row count.
+    """
+    def __init__(self, detector: Mathematician, amount_col: str, entity_col: str,
+                 outlier_method: str = 'exact', outlier_accuracy: float = 0.01, entity_outliers: bool = True):
+        if outlier_method not in ('exact', 'sketch'):
+            raise ValueError(f"Unsupported outlier method: {outlier_method}")
+
+        self.detector = detector
+        self.amount_col = amount_col
+        self.entity_col = entity_col
+        self.outlier_method = outlier_method
+        self.outlier_accuracy = outlier_accuracy
+        self.entity_outliers = entity_outliers
+        self.rows = 0
+        self.digit_counts: Dict[str, np.ndarray] = {}
+        self.rsf_aggregates: pd.DataFrame = None
+        self.columns: List[pd.DataFrame] = []
+        self.moments = MomentSketch()
+        self.quantiles = KLLSketch.from_accuracy(outlier_accuracy, seed=0)
+        self.tally: OutlierTally = None
+        # Set when the exact outliers were computed elsewhere (see update_from_sql).
+        self.outliers: Dict[str, Any] = None
+
+    def _partial(self) -> "MathematicianAccumulator":
+        return MathematicianAccumulator(self.detector, self.amount_col, self.entity_col,
+                                        self.outlier_method, self.outlier_accuracy, self.entity_outliers)
+
+    def update(self, chunk: pd.DataFrame) -> None:
+        partial = self._partial()
+        partial.rows = len(chunk)
+        partial.digit_counts = self.detector.benford_digit_counts(chunk[self.amount_col].to_numpy(dtype=float))
+        partial.rsf_aggregates = chunk.groupby(self.entity_col, observed=True)[self.amount_col].agg(['max', 'sum', 'count'])
+        partial._add_rows(chunk)
+        self.merge(partial)
+
+    def _add_rows(self, chunk: pd.DataFrame) -> None:
+        """The row-level part of update(): retained columns and outlier sketches."""
+        if self.entity_outliers:
+            self.columns.append(chunk[[self.entity_col, self.amount_col]].copy())
+        elif self.outlier_method == 'exact':
+            self.columns.append(chunk[[self.amount_col]].copy())
+
+        if self.outlier_method == 'sketch':
+            amounts = chunk[self.amount_col].to_numpy(dtype=float)
+            self.moments.update(amounts)
+            self.quantiles.update(amounts)
+
+    def update_from_sql(self, source: "SQLiteSource", chunksize: int) -> None:
+        """
+        Digit tables, RSF aggregates and exact global outliers are computed by SQLite.
+        Leading digits come from printf('%.14e'), whose 15 significant digits round away
+        the float error that benford_digit_counts() absorbs with its nudge. Only the
+        per-entity outliers (entity and amount) and sketch mode (amount) stream rows.
+        """
+        a, e = source.quote(self.amount_col), source.quote(self.entity_col)
+        self.rows = source.totals(self.amount_col)[0]
+        with section("benford"):
+            digits = source.query(
+                f"CAST(substr(printf('%.14e', {a}), 1, 1) || substr(printf('%.14e', {a}), 3, 1) AS INTEGER) AS first_two, "
+                f"CASE WHEN {a} >= 100 THEN CAST({a} AS INTEGER) % 100 END AS last_two, COUNT(*) AS n",
+                f"{a} > 0", "GROUP BY 1, 2"
+            )
+            whole = digits["last_two"].notna().to_numpy()
+            self.digit_counts = self.detector._digit_tables(
+                digits["first_two"].to_numpy(dtype=np.int64), digits["last_two"][whole].to_numpy(dtype=np.int64),
+                digits["n"].to_numpy(dtype=float), digits["n"][whole].to_numpy(dtype=float)
+            )
+
+        with section("rsf"):
+            self.rsf_aggregates = source.query(
+                f"{e} AS {e}, MAX({a}) AS max, TOTAL({a}) AS sum, COUNT({a}) AS count", f"{e} IS NOT NULL", f"GROUP BY {e} ORDER BY {e}"
+            ).set_index(self.entity_col)
+
+        with section("outliers"):
+            if self.outlier_method == 'exact':
+                self.outliers = self.detector.detect_outliers_sql(source, self.amount_col)
+
+        with section("row_scan"):
+            columns = [self.entity_col, self.amount_col] if self.entity_outliers else [self.amount_col] if self.outlier_method == 'sketch' else []
+            if columns:
+                for chunk in source.iter_chunks(chunksize, columns):
+                    self._add_rows(chunk)
+            if self.needs_second_pass:
+                for chunk in source.iter_chunks(chunksize, [self.amount_col]):
+                    self.update_second_pass(chunk)
+
+    def merge(self, other: "MathematicianAccumulator") -> None:
+        self.rows += other.rows
+        for test, counts in other.digit_counts.items():
+            self.digit_counts[test] = self.digit_counts[test] + counts if test in self.digit_counts else counts
+
+        if self.rsf_aggregates is None:
+            self.rsf_aggregates = other.rsf_aggregates
+        elif other.rsf_aggregates is not None:
+            combined = pd.concat([self.rsf_aggregates, other.rsf_aggregates])
+            self.rsf_aggregates = combined.groupby(level=0, observed=True).agg({'max': 'max', 'sum': 'sum', 'count': 'sum'})
+
+        self.columns.extend(other.columns)
+        self.moments.merge(other.moments)
+        self.quantiles.merge(other.quantiles)
+        if other.tally is not None:
+            if self.tally is None:
+                self.tally = OutlierTally.from_sketches(self.moments, self.quantiles)
+            self.tally.merge(other.tally)
+
+    @property
+    def needs_second_pass(self) -> bool:
+        return self.outlier_method == 'sketch'
+
+    def update_second_pass(self, chunk: pd.DataFrame) -> None:
+        if self.tally is None:
+            self.tally = OutlierTally.from_sketches(self.moments, self.quantiles)
+        self.tally.update(chunk[self.amount_col].to_numpy(dtype=float))
+
+    def finalize(self) -> Dict[str, Any]:
+        detector = self.detector
+        if not self.rows:
+            # Empty input, or filters that leave no rows: the same result as run() on an empty frame.
+            empty = pd.DataFrame({self.entity_col: pd.Series([], dtype=object), self.amount_col: pd.Series([], dtype=float)})
+            return detector.run(empty, self.amount_col, self.entity_col, self.outlier_method, self.outlier_accuracy, self.entity_outliers)
+        battery = {test: detector._benford_result(test, counts) for test, counts in self.digit_counts.items()}
+        df = pd.concat(self.columns, ignore_index=True) if self.columns else None
+
+        if self.outlier_method == 'sketch':
+            outliers = detector._outliers_from_tally(self.tally or OutlierTally.from_sketches(self.moments, self.quantiles))
+        elif self.outliers is not None:
+            outliers = self.outliers
+        else:
+            outliers = detector.detect_outliers(df, self.amount_col)
+
+        return {
+            "detector_name": detector.name,
+            "benford_test": battery.pop("first_digit"),
+            "benford_battery": battery,
+            "rsf_test": detector._rsf_from_aggregates(self.rsf_aggregates),
+            "statistical_outliers": outliers,
+            "entity_outliers": detector.detect_entity_outliers(df, self.amount_col, self.entity_col) if self.entity_outliers else detector.ENTITY_OUTLIERS_DISABLED
+        }
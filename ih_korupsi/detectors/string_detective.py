@@ -1,6 +1,13 @@
 import pandas as pd
-from typing import Dict, Any, List, Tuple
-from ..core.base import BaseDetector
+from itertools import groupby
+from typing import Dict, Any, List, Optional, Tuple, Iterator, TYPE_CHECKING
+from ..core.base import BaseDetector, DetectorAccumulator, CATEGORY
+from ..core.instrumentation import section
+from ..utils.qgram_index import QGramIndex, choose_q
+from ..utils.edit_distance import similarity_ratios
+
+if TYPE_CHECKING:
+    from ..utils.sql_source import SQLiteSource
 
 class StringDetective(BaseDetector):
     @property
@@ -11,23 +18,39 @@ class StringDetective(BaseDetector):
     def description(self) -> str:
         return "Detects near-duplicate entity names (Ghost Vendors) using Levenshtein distance."
 
-    def run(self, df: pd.DataFrame, name_col: str = 'vendor_name') -> Dict[str, Any]:
+    SIMILARITY_THRESHOLD = 0.85
+
+    def run(self, df: pd.DataFrame, name_col: str = 'vendor_name', method: str = 'index') -> Dict[str, Any]:
         """
         Identifies similar names.
+        method='index' scores only the pairs produced by the q-gram candidate index, using
+        the batched bit-parallel kernel;
+        method='brute' compares every pair with the reference levenshtein_ratio and is kept
+        to cross-check the fast path.
+        """
+        unique_names = [str(name) for name in df[name_col].unique().tolist()]
+        return self.match_names(unique_names, method)
+
+    def match_names(self, unique_names: List[str], method: str = 'index') -> Dict[str, Any]:
         """
-        unique_names = df[name_col].unique().tolist()
+        Scores a list of distinct names and builds the report.
+        """
+        if method == 'brute':
+            scored = self.score_pairs_reference(unique_names, self.all_pairs(unique_names))
+        elif method == 'index':
+            with section("candidates"):
+                pairs = self.indexed_pairs(unique_names)
+            scored = self.score_pairs(unique_names, pairs)
+        else:
+            raise ValueError(f"Unsupported matching method: {method}")
+
         potential_duplicates = []
-        
-        for i in range(len(unique_names)):
-            for j in range(i + 1, len(unique_names)):
-                name1 = str(unique_names[i])
-                name2 = str(unique_names[j])
-                score = self.levenshtein_ratio(name1.lower(), name2.lower())
-                
-                if 0.85 <= score < 1.0:
+        with section("scoring"):
+            for i, j, score in scored:
+                if self.SIMILARITY_THRESHOLD <= score < 1.0:
                     potential_duplicates.append({
-                        "name_1": name1,
-                        "name_2": name2,
+                        "name_1": unique_names[i],
+                        "name_2": unique_names[j],
                         "similarity_score": float(score)
                     })
 
@@ -37,6 +60,54 @@ class StringDetective(BaseDetector):
             "explanation": "Finds names with high similarity. This often reveals 'Ghost Vendors' or split identities."
         }
 
+    def columns(self, name_col: str = 'vendor_name', **kwargs) -> Dict[str, Optional[str]]:
+        return {name_col: CATEGORY}
+
+    def accumulator(self, name_col: str = 'vendor_name', method: str = 'index') -> "StringDetectiveAccumulator":
+        return StringDetectiveAccumulator(self, name_col, method)
+
+    def all_pairs(self, names: List[str]):
+        """
+        Brute-force candidate generation: every (i, j) with i < j.
+        """
+        for i in range(len(names)):
+            for j in range(i + 1, len(names)):
+                yield i, j
+
+    def score_pairs_reference(self, names: List[str], pairs) -> Iterator[Tuple[int, int, float]]:
+        """
+        Scores pairs one at a time with the hand-rolled full-matrix levenshtein_ratio.
+        """
+        for i, j in pairs:
+            yield i, j, self.levenshtein_ratio(names[i].lower(), names[j].lower())
+
+    def score_pairs(self, names: List[str], pairs: List[Tuple[int, int]]) -> Iterator[Tuple[int, int, float]]:
+        """
+        Scores sorted (i, j) pairs by batching every candidate j of the same i into one
+        bit-parallel call. Pairs that cannot reach the threshold are dropped early.
+        """
+        lowered = [name.lower() for name in names]
+        for i, group in groupby(pairs, key=lambda pair: pair[0]):
+            partners = [j for _, j in group]
+            ratios = similarity_ratios(lowered[i], [lowered[j] for j in partners], self.SIMILARITY_THRESHOLD)
+            for j, ratio in zip(partners, ratios):
+                if ratio is not None:
+                    yield i, j, ratio
+
+    def indexed_pairs(self, names: List[str]) -> List[Tuple[int, int]]:
+        """
+        Candidate generation through a q-gram prefix-filter index.
+        Falls back to all pairs when the threshold is too low for the count filter
+        to guarantee completeness.
+        """
+        lowered = [name.lower() for name in names]
+        q = choose_q(self.SIMILARITY_THRESHOLD)
+        if q is not None:
+            index = QGramIndex(lowered, self.SIMILARITY_THRESHOLD, q)
+            if index.is_exhaustive():
+                return index.candidate_pairs()
+        return list(self.all_pairs(names))
+
     def levenshtein_ratio(self, s1: str, s2: str) -> float:
         """
         Hand-rolled Levenshtein distance ratio.
@@ -62,3 +133,31 @@ class StringDetective(BaseDetector):
 
         ratio = ((len(s1) + len(s2)) - distance[row][col]) / (len(s1) + len(s2))
         return ratio
+
+class StringDetectiveAccumulator(DetectorAccumulator):
+    """
+    Mergeable state of String Detective: the distinct names in first-seen order.
+    """
+    def __init__(self, detector: StringDetective, name_col: str, method: str):
+        self.detector = detector
+        self.name_col = name_col
+        self.method = method
+        self.names: Dict[str, None] = {}
+
+    def update(self, chunk: pd.DataFrame) -> None:
+        for name in chunk[self.name_col].unique().tolist():
+            self.names.setdefault(str(name), None)
+
+    def update_from_sql(self, source: "SQLiteSource", chunksize: int) -> None:
+        """The distinct names come from one GROUP BY, in first-seen order when the table has a rowid."""
+        n = source.quote(self.name_col)
+        order = " ORDER BY MIN(rowid)" if source.has_rowid else ""
+        for name in source.query(f"{n} AS name", f"{n} IS NOT NULL", f"GROUP BY {n}{order}")["name"].tolist():
+            self.names.setdefault(str(name), None)
+
+    def merge(self, other: "StringDetectiveAccumulator") -> None:
+        for name in other.names:
+            self.names.setdefault(name, None)
+
+    def finalize(self) -> Dict[str, Any]:
+        return self.detector.match_names(list(self.names), self.method)
@@ -0,0 +1,143 @@
+import time
+from collections import deque
+from typing import Dict, Iterator, List, Optional, Sequence
+
+def strongly_connected_components(adjacency: Sequence[Sequence[int]]) -> List[List[int]]:
+    """
+    Iterative Tarjan over integer adjacency lists (no recursion limit on deep graphs).
+    """
+    n = len(adjacency)
+    index = [-1] * n
+    low = [0] * n
+    on_stack = [False] * n
+    stack: List[int] = []
+    components: List[List[int]] = []
+    counter = 0
+
+    for root in range(n):
+        if index[root] != -1:
+            continue
+        work = [(root, iter(adjacency[root]))]
+        index[root] = low[root] = counter
+        counter += 1
+        stack.append(root)
+        on_stack[root] = True
+
+        while work:
+            v, successors = work[-1]
+            advanced = False
+            for w in successors:
+                if index[w] == -1:
+                    index[w] = low[w] = counter
+                    counter += 1
+                    stack.append(w)
+                    on_stack[w] = True
+                    work.append((w, iter(adjacency[w])))
+                    advanced = True
+                    break
+                if on_stack[w]:
+                    low[v] = min(low[v], index[w])
+            if advanced:
+                continue
+
+            work.pop()
+            if work:
+                parent = work[-1][0]
+                low[parent] = min(low[parent], low[v])
+            if low[v] == index[v]:
+                component = []
+                while True:
+                    w = stack.pop()
+                    on_stack[w] = False
+                    component.append(w)
+                    if w == v:
+                        break
+                components.append(component)
+
+    return components
+
+class CycleEnumerator:
+    """
+    Lazily yields the simple cycles of a directed graph given as integer adjacency lists.
+
+    The search runs inside each strongly connected component only, since no cycle can
+    cross component borders. Every cycle is rooted at its lowest-ranked node, so
+    each one is produced exactly once. A reverse BFS from the root gives every node's
+    distance back to it. A branch is cut as soon as it cannot close the loop within
+    max_length edges, which also skips nodes that cannot reach the root at all.
+
+    Iteration stops when the time budget runs out. After iteration, `exhausted` is True
+    only when every cycle was produced, i.e. the count is exact.
+    """
+    CHECK_EVERY = 1024
+
+    def __init__(self, adjacency: Sequence[Sequence[int]], max_length: Optional[int] = None, time_budget: Optional[float] = None):
+        self.adjacency = adjacency
+        self.max_length = max_length
+        self.time_budget = time_budget
+        self.exhausted = False
+        self.timed_out = False
+
+        self._reverse: List[List[int]] = [[] for _ in adjacency]
+        for v, successors in enumerate(adjacency):
+            for w in successors:
+                self._reverse[w].append(v)
+
+    def __iter__(self) -> Iterator[List[int]]:
+        deadline = None if self.time_budget is None else time.perf_counter() + self.time_budget
+        steps = 0
+
+        for component in strongly_connected_components(self.adjacency):
+            if len(component) == 1 and component[0] not in self.adjacency[component[0]]:
+                continue
+
+            component.sort()
+            rank = {v: r for r, v in enumerate(component)}
+
+            for root in component:
+                distance = self._distances_to(root, rank)
+                path = [root]
+                on_path = {root}
+                frames = [iter(self.adjacency[root])]
+
+                while frames:
+                    steps += 1
+                    if deadline is not None and steps % self.CHECK_EVERY == 0 and time.perf_counter() > deadline:
+                        self.timed_out = True
+                        return
+
+                    for w in frames[-1]:
+                        if w == root:
+                            yield list(path)
+                            continue
+                        if w in on_path or w not in distance:
+                            continue
+                        if self.max_length is not None and len(path) + distance[w] > self.max_length:
+                            continue
+                        path.append(w)
+                        on_path.add(w)
+                        frames.append(iter(self.adjacency[w]))
+                        break
+                    else:
+                        frames.pop()
+                        on_path.discard(path.pop())
+
+        self.exhausted = True
+
+    def _distances_to(self, root: int, rank: Dict[int, int]) -> Dict[int, int]:
+        """
+        Edge distance from every higher-ranked node of the component back to root,
+        limited to max_length hops.
+        """
+        root_rank = rank[root]
+        distance: Dict[int, int] = {}
+        queue = deque([(root, 0)])
+        while queue:
+            v, d = queue.popleft()
+            if self.max_length is not None and d >= self.max_length:
+                continue
+            for u in self._reverse[v]:
+                if rank.get(u, -1) > root_rank and u not in distance:
+                    distance[u] = d + 1
+                    queue.append((u, d + 1))
+        return distance
@@ -1,67 +1,103 @@
 import pandas as pd
 import json
-import sqlite3
-from typing import Union, Optional
+from typing import Dict, Union, Optional, Iterator
+from .sql_source import SQLiteSource
+from ..core.base import FLOAT, CATEGORY, DATETIME
+
+# Input columns and their preferred dtypes, as returned by FraudEngine.columns().
+ColumnSpec = Optional[Dict[str, Optional[str]]]
 
 class DataLoader:
     """
     Handles data ingestion from various formats.
+
+    Given a column spec (FraudEngine.columns()), only those columns are read, where
+    present, and converted once at load: FLOAT columns to float64, string CATEGORY
+    columns to category and DATETIME columns parsed. Numeric id columns keep their type,
+    so ids in the report are unchanged. A column that does not convert is left as read,
+    for the detector that needs it to report the error. Without a spec every column is
+    read as the reader infers it.
     """
     @staticmethod
-    def load(source: str, type: str = 'csv') -> pd.DataFrame:
+    def load(source: str, type: str = 'csv', columns: ColumnSpec = None) -> pd.DataFrame:
         if type == 'csv':
-            return pd.read_csv(source)
+            try:
+                df = pd.read_csv(source, **DataLoader._csv_options(columns))
+            except ValueError:
+                # A non-numeric amount column: read it as it is.
+                df = pd.read_csv(source, **DataLoader._csv_options(columns, numeric=False))
         elif type == 'json':
-            return pd.read_json(source)
+            df = pd.read_json(source)
         elif type == 'sql':
-            conn = sqlite3.connect(source)
-            df = pd.read_sql_query("SELECT * FROM transactions", conn)
-            conn.close()
-            return df
+            with SQLiteSource(source) as sql:
+                df = sql.read([col for col in sql.columns if col in columns] if columns is not None else None)
         else:
             raise ValueError(f"Unsupported file type: {type}")
+        return DataLoader.apply_columns(df, columns)
 
     @staticmethod
-    def generate_sample_data(rows: int = 100) -> pd.DataFrame:
+    def iter_chunks(source: str, type: str = 'csv', chunksize: int = 100_000, columns: ColumnSpec = None) -> Iterator[pd.DataFrame]:
         """
-        Generates synthetic data with intentional anomalies.
+        Reads the source in chunks of at most `chunksize` rows, for FraudEngine.process_stream.
+        Chunked JSON input must be JSON Lines (one record per line).
         """
-        import random
-        from datetime import datetime, timedelta
-
-        # Keeping Indonesian names as part of the 'IH-Korupsi' branding context
-        vendors = ["PT. Maju Jaya", "PT. Maju  Jaya", "CV. Sumber Makmur", "PT. Berdikari", "Dinas Kesehatan"]
-        data = []
-        
-        for i in range(rows):
-            # Normal transactions
-            date = datetime(2025, 1, 1) + timedelta(days=random.randint(0, 360))
-            amount = random.uniform(1000, 50000)
-            vendor = random.choice(vendors)
-            sender = "Treasury_Dept"
-            
-            # Injecting Benford Anomaly (too many 5s)
-            if i % 10 == 0:
-                amount = float(f"5{random.randint(0, 9)}{random.randint(0, 9)}000")
-            
-            # Injecting RSF Anomaly
-            if i == 50:
-                amount = 10000000
-                vendor = "PT. Berdikari"
+        if type == 'csv':
+            # No float dtype here: a bad value would only surface mid-stream.
+            chunks = pd.read_csv(source, chunksize=chunksize, **DataLoader._csv_options(columns, numeric=False))
+            yield from (DataLoader.apply_columns(chunk, columns) for chunk in chunks)
+        elif type == 'json':
+            with pd.read_json(source, lines=True, chunksize=chunksize) as reader:
+                yield from (DataLoader.apply_columns(chunk, columns) for chunk in reader)
+        elif type == 'sql':
+            with SQLiteSource(source) as sql:
+                selected = [col for col in sql.columns if col in columns] if columns is not None else None
+                yield from (DataLoader.apply_columns(chunk, columns) for chunk in sql.iter_chunks(chunksize, selected))
+        else:
+            raise ValueError(f"Unsupported file type: {type}")
 
-            # Injecting Fiscal Cliff (December dumping)
-            if i > 80:
-                date = datetime(2025, 12, 28)
-                amount = random.uniform(500000, 900000)
+    @staticmethod
+    def _csv_options(columns: ColumnSpec, numeric: bool = True) -> Dict:
+        if columns is None:
+            return {}
+        options = {"usecols": lambda col: col in columns}
+        if numeric:
+            options["dtype"] = {col: FLOAT for col, dtype in columns.items() if dtype == FLOAT}
+        return options
 
-            data.append({
-                "transaction_id": i,
-                "date": date,
-                "amount": amount,
-                "vendor_name": vendor,
-                "vendor_id": vendors.index(vendor),
-                "sender_id": sender,
-                "receiver_id": vendor
-            })
+    @staticmethod
+    def apply_columns(df: pd.DataFrame, columns: ColumnSpec) -> pd.DataFrame:
+        """Projects df onto the spec's columns and converts them to their preferred dtypes."""
+        if columns is None:
+            return df
+        df = df[[col for col in df.columns if col in columns]]
+        converted = {}
+        for col in df.columns:
+            series, dtype = df[col], columns[col]
+            try:
+                if dtype == FLOAT and series.dtype != FLOAT:
+                    converted[col] = series.astype(FLOAT)
+                elif (dtype == CATEGORY and not isinstance(series.dtype, pd.CategoricalDtype)
+                      and pd.api.types.is_string_dtype(series)):
+                    converted[col] = series.astype(CATEGORY)
+                elif dtype == DATETIME and not pd.api.types.is_datetime64_any_dtype(series):
+                    converted[col] = pd.to_datetime(series)
+            except (ValueError, TypeError):
+                continue
+        return df.assign(**converted) if converted else df
 
-        return pd.DataFrame(data)
+    @staticmethod
+    def generate_sample_data(rows: int = 100, seed: Optional[int] = None) -> pd.DataFrame:
+        """
+        Generates synthetic data with intentional anomalies.
+        See utils.synthetic.generate_ledger for the anomaly model and ground-truth labels.
+        """
+        from .synthetic import generate_ledger, max_planted_rows
+        # Fewer planted anomalies in small samples, so they stay at most half of the rows;
+        # the tiniest samples get none.
+        tiers = ([{}] if rows >= 1000 else []) + [
+            {"cycles": 2, "rsf_vendors": 2, "velocity_vendors": 2, "burst_size": 10, "dumping_vendors": 2},
+            {"cycles": 1, "rsf_vendors": 1, "velocity_vendors": 1, "burst_size": 5, "dumping_vendors": 1},
+            {"cycles": 0, "rsf_vendors": 0, "velocity_vendors": 0, "burst_size": 0, "dumping_vendors": 0},
+        ]
+        planted = next(tier for tier in tiers if max_planted_rows(**tier) <= rows // 2)
+        return generate_ledger(rows, seed=seed, **planted)[0]
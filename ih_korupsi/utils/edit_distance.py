@@ -0,0 +1,83 @@
+from typing import Dict, List, Optional, Sequence
+from .qgram_index import max_edit_distance
+
+def pattern_masks(pattern: str) -> Dict[str, int]:
+    """
+    Builds the Myers match table: for every character, a bit-vector with bit i set
+    when pattern[i] equals that character.
+    """
+    masks: Dict[str, int] = {}
+    for i, ch in enumerate(pattern):
+        masks[ch] = masks.get(ch, 0) | (1 << i)
+    return masks
+
+def bounded_distance(masks: Dict[str, int], m: int, text: str, max_distance: int) -> Optional[int]:
+    """
+    Myers/Hyyrö bit-parallel Levenshtein distance between a pattern of length m
+    (given by its match table) and text. Each column of the DP matrix is encoded as
+    vertical +1/-1 delta bit-vectors, so one text character costs a handful of
+    integer operations regardless of m (Python ints act as arbitrarily wide words).
+
+    Only the bottom cell D[m][j] is tracked. It can drop by at most 1 per remaining
+    column, so once D[m][j] - (n - j) exceeds max_distance the pair can no longer
+    qualify and None is returned without scanning the rest of the text.
+    """
+    n = len(text)
+    if m == 0:
+        return n if n <= max_distance else None
+
+    full = (1 << m) - 1
+    last = 1 << (m - 1)
+    pv = full
+    mv = 0
+    score = m
+
+    for j, ch in enumerate(text, 1):
+        eq = masks.get(ch, 0)
+        xv = eq | mv
+        xh = (((eq & pv) + pv) ^ pv) | eq
+        ph = (mv | ~(xh | pv)) & full
+        mh = pv & xh
+
+        if ph & last:
+            score += 1
+        elif mh & last:
+            score -= 1
+
+        if score - (n - j) > max_distance:
+            return None
+
+        # Row 0 of a global alignment grows by one per column, hence the carried-in 1.
+        ph = ((ph << 1) | 1) & full
+        mh = (mh << 1) & full
+        pv = (mh | ~(xv | ph)) & full
+        mv = ph & xv
+
+    return score if score <= max_distance else None
+
+def similarity_ratios(pattern: str, candidates: Sequence[str], threshold: float) -> List[Optional[float]]:
+    """
+    Scores one name against many candidates in a single call, reusing the pattern's
+    match table. Returns the same ratio as StringDetective.levenshtein_ratio,
+    ((len1 + len2) - distance) / (len1 + len2), for every candidate that can reach
+    threshold, and None for the rest.
+    """
+    masks = pattern_masks(pattern)
+    m = len(pattern)
+    ratios: List[Optional[float]] = []
+
+    for text in candidates:
+        total = m + len(text)
+        if total == 0:
+            ratios.append(1.0)
+            continue
+
+        limit = max_edit_distance(m, len(text), threshold)
+        if abs(m - len(text)) > limit:
+            ratios.append(None)
+            continue
+
+        distance = bounded_distance(masks, m, text, limit)
+        ratios.append(None if distance is None else (total - distance) / total)
+
+    return ratios
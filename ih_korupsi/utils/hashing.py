@@ -0,0 +1,36 @@
+import hashlib
+import mmap
+import os
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Iterable, Optional
+
+# Files at least this large are hashed through a memory map in a single update(),
+# which avoids copying the file through Python buffers and lets hashlib release the
+# GIL for the whole file, so several files hash in parallel on a thread pool.
+MMAP_THRESHOLD = 8 * 1024 * 1024
+
+def file_sha256(file_path: str, block_size: int = 65536, mmap_threshold: int = MMAP_THRESHOLD) -> Optional[str]:
+    """SHA-256 of a file as a 0x-prefixed hex string, or None if the file does not exist."""
+    sha256 = hashlib.sha256()
+    try:
+        with open(file_path, 'rb') as f:
+            if os.fstat(f.fileno()).st_size >= mmap_threshold > 0:
+                with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as m:
+                    sha256.update(m)
+            else:
+                while True:
+                    data = f.read(block_size)
+                    if not data:
+                        break
+                    sha256.update(data)
+        return "0x" + sha256.hexdigest()
+    except FileNotFoundError:
+        return None
+
+def hash_files(file_paths: Iterable[str], max_workers: Optional[int] = None) -> Dict[str, Optional[str]]:
+    """file_sha256 of several files on a thread pool, keyed by path (None for missing files)."""
+    paths = list(dict.fromkeys(file_paths))
+    if len(paths) <= 1:
+        return {path: file_sha256(path) for path in paths}
+    with ThreadPoolExecutor(max_workers=max_workers or min(len(paths), os.cpu_count() or 1, 8)) as pool:
+        return dict(zip(paths, pool.map(file_sha256, paths)))
@@ -0,0 +1,62 @@
+from typing import Iterable, Sequence, Tuple
+import numpy as np
+import pandas as pd
+
+def intern_columns(df: pd.DataFrame, groups: Iterable[Sequence[str]]) -> pd.DataFrame:
+    """
+    Replaces id columns by categoricals: integer codes plus one table of labels
+    (categories) per group of columns. Columns in one group share the table, so equal
+    codes mean the same entity in every column of the group (e.g. a sender and a
+    receiver). Detectors group, join and build graphs on the codes; labels are only
+    looked up for what ends up in the report.
+
+    The table is sorted, as astype('category') would make it, unless the labels are of
+    mixed types; then it is in order of first appearance. Absent columns are skipped
+    and the caller's frame is left untouched.
+    """
+    interned = {}
+    for group in groups:
+        columns = [col for col in group if col in df.columns]
+        if not columns:
+            continue
+        dtypes = [df[col].dtype for col in columns]
+        if shares_codes(*(df[col] for col in columns)):
+            continue  # Already interned, e.g. by a previous run over the same frame.
+        uniques = [df[col].cat.categories if isinstance(dtype, pd.CategoricalDtype) else pd.Index(pd.unique(df[col].dropna()))
+                   for col, dtype in zip(columns, dtypes)]
+        categories = uniques[0].append(uniques[1:]).unique() if len(uniques) > 1 else uniques[0]
+        try:
+            categories = categories.sort_values()
+        except TypeError:
+            pass
+        dtype = pd.CategoricalDtype(categories)
+        for col in columns:
+            interned[col] = df[col].astype(dtype)
+    return df.assign(**interned) if interned else df
+
+def shares_codes(*columns: pd.Series) -> bool:
+    """True when every column is categorical over the same table, so their codes compare directly."""
+    first = columns[0].dtype
+    return isinstance(first, pd.CategoricalDtype) and all(
+        isinstance(col.dtype, pd.CategoricalDtype) and col.dtype.categories.equals(first.categories) for col in columns[1:]
+    )
+
+def factorize_shared(*columns: pd.Series, interleave: bool = False) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Dense node ids for the values of several columns, numbered in order of first
+    appearance: all values of the first column, then the second, ... or row by row with
+    interleave=True. Returns the ids (one block per column, or interleaved) and the
+    label of every id. Missing values get -1.
+
+    Columns interned into one table are factorized on their integer codes; others fall
+    back to hashing the values themselves.
+    """
+    if shares_codes(*columns):
+        codes = [col.cat.codes.to_numpy() for col in columns]
+        stacked = np.column_stack(codes).ravel() if interleave else np.concatenate(codes)
+        ids, uniques = pd.factorize(pd.Categorical.from_codes(stacked, dtype=columns[0].dtype))
+        return ids, np.asarray(uniques, dtype=object)
+    values = [col.to_numpy(dtype=object) for col in columns]
+    stacked = np.column_stack(values).ravel() if interleave else np.concatenate(values)
+    ids, labels = pd.factorize(stacked)
+    return ids, labels
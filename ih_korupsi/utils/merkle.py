@@ -0,0 +1,24 @@
+import hashlib
+from typing import List
+
+def _bytes32(value: str) -> bytes:
+    raw = bytes.fromhex(value[2:] if value.startswith("0x") else value)
+    if len(raw) != 32:
+        raise ValueError(f"Expected a 32-byte hex hash, got {value!r}")
+    return raw
+
+def leaf_hash(input_hash: str, output_hash: str) -> str:
+    """Merkle leaf of one audit, sha256(0x00 || input_hash || output_hash), as used by the relay batches."""
+    return "0x" + hashlib.sha256(b"\x00" + _bytes32(input_hash) + _bytes32(output_hash)).hexdigest()
+
+def fold_proof(leaf: str, proof: List[str]) -> str:
+    """
+    Root reached from a leaf and its inclusion proof (sibling hashes, bottom-up). Each pair
+    is sorted before hashing with a 0x01 prefix, the same rule as the relay and
+    IHKorupsiEvidenceAnchor.verifyBatchInclusion.
+    """
+    node = _bytes32(leaf)
+    for sibling in proof:
+        a, b = sorted((node, _bytes32(sibling)))
+        node = hashlib.sha256(b"\x01" + a + b).digest()
+    return "0x" + node.hex()
@@ -0,0 +1,115 @@
+import math
+from collections import Counter
+from typing import List, Tuple, Optional, Dict
+
+def max_edit_distance(len1: int, len2: int, threshold: float) -> int:
+    """
+    Largest Levenshtein distance d for which
+    ((len1 + len2) - d) / (len1 + len2) >= threshold can still hold.
+    A tiny epsilon keeps the bound inclusive under floating point rounding.
+    """
+    return int(math.floor((1.0 - threshold) * (len1 + len2) + 1e-9))
+
+def choose_q(threshold: float) -> Optional[int]:
+    """
+    Picks the largest gram size whose count filter stays positive for every pair
+    of lengths at the given threshold. For equal lengths L the q-gram lemma gives
+    L + q - 1 - 2qL(1 - t) shared grams, which is positive for all L only when
+    t >= 1 - 1/(2q) (strictly for q = 1). Returns None when no q qualifies.
+    """
+    for q in (3, 2):
+        if threshold >= 1.0 - 1.0 / (2 * q):
+            return q
+    if threshold > 0.5:
+        return 1
+    return None
+
+class QGramIndex:
+    """
+    Candidate generator for near-duplicate names (AllPairs-style prefix filtering).
+
+    Each name is padded with q-1 sentinels on both sides and split into q-grams;
+    repeated grams are numbered so multiset overlap becomes plain set overlap.
+    By the q-gram lemma, two strings within edit distance d share at least
+    max(|a|, |b|) + q - 1 - q*d grams. Sorting every token list by global
+    rarity, any pair reaching that overlap must share a token inside the first
+    |tokens| - overlap + 1 positions of each list, so only those prefixes are
+    indexed. Survivors then pass a length filter and an exact overlap count.
+    None of the filters can drop a pair that reaches the similarity threshold.
+    """
+    PAD_START = '\x00'
+    PAD_END = '\x01'
+
+    def __init__(self, names: List[str], threshold: float, q: int):
+        self.names = names
+        self.threshold = threshold
+        self.q = q
+        self.lengths = [len(n) for n in names]
+        self._tokens = [self._tokenize(n) for n in names]
+        self._min_overlap_cache: Dict[int, int] = {}
+
+    def _tokenize(self, name: str) -> List[Tuple[str, int]]:
+        padded = self.PAD_START * (self.q - 1) + name + self.PAD_END * (self.q - 1)
+        seen = Counter()
+        tokens = []
+        for i in range(len(padded) - self.q + 1):
+            gram = padded[i:i + self.q]
+            tokens.append((gram, seen[gram]))
+            seen[gram] += 1
+        return tokens
+
+    def _length_compatible(self, len1: int, len2: int) -> bool:
+        return abs(len1 - len2) <= max_edit_distance(len1, len2, self.threshold)
+
+    def _required_overlap(self, len1: int, len2: int) -> int:
+        return max(len1, len2) + self.q - 1 - self.q * max_edit_distance(len1, len2, self.threshold)
+
+    def _min_overlap(self, length: int) -> int:
+        """Smallest required overlap over every partner length that passes the length filter."""
+        if length not in self._min_overlap_cache:
+            hi = length
+            while self._length_compatible(length, hi + 1):
+                hi += 1
+            lo = length
+            while lo > 0 and self._length_compatible(length, lo - 1):
+                lo -= 1
+            self._min_overlap_cache[length] = min(self._required_overlap(length, other) for other in range(lo, hi + 1))
+        return self._min_overlap_cache[length]
+
+    def is_exhaustive(self) -> bool:
+        """True when the count filter is positive for every name, i.e. no pair can share zero grams."""
+        return all(self._min_overlap(length) > 0 for length in set(self.lengths))
+
+    def candidate_pairs(self) -> List[Tuple[int, int]]:
+        """
+        Returns every (i, j) with i < j that survives the filters, in ascending order
+        so callers reproduce the exact iteration order of the brute-force loop.
+        """
+        frequency = Counter(token for tokens in self._tokens for token in set(tokens))
+        ordered = [sorted(tokens, key=lambda t: (frequency[t], t)) for tokens in self._tokens]
+        token_sets = [set(tokens) for tokens in self._tokens]
+
+        index: Dict[Tuple[str, int], List[int]] = {}
+        pairs = []
+
+        for i, tokens in enumerate(ordered):
+            len_i = self.lengths[i]
+            prefix = tokens[:max(len(tokens) - self._min_overlap(len_i) + 1, 0)]
+
+            probed = set()
+            for token in prefix:
+                for j in index.get(token, ()):
+                    if j in probed:
+                        continue
+                    probed.add(j)
+                    len_j = self.lengths[j]
+                    if not self._length_compatible(len_i, len_j):
+                        continue
+                    if len(token_sets[i] & token_sets[j]) >= self._required_overlap(len_i, len_j):
+                        pairs.append((j, i))
+
+            for token in prefix:
+                index.setdefault(token, []).append(i)
+
+        pairs.sort()
+        return pairs
@@ -1,40 +1,163 @@
-import json
+import io
 from datetime import datetime
+from html import escape
+from typing import IO, Any, Callable, Dict, List, Tuple
+from .serialization import dumps
+
+# (header, value of a finding row, format). Formats are applied identically by
+# _format() for the static top-N rows and by fmt() in the page script.
+Column = Tuple[str, Callable[[Dict[str, Any]], Any], str]
+
+STYLE = """
+        body { font-family: 'Segoe UI', Tahoma, Geneva, Verdana, sans-serif; line-height: 1.6; color: #333; max-width: 1000px; margin: 0 auto; padding: 20px; background-color: #f4f7f6; }
+        header { background: #1a3a5f; color: white; padding: 30px; border-radius: 8px; margin-bottom: 30px; text-align: center; }
+        h1 { margin: 0; font-size: 2.5em; }
+        .metadata { display: grid; grid-template-columns: repeat(3, 1fr); gap: 20px; margin-bottom: 30px; }
+        .card { background: white; padding: 20px; border-radius: 8px; box-shadow: 0 2px 5px rgba(0,0,0,0.1); }
+        .card h3 { margin-top: 0; color: #1a3a5f; border-bottom: 2px solid #eee; padding-bottom: 10px; }
+        .finding-section { margin-bottom: 40px; }
+        .red-flag { color: #d9534f; font-weight: bold; border: 1px solid #d9534f; padding: 5px 10px; border-radius: 4px; }
+        .success { color: #5cb85c; font-weight: bold; }
+        table { width: 100%; border-collapse: collapse; margin: 15px 0; }
+        th, td { padding: 12px; text-align: left; border-bottom: 1px solid #eee; }
+        th { background-color: #f8f9fa; color: #1a3a5f; }
+        .explanation { font-style: italic; color: #666; font-size: 0.9em; margin-top: 10px; }
+        .table-note { color: #888; font-size: 0.85em; }
+        .pager { display: flex; gap: 10px; align-items: center; flex-wrap: wrap; font-size: 0.9em; }
+        .pager button { padding: 4px 10px; }
+        .pager input { flex: 1; min-width: 150px; padding: 4px; }
+        footer { text-align: center; margin-top: 50px; color: #888; border-top: 1px solid #ddd; padding-top: 20px; }
+"""
+
+# Tables start as the static top-N rows. "Browse all" parses that table's embedded JSON
+# (only then) and pages through it, so the DOM never holds more than one page.
+SCRIPT = """
+(function () {
+    function fmt(value, kind) {
+        if (value === null || value === undefined) return '';
+        if (kind === 'int') return Number(value).toLocaleString('en-US', {maximumFractionDigits: 0});
+        if (kind === 'money') return Number(value).toLocaleString('en-US', {minimumFractionDigits: 2, maximumFractionDigits: 2});
+        if (kind === 'ratio') return Number(value).toFixed(2);
+        if (kind === 'times') return Number(value).toFixed(2) + 'x';
+        if (kind === 'percent') return (Number(value) * 100).toFixed(1) + '%';
+        return String(value);
+    }
+    function browse(container) {
+        var spec = JSON.parse(document.getElementById(container.dataset.source).textContent);
+        var rows = spec.rows, view = rows, page = 0, size = 50;
+        container.innerHTML = '<div class="pager"><button data-step="-1">&laquo; Prev</button><span></span>' +
+            '<button data-step="1">Next &raquo;</button><select><option>25</option><option selected>50</option>' +
+            '<option>250</option></select><input type="search" placeholder="Filter rows..."></div><table><thead><tr></tr></thead><tbody></tbody></table>';
+        var head = container.querySelector('thead tr'), body = container.querySelector('tbody');
+        var label = container.querySelector('.pager span');
+        spec.columns.forEach(function (c) { var th = document.createElement('th'); th.textContent = c[0]; head.appendChild(th); });
+        function render() {
+            var pages = Math.max(1, Math.ceil(view.length / size));
+            page = Math.min(Math.max(page, 0), pages - 1);
+            body.textContent = '';
+            view.slice(page * size, (page + 1) * size).forEach(function (row) {
+                var tr = document.createElement('tr');
+                row.forEach(function (value, i) { var td = document.createElement('td'); td.textContent = fmt(value, spec.columns[i][1]); tr.appendChild(td); });
+                body.appendChild(tr);
+            });
+            label.textContent = 'Page ' + (page + 1) + ' of ' + pages + ' (' + view.length.toLocaleString('en-US') + ' rows)';
+        }
+        container.querySelectorAll('button').forEach(function (b) {
+            b.onclick = function () { page += Number(b.dataset.step); render(); };
+        });
+        container.querySelector('select').onchange = function (e) { size = Number(e.target.value); page = 0; render(); };
+        container.querySelector('input').oninput = function (e) {
+            var needle = e.target.value.toLowerCase();
+            view = needle ? rows.filter(function (r) { return r.join(' ').toLowerCase().indexOf(needle) >= 0; }) : rows;
+            page = 0; render();
+        };
+        render();
+    }
+    document.querySelectorAll('.lazy-table button.browse').forEach(function (b) {
+        b.onclick = function () { browse(b.closest('.lazy-table')); };
+    });
+})();
+"""
 
 class ReportGenerator:
     """
     Generates visual reports in HTML format.
+
+    The page is written to a file handle section by section. Each findings table shows
+    its top rows as static HTML and carries all of its rows as compact JSON, which the
+    page only parses and paginates when the reader asks to browse the table. Embedded
+    rows are written in slices and capped per table, so memory and file size stay bounded.
     """
+    TOP_N = 20
+    MAX_EMBEDDED_ROWS = 50_000
+    JSON_SLICE = 2_000
+
     @staticmethod
-    def generate_html(report_data: dict) -> str:
+    def generate_html(report_data: dict, top_n: int = TOP_N) -> str:
+        out = io.StringIO()
+        ReportGenerator.write_html(report_data, out, top_n)
+        return out.getvalue()
+
+    @staticmethod
+    def _format(value: Any, kind: str) -> str:
+        if value is None:
+            return ''
+        if kind == 'int':
+            return f"{value:,.0f}"
+        if kind == 'money':
+            return f"{value:,.2f}"
+        if kind == 'ratio':
+            return f"{value:.2f}"
+        if kind == 'times':
+            return f"{value:.2f}x"
+        if kind == 'percent':
+            return f"{value * 100:.1f}%"
+        return escape(str(value))
+
+    @classmethod
+    def _table(cls, f: IO[str], key: str, columns: List[Column], rows: List[Dict[str, Any]], top_n: int):
+        total = len(rows)
+        f.write('<table>\n<tr>' + ''.join(f'<th>{escape(label)}</th>' for label, _, _ in columns) + '</tr>\n')
+        for row in rows[:top_n]:
+            f.write('<tr>' + ''.join(f'<td>{cls._format(get(row), kind)}</td>' for _, get, kind in columns) + '</tr>\n')
+        f.write('</table>\n')
+        if total <= top_n:
+            return
+
+        embedded = min(total, cls.MAX_EMBEDDED_ROWS)
+        note = f"Top {top_n} of {total:,} rows."
+        if embedded < total:
+            note += f" Browsing covers the first {embedded:,}; the JSON report has all of them."
+        f.write(f'<div class="lazy-table" data-source="data-{key}"><p class="table-note">{note} '
+                f'<button class="browse">Browse all</button></p></div>\n')
+
+        # '<' only occurs inside JSON strings; escaping it keeps '</script>' in a value from ending the block.
+        f.write(f'<script type="application/json" id="data-{key}">{{"columns":')
+        f.write(dumps([[label, kind] for label, _, kind in columns]).decode('utf-8').replace('<', '\\u003c'))
+        f.write(',"rows":[')
+        for start in range(0, embedded, cls.JSON_SLICE):
+            chunk = [[get(row) for _, get, _ in columns] for row in rows[start:min(start + cls.JSON_SLICE, embedded)]]
+            f.write((',' if start else '') + dumps(chunk).decode('utf-8')[1:-1].replace('<', '\\u003c'))
+        f.write(']}</script>\n')
+
+    @staticmethod
+    def write_html(report_data: dict, f: IO[str], top_n: int = TOP_N):
+        """Writes the HTML report to an open text file handle."""
         metadata = report_data.get('metadata', {})
         findings = report_data.get('findings', {})
-        
+        table = lambda key, columns, rows: ReportGenerator._table(f, key, columns, rows, top_n)
+
         timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-        
-        html = f"""
+        currency = escape(str(metadata.get('currency', 'IDR')))
+
+        f.write(f"""
 <!DOCTYPE html>
 <html lang="en">
 <head>
     <meta charset="UTF-8">
     <meta name="viewport" content="width=device-width, initial-scale=1.0">
     <title>IH-Korupsi Forensic Report</title>
-    <style>
-        body {{ font-family: 'Segoe UI', Tahoma, Geneva, Verdana, sans-serif; line-height: 1.6; color: #333; max-width: 1000px; margin: 0 auto; padding: 20px; background-color: #f4f7f6; }}
-        header {{ background: #1a3a5f; color: white; padding: 30px; border-radius: 8px; margin-bottom: 30px; text-align: center; }}
-        h1 {{ margin: 0; font-size: 2.5em; }}
-        .metadata {{ display: grid; grid-template-columns: repeat(3, 1fr); gap: 20px; margin-bottom: 30px; }}
-        .card {{ background: white; padding: 20px; border-radius: 8px; box-shadow: 0 2px 5px rgba(0,0,0,0.1); }}
-        .card h3 {{ margin-top: 0; color: #1a3a5f; border-bottom: 2px solid #eee; padding-bottom: 10px; }}
-        .finding-section {{ margin-bottom: 40px; }}
-        .red-flag {{ color: #d9534f; font-weight: bold; border: 1px solid #d9534f; padding: 5px 10px; border-radius: 4px; }}
-        .success {{ color: #5cb85c; font-weight: bold; }}
-        table {{ width: 100%; border-collapse: collapse; margin: 15px 0; }}
-        th, td {{ padding: 12px; text-align: left; border-bottom: 1px solid #eee; }}
-        th {{ background-color: #f8f9fa; color: #1a3a5f; }}
-        .explanation {{ font-style: italic; color: #666; font-size: 0.9em; margin-top: 10px; }}
-        footer {{ text-align: center; margin-top: 50px; color: #888; border-top: 1px solid #ddd; padding-top: 20px; }}
-    </style>
+    <style>{STYLE}    </style>
 </head>
 <body>
     <header>
@@ -50,108 +173,161 @@ class ReportGenerator:
         </div>
         <div class="card">
             <h3>Total Amount</h3>
-            <p style="font-size: 1.5em; font-weight: bold;">{metadata.get('currency', 'IDR')} {metadata.get('total_amount', 0):,.2f}</p>
+            <p style="font-size: 1.5em; font-weight: bold;">{currency} {metadata.get('total_amount', 0):,.2f}</p>
         </div>
         <div class="card">
             <h3>Currency</h3>
-            <p style="font-size: 1.5em; font-weight: bold;">{metadata.get('currency', 'IDR')}</p>
+            <p style="font-size: 1.5em; font-weight: bold;">{currency}</p>
         </div>
     </div>
-"""
+""")
 
         # Mathematician Section
         math = findings.get('The Mathematician', {})
         if math:
             benford = math.get('benford_test', {})
             rsf = math.get('rsf_test', {})
-            
+
             conformity = benford.get('conformity_status')
             status_class = "red-flag" if conformity == "Non-conformity" else "success"
-            
-            html += f"""
+
+            f.write(f"""
     <div class="finding-section">
         <h2>Statistical Detection (The Mathematician)</h2>
         <div class="card">
             <h3>Benford's Law Test</h3>
-            <p>Status: <span class="{status_class}">{conformity}</span> (MAD: {benford.get('mad', 0):.4f})</p>
-            <p class="explanation">{benford.get('explanation')}</p>
+            <p>Status: <span class="{status_class}">{escape(str(conformity))}</span> (MAD: {benford.get('mad', 0):.4f})</p>
+            <p class="explanation">{escape(str(benford.get('explanation')))}</p>
         </div>
-        
+
         <div class="card" style="margin-top:20px;">
             <h3>High Risk Entities (RSF)</h3>
-            <table>
-                <tr><th>Entity</th><th>RSF Score</th><th>Largest Transaction</th><th>Average of Others</th></tr>
-"""
-            for e in rsf.get('high_risk_entities', []):
-                html += f"<tr><td>{e['entity']}</td><td>{e['rsf_value']:.2f}</td><td>{e['largest_transaction']:,.0f}</td><td>{e['average_others']:,.0f}</td></tr>"
-            
-            html += f"""
-            </table>
-            <p class="explanation">{rsf.get('explanation')}</p>
+""")
+            table('rsf', [
+                ("Entity", lambda e: e['entity'], 'text'),
+                ("RSF Score", lambda e: e['rsf_value'], 'ratio'),
+                ("Largest Transaction", lambda e: e['largest_transaction'], 'int'),
+                ("Average of Others", lambda e: e['average_others'], 'int')
+            ], rsf.get('high_risk_entities', []))
+            f.write(f"""
+            <p class="explanation">{escape(str(rsf.get('explanation')))}</p>
         </div>
     </div>
-"""
+""")
+
+        # Connector Section
+        connector = findings.get('The Connector', {})
+        if connector and 'error' not in connector:
+            circular = connector.get('circular_trading', {})
+            temporal = connector.get('temporal_circular_trading', {})
+            bound = lambda section: "at least " if section.get('count_is_lower_bound') else ""
+
+            f.write(f"""
+    <div class="finding-section">
+        <h2>Network Detection (The Connector)</h2>
+        <div class="card">
+            <h3>Circular Trading</h3>
+            <p>Loops found: <b>{bound(circular)}{circular.get('cycles_count', 0):,}</b></p>
+""")
+            table('cycles', [
+                ("Loop", lambda c: " → ".join(map(str, c + c[:1])), 'text'),
+                ("Hops", len, 'int')
+            ], circular.get('sample_cycles', []))
+            f.write(f"""
+            <p class="explanation">{escape(str(circular.get('explanation')))}</p>
+        </div>
+""")
+            if temporal:
+                f.write(f"""
+        <div class="card" style="margin-top:20px;">
+            <h3>Time-Respecting Loops</h3>
+            <p>Loops found: <b>{bound(temporal)}{temporal.get('cycles_count', 0):,}</b></p>
+""")
+                table('temporal-cycles', [
+                    ("Loop", lambda c: " → ".join([str(leg['from']) for leg in c] + [str(c[-1]['to'])]) if c else "", 'text'),
+                    ("From", lambda c: c[0]['date'] if c else None, 'text'),
+                    ("To", lambda c: c[-1]['date'] if c else None, 'text'),
+                    ("First Leg", lambda c: c[0]['amount'] if c else None, 'money')
+                ], temporal.get('sample_cycles', []))
+                f.write(f"""
+            <p class="explanation">{escape(str(temporal.get('explanation')))}</p>
+        </div>
+""")
+            f.write("""
+    </div>
+""")
 
         # Chronologist Section
         chrono = findings.get('The Chronologist', {})
         if chrono:
             cliff = chrono.get('fiscal_cliff', {})
             velocity = chrono.get('velocity_anomalies', {})
-            
+
             status = cliff.get('status')
             status_class = "red-flag" if status == "Extreme Dumping" else "success"
-            
-            html += f"""
+            # Rows are keyed by the detector's entity column; reports from before entity_col was recorded used vendor_id.
+            cliff_entity = cliff.get('entity_col', 'vendor_id')
+            velocity_entity = velocity.get('entity_col', 'vendor_id')
+
+            f.write(f"""
     <div class="finding-section">
         <h2>Time-Series Detection (The Chronologist)</h2>
         <div class="card">
             <h3>Fiscal Cliff (Budget Dumping)</h3>
-            <p>Status: <span class="{status_class}">{status}</span> (Ratio: {cliff.get('december_vs_avg_ratio', 0):.2f}x)</p>
-            <p class="explanation">{cliff.get('explanation')}</p>
+            <p>Status: <span class="{status_class}">{escape(str(status))}</span> (Ratio: {cliff.get('year_end_vs_avg_ratio', 0):.2f}x)</p>
+""")
+            table('fiscal-cliff', [
+                ("Entity", lambda o: o[cliff_entity], 'text'),
+                ("Fiscal Year", lambda o: o['fiscal_year'], 'text'),
+                ("Year-End Spending", lambda o: o['year_end_spending'], 'money'),
+                ("Ratio", lambda o: o['ratio'], 'times'),
+                ("Status", lambda o: o['status'], 'text')
+            ], cliff.get('top_offenders', []))
+            f.write(f"""
+            <p class="explanation">{escape(str(cliff.get('explanation')))}</p>
         </div>
-        
+
         <div class="card" style="margin-top:20px;">
             <h3>High Frequency Transaction Events</h3>
-            <table>
-                <tr><th>Vendor/Entity</th><th>Date</th><th>Transaction Count</th></tr>
-"""
-            for v in velocity.get('high_velocity_events', []):
-                html += f"<tr><td>{v['vendor_id']}</td><td>{v['date_only']}</td><td>{v['count']}</td></tr>"
-            
-            html += f"""
-            </table>
-            <p class="explanation">{velocity.get('explanation')}</p>
+""")
+            table('velocity', [
+                ("Vendor/Entity", lambda v: v[velocity_entity], 'text'),
+                ("Window", lambda v: v['window'], 'text'),
+                ("From", lambda v: v['window_start'], 'text'),
+                ("To", lambda v: v['window_end'], 'text'),
+                ("Transaction Count", lambda v: f"{v['count']} (> {v['threshold']})", 'text')
+            ], velocity.get('high_velocity_events', []))
+            f.write(f"""
+            <p class="explanation">{escape(str(velocity.get('explanation')))}</p>
         </div>
     </div>
-"""
+""")
 
         # String Detective Section
         string_det = findings.get('String Detective', {})
         if string_det:
-            ghosts = string_det.get('potential_ghost_vendors', [])
-            html += f"""
+            f.write("""
     <div class="finding-section">
         <h2>String Detection (String Detective)</h2>
         <div class="card">
             <h3>Potential Ghost Vendors / Name Duplication</h3>
-            <table>
-                <tr><th>Name 1</th><th>Name 2</th><th>Similarity Score</th></tr>
-"""
-            for g in ghosts:
-                html += f"<tr><td>{g['name_1']}</td><td>{g['name_2']}</td><td>{g['similarity_score']*100:.1f}%</td></tr>"
-            
-            html += f"""
-            </table>
-            <p class="explanation">{string_det.get('explanation')}</p>
+""")
+            table('ghost-vendors', [
+                ("Name 1", lambda g: g['name_1'], 'text'),
+                ("Name 2", lambda g: g['name_2'], 'text'),
+                ("Similarity Score", lambda g: g['similarity_score'], 'percent')
+            ], string_det.get('potential_ghost_vendors', []))
+            f.write(f"""
+            <p class="explanation">{escape(str(string_det.get('explanation')))}</p>
         </div>
     </div>
-"""
+""")
 
-        html += """
+        f.write(f"""
     <footer>
         <p>Created by OurCreativity Edisi Coding - Towards a More Transparent Future</p>
     </footer>
+    <script>{SCRIPT}</script>
 </body>
 </html>
-"""
-        return html
+""")
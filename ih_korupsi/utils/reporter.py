@@ -1,31 +1,309 @@
 import requests
 import json
 import hashlib
+import os
+import random
+import tempfile
+import threading
 import time
-from typing import Dict, Any
+from concurrent.futures import ThreadPoolExecutor
+from email.utils import parsedate_to_datetime
+from typing import Dict, Any, Iterable, List, Optional, Tuple, Union
+from requests.adapters import HTTPAdapter
+from .hashing import file_sha256, hash_files
+from .merkle import fold_proof, leaf_hash
+from .serialization import report_sha256
+
+class Outbox:
+    """
+    Antrean kiriman yang belum dikonfirmasi server, disimpan di satu file JSON.
+    Entri ditulis sebelum dikirim dan dihapus setelah sukses, jadi kalau proses mati
+    di tengah jalan, kiriman bisa diulang dengan idempotency key yang sama.
+    """
+    def __init__(self, path: str):
+        self.path = path
+        self._lock = threading.Lock()
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                self.entries = json.load(f)
+        except FileNotFoundError:
+            self.entries = {}
+
+    def _save(self):
+        # Tulis ke file sementara dulu agar file outbox tidak pernah setengah jadi
+        directory = os.path.dirname(os.path.abspath(self.path))
+        fd, tmp_path = tempfile.mkstemp(dir=directory, suffix='.tmp')
+        try:
+            with os.fdopen(fd, 'w', encoding='utf-8') as f:
+                json.dump(self.entries, f, indent=2)
+            os.replace(tmp_path, self.path)
+        except BaseException:
+            os.unlink(tmp_path)
+            raise
+
+    def add(self, entries: List[Dict[str, Any]]):
+        with self._lock:
+            for entry in entries:
+                self.entries[entry["key"]] = entry
+            self._save()
+
+    def remove(self, key: str):
+        with self._lock:
+            if self.entries.pop(key, None) is not None:
+                self._save()
+
+    def pending(self) -> List[Dict[str, Any]]:
+        with self._lock:
+            return list(self.entries.values())
 
 class EvidenceReporter:
-    def __init__(self, target_url: str, api_key: str = None):
+    # Status yang layak dicoba ulang (server sibuk / gangguan sementara)
+    RETRY_STATUSES = {429, 500, 502, 503, 504}
+    # Status yang biasanya membawa header Retry-After (rate limit / maintenance)
+    RETRY_AFTER_STATUSES = {429, 503}
+
+    def __init__(self, target_url: str, api_key: str = None, max_concurrency: int = 4, max_retries: int = 4,
+                 backoff: float = 0.5, timeout: float = 30, outbox_path: Optional[str] = None,
+                 batch_url: Optional[str] = None, batch_size: int = 64, max_retry_after: float = 120):
         self.target_url = target_url
         self.api_key = api_key
+        self.max_concurrency = max(1, max_concurrency)
+        self.max_retries = max_retries
+        self.backoff = backoff
+        self.timeout = timeout
+        self.outbox = Outbox(outbox_path) if outbox_path else None
+        # Endpoint multi-item Relay: banyak kiriman per request, jadi rate limit per
+        # request tidak habis oleh satu batch. Default-nya diturunkan dari URL Relay.
+        if batch_url is None and target_url.rstrip('/').endswith('/relay/anchor'):
+            batch_url = target_url.rstrip('/') + '-batch'
+        self.batch_url = batch_url
+        self.batch_size = max(1, batch_size)
+        self.max_retry_after = max_retry_after
+
+        # Satu session keep-alive untuk semua kiriman, pool seukuran jumlah thread
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=self.max_concurrency)
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+        self.session.headers["Content-Type"] = "application/json"
+        if api_key:
+            self.session.headers["x-api-key"] = api_key
 
     def calculate_file_hash(self, file_path: str) -> str:
         """Menghitung SHA-256 hash dari file untuk integritas data."""
-        sha256 = hashlib.sha256()
+        return file_sha256(file_path)
+
+    @staticmethod
+    def calculate_output_hash(output_json: Dict[str, Any]) -> str:
+        """
+        Hash dari encoding kanonik report (JSON ringkas, key terurut), sama dengan hash
+        file yang ditulis FraudEngine.save_report dalam format JSON.
+        """
+        return report_sha256(output_json)
+
+    @staticmethod
+    def verify_inclusion(input_hash: str, output_hash: str, merkle: Dict[str, Any]) -> bool:
+        """
+        Memeriksa secara lokal (tanpa jaringan) bahwa pasangan hash termasuk dalam batch
+        yang Merkle root-nya di-anchor oleh Relay. `merkle` adalah bagian "merkle" dari
+        respons Relay (root, leaf_index, proof).
+        """
         try:
-            with open(file_path, 'rb') as f:
-                while True:
-                    data = f.read(65536)
-                    if not data:
-                        break
-                    sha256.update(data)
-            return "0x" + sha256.hexdigest()
-        except FileNotFoundError:
+            leaf = leaf_hash(input_hash, output_hash)
+            if merkle.get("leaf") not in (None, leaf):
+                return False
+            return fold_proof(leaf, merkle.get("proof", [])) == merkle["root"]
+        except (KeyError, TypeError, ValueError):
+            return False
+
+    @staticmethod
+    def _submission(input_file: str, input_hash: str, output_hash: str, metadata: Dict[str, Any]) -> Dict[str, Any]:
+        return {
+            # Key yang sama untuk pasangan hash yang sama: server bisa mengenali kiriman ulang
+            "key": hashlib.sha256(f"{input_hash}:{output_hash}".encode('utf-8')).hexdigest(),
+            "input_file": input_file,
+            "payload": {
+                "input_hash": input_hash,
+                "output_hash": output_hash,
+                "metadata": metadata,
+                "timestamp": time.time()
+            }
+        }
+
+    def _retry_after(self, response: requests.Response) -> Optional[float]:
+        """Detik tunggu dari header Retry-After (angka detik atau tanggal HTTP), maksimal max_retry_after."""
+        value = response.headers.get("Retry-After")
+        if response.status_code not in self.RETRY_AFTER_STATUSES or not value:
             return None
+        try:
+            seconds = float(value)
+        except ValueError:
+            try:
+                seconds = parsedate_to_datetime(value).timestamp() - time.time()
+            except (TypeError, ValueError):
+                return None
+        return min(max(seconds, 0.0), self.max_retry_after)
+
+    def _request(self, url: str, body: Any, headers: Optional[Dict[str, str]] = None) -> Tuple[Optional[requests.Response], Optional[Dict[str, Any]]]:
+        """
+        POST dengan retry + exponential backoff. Mengembalikan (response, None) kalau
+        jawabannya final, atau (None, error) kalau semua percobaan habis.
+        """
+        last_error, wait = None, None
+        for attempt in range(self.max_retries + 1):
+            if attempt:
+                # 0.5s, 1s, 2s, ... ditambah jitter agar klien tidak retry serempak,
+                # tapi tidak lebih cepat dari Retry-After yang diminta server
+                delay = self.backoff * 2 ** (attempt - 1) * (1 + random.random())
+                time.sleep(max(delay, wait or 0.0))
+            try:
+                response = self.session.post(url, json=body, headers=headers, timeout=self.timeout)
+            except requests.RequestException as e:
+                last_error, wait = {"status": "error", "message": str(e)}, None
+                continue
+            if response.status_code in self.RETRY_STATUSES:
+                last_error = {"status": "failed", "error": response.text, "http_status": response.status_code}
+                wait = self._retry_after(response)
+                continue
+            return response, None
+        return None, {**last_error, "attempts": self.max_retries + 1}
 
-    def send_report(self, input_file: str, output_json: Dict[str, Any]) -> Dict[str, Any]:
+    @staticmethod
+    def _json(response: requests.Response) -> Tuple[Any, Optional[Dict[str, Any]]]:
+        try:
+            return response.json(), None
+        except ValueError as e:
+            # 200 tapi bukan JSON (proxy, halaman error): anggap gagal, tetap di outbox
+            return None, {"status": "failed", "error": f"Invalid JSON response: {e}", "http_status": response.status_code}
+
+    def _post(self, entry: Dict[str, Any]) -> Dict[str, Any]:
+        """Satu kiriman dengan retry + exponential backoff. Entri outbox dihapus kalau jawabannya final."""
+        response, error = self._request(self.target_url, entry["payload"], {"Idempotency-Key": entry["key"]})
+        if error:
+            # Tetap di outbox, dikirim ulang oleh resend_pending()
+            return error
+
+        if response.status_code != 200:
+            # Ditolak (4xx): mengulang tidak akan mengubah jawaban
+            self._done(entry)
+            return {"status": "failed", "error": response.text, "http_status": response.status_code}
+
+        result, error = self._json(response)
+        return error or self._finish(entry, result)
+
+    def _post_chunk(self, entries: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """
+        Satu request ke endpoint batch untuk beberapa kiriman sekaligus. Relay yang belum
+        punya endpoint itu (404/405) dilayani per kiriman lewat _post().
+        """
+        body = {"items": [{**entry["payload"], "idempotency_key": entry["key"]} for entry in entries]}
+        response, error = self._request(self.batch_url, body)
+        if error:
+            return [dict(error) for _ in entries]
+        if response.status_code in (404, 405):
+            return [self._post(entry) for entry in entries]
+        if response.status_code != 200:
+            for entry in entries:
+                self._done(entry)
+            return [{"status": "failed", "error": response.text, "http_status": response.status_code} for _ in entries]
+
+        result, error = self._json(response)
+        items = result.get("results") if isinstance(result, dict) else None
+        if error is None and (not isinstance(items, list) or len(items) != len(entries)):
+            error = {"status": "failed", "error": "Batch response does not have one result per item", "http_status": response.status_code}
+        if error:
+            return [dict(error) for _ in entries]
+        return [self._finish(entry, item) for entry, item in zip(entries, items)]
+
+    def _finish(self, entry: Dict[str, Any], result: Any) -> Dict[str, Any]:
+        """Jawaban 200 untuk satu kiriman: hapus dari outbox kalau final, cek inclusion proof."""
+        if isinstance(result, dict) and str(result.get("status", "")).lower() == "rejected":
+            # Item ditolak di dalam batch (setara 422): mengulang tidak akan mengubah jawaban
+            self._done(entry)
+            return {"status": "failed", "error": result.get("error"), "http_status": 422}
+        if self._failed(result):
+            # Relay menerima tapi Validator gagal: tetap di outbox
+            return result
+        self._done(entry)
+        payload = entry["payload"]
+        # Relay dengan batch Merkle: cek inclusion proof sebelum disimpan
+        if "merkle" in result:
+            result["evidence"] = {"input_hash": payload["input_hash"], "output_hash": payload["output_hash"]}
+            result["merkle"]["verified_locally"] = self.verify_inclusion(payload["input_hash"], payload["output_hash"], result["merkle"])
+        return result
+
+    def _done(self, entry: Dict[str, Any]):
+        if self.outbox is not None:
+            self.outbox.remove(entry["key"])
+
+    @staticmethod
+    def _failed(result: Dict[str, Any]) -> bool:
+        return not isinstance(result, dict) or str(result.get("status", "")).lower() in ("failed", "error")
+
+    def _submit_all(self, entries: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        if self.outbox is not None:
+            self.outbox.add(entries)
+        if len(entries) <= 1:
+            return [self._post(entry) for entry in entries]
+        if self.batch_url:
+            # Potongan batch_size kiriman, satu request per potongan
+            chunks = [entries[i:i + self.batch_size] for i in range(0, len(entries), self.batch_size)]
+            with ThreadPoolExecutor(max_workers=min(self.max_concurrency, len(chunks))) as pool:
+                return [result for results in pool.map(self._post_chunk, chunks) for result in results]
+        with ThreadPoolExecutor(max_workers=min(self.max_concurrency, len(entries))) as pool:
+            return list(pool.map(self._post, entries))
+
+    def send_batch(self, items: Iterable[Tuple[str, Union[str, Dict[str, Any]]]], hash_workers: Optional[int] = None) -> List[Dict[str, Any]]:
+        """
+        Mengirim banyak (input_file, report) sekaligus. report boleh berupa dict atau path
+        file report yang sudah disimpan (hash-nya = hash file). Input dan file report
+        di-hash paralel, lalu dikirim lewat satu session dengan paling banyak
+        max_concurrency request bersamaan: per batch_size kiriman ke batch_url kalau
+        ada, selain itu satu request per kiriman. Hasil sesuai urutan items.
+        """
+        items = list(items)
+        paths = [input_file for input_file, _ in items] + [report for _, report in items if isinstance(report, str)]
+        file_hashes = hash_files(paths, max_workers=hash_workers)
+
+        results: List[Optional[Dict[str, Any]]] = [None] * len(items)
+        entries, positions = [], []
+        for i, (input_file, report) in enumerate(items):
+            input_hash = file_hashes[input_file]
+            if not input_hash:
+                results[i] = {"status": "error", "message": "Input file not found"}
+                continue
+            if isinstance(report, str):
+                output_hash, metadata = file_hashes[report], {}
+                if not output_hash:
+                    results[i] = {"status": "error", "message": "Report file not found"}
+                    continue
+            else:
+                output_hash, metadata = self.calculate_output_hash(report), report.get("metadata", {})
+            entries.append(self._submission(input_file, input_hash, output_hash, metadata))
+            positions.append(i)
+
+        for i, result in zip(positions, self._submit_all(entries)):
+            results[i] = result
+        return results
+
+    def resend_pending(self) -> List[Dict[str, Any]]:
+        """Mengirim ulang isi outbox (kiriman yang belum dikonfirmasi dari run sebelumnya)."""
+        if self.outbox is None:
+            return []
+        pending = self.outbox.pending()
+        if not pending:
+            return []
+        print(f"\n[Reporter] Resending {len(pending)} pending submission(s) from {self.outbox.path}")
+        results = self._submit_all(pending)
+        for entry, result in zip(pending, results):
+            status = "❌" if self._failed(result) else "✅"
+            print(f"   {status} {entry['input_file']}")
+        return results
+
+    def send_report(self, input_file: str, output_json: Dict[str, Any], output_hash: Optional[str] = None) -> Dict[str, Any]:
         """
-        Mengirim hasil audit ke server eksternal (Validator/Relay).
+        Mengirim hasil audit ke server eksternal (Validator/Relay). output_hash adalah
+        hash yang dikembalikan FraudEngine.save_report; kalau kosong dihitung ulang.
         """
         print(f"\n[Reporter] Preparing to send evidence to: {self.target_url}")
 
@@ -34,37 +312,24 @@ class EvidenceReporter:
         if not input_hash:
             return {"status": "error", "message": "Input file not found"}
 
-        # 2. Hitung Hash Output (JSON Content)
-        # Kita hash string JSON-nya agar konsisten
-        json_str = json.dumps(output_json, sort_keys=True)
-        output_hash = "0x" + hashlib.sha256(json_str.encode('utf-8')).hexdigest()
+        # 2. Hash Output (encoding kanonik report, sama dengan hash file report)
+        output_hash = output_hash or self.calculate_output_hash(output_json)
+        entry = self._submission(input_file, input_hash, output_hash, output_json.get("metadata", {}))
 
         print(f"   🔹 Input Fingerprint  : {input_hash}")
-        print(f"   🔹 Output Fingerprint : {output_hash}")
-
-        # 3. Payload Standar
-        payload = {
-            "input_hash": input_hash,
-            "output_hash": output_hash,
-            "metadata": output_json.get("metadata", {}),
-            "timestamp": time.time()
-        }
-        
-        headers = {"Content-Type": "application/json"}
-        if self.api_key:
-            headers["x-api-key"] = self.api_key
+        print(f"   🔹 Output Fingerprint : {entry['payload']['output_hash']}")
 
-        try:
-            # Kirim Request
-            response = requests.post(self.target_url, json=payload, headers=headers, timeout=30)
-            
-            if response.status_code == 200:
-                print(f"   ✅ Success! Server responded: {response.status_code}")
-                return response.json()
-            else:
-                print(f"   ❌ Failed! Server responded: {response.status_code}")
-                return {"status": "failed", "error": response.text}
-                
-        except Exception as e:
-            print(f"   ❌ Connection Error: {str(e)}")
-            return {"status": "error", "message": str(e)}
\ No newline at end of file
+        # 3. Kirim (retry + idempotency key, lewat outbox kalau ada)
+        result = self._submit_all([entry])[0]
+        if self._failed(result):
+            detail = result.get("http_status") or result.get("message") or result.get("validator_error")
+            print(f"   ❌ Failed! {detail}")
+            return result
+
+        print(f"   ✅ Success! Server accepted the evidence")
+        merkle = result.get("merkle")
+        if merkle:
+            mark = "✅" if merkle["verified_locally"] else "❌"
+            print(f"   {mark} Inclusion proof vs root {merkle.get('root')}: "
+                  f"{'valid' if merkle['verified_locally'] else 'INVALID'}")
+        return result
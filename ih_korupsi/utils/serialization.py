@@ -0,0 +1,156 @@
+import datetime
+import hashlib
+import json
+import math
+import os
+from typing import IO, Any, Dict, Iterator, Optional
+import numpy as np
+
+try:
+    import msgpack
+except ImportError:  # Optional: only needed for the MessagePack format.
+    msgpack = None
+
+FORMATS = ('json', 'msgpack')
+MSGPACK_EXTENSIONS = ('.msgpack', '.mpk')
+
+# Dicts down to this depth (the report, its "findings", each detector's findings) are
+# written key by key, so only one detector's findings are encoded in memory at a time.
+STREAM_DEPTH = 3
+
+# JSON has no literal for non-finite floats; every format writes them as these strings.
+NAN, INFINITY, NEGATIVE_INFINITY = "NaN", "Infinity", "-Infinity"
+
+def _float(value: float) -> Any:
+    if math.isfinite(value):
+        return float(value)
+    return NAN if math.isnan(value) else INFINITY if value > 0 else NEGATIVE_INFINITY
+
+def _key(key: Any) -> str:
+    """A dict key as the string JSON writes it, so a report reads back with the same keys."""
+    if isinstance(key, str):
+        return str(key)
+    if isinstance(key, np.generic):
+        key = key.item()
+    if isinstance(key, bool) or key is None:
+        return json.dumps(key)
+    if isinstance(key, int):
+        return str(int(key))
+    if isinstance(key, float):
+        value = _float(key)
+        return value if isinstance(value, str) else repr(value)
+    if isinstance(key, (datetime.datetime, datetime.date)):
+        return key.isoformat()
+    raise TypeError(f"Keys of type {type(key).__name__} are not supported")
+
+def normalize(obj: Any) -> Any:
+    """
+    The JSON-native form of a value, which is what the report file holds and what
+    reading it back returns: dicts with string keys (in sorted order), lists for tuples
+    and sets, plain Python numbers for NumPy ones, ISO strings for dates, and the NAN/
+    INFINITY strings for non-finite floats. Findings are normalized before they are
+    cached or reported, so a cached report encodes to the same bytes as a fresh one.
+    """
+    if isinstance(obj, dict):
+        items = {_key(key): value for key, value in obj.items()}
+        return {key: normalize(items[key]) for key in sorted(items)}
+    if isinstance(obj, (list, tuple)):
+        return [normalize(value) for value in obj]
+    if obj is None or isinstance(obj, bool):
+        return obj
+    if isinstance(obj, str):
+        return str(obj)
+    if isinstance(obj, np.generic):
+        return normalize(obj.item())
+    if isinstance(obj, int):
+        return int(obj)
+    if isinstance(obj, float):
+        return _float(obj)
+    if isinstance(obj, np.ndarray):
+        return normalize(obj.tolist())
+    if isinstance(obj, (datetime.datetime, datetime.date)):
+        return obj.isoformat()
+    if isinstance(obj, (set, frozenset)):
+        return normalize(sorted(obj))
+    if hasattr(obj, 'to_dict'):
+        return normalize(obj.to_dict())
+    raise TypeError(f"Object of type {type(obj).__name__} is not JSON serializable")
+
+_encoder = json.JSONEncoder(sort_keys=True, separators=(',', ':'), ensure_ascii=False, allow_nan=False)
+
+def dumps(obj: Any) -> bytes:
+    """Canonical compact JSON of one value: normalize()d, keys sorted, UTF-8."""
+    return _encoder.encode(normalize(obj)).encode('utf-8')
+
+def _keyed(obj: Dict[Any, Any]) -> Dict[str, Any]:
+    items = {_key(key): value for key, value in obj.items()}
+    return {key: items[key] for key in sorted(items)}
+
+def _iter_json(obj: Any, depth: int) -> Iterator[bytes]:
+    if depth <= 0 or not isinstance(obj, dict):
+        yield dumps(obj)
+        return
+    yield b'{'
+    for i, (key, value) in enumerate(_keyed(obj).items()):
+        yield (b',' if i else b'') + dumps(key) + b':'
+        yield from _iter_json(value, depth - 1)
+    yield b'}'
+
+def _iter_msgpack(obj: Any, depth: int, packer) -> Iterator[bytes]:
+    if depth <= 0 or not isinstance(obj, dict):
+        yield packer.pack(normalize(obj))
+        return
+    items = _keyed(obj)
+    yield packer.pack_map_header(len(items))
+    for key, value in items.items():
+        yield packer.pack(key)
+        yield from _iter_msgpack(value, depth - 1, packer)
+
+def iter_encode(report: Dict[str, Any], fmt: str = 'json') -> Iterator[bytes]:
+    """
+    The canonical encoding of a report, in pieces: normalize()d values as compact JSON
+    with sorted keys, or as MessagePack with sorted map keys. There is one encoder per
+    format, so the bytes (and the anchored hash) do not depend on what else is installed.
+    Joining the pieces gives the same bytes as encoding the report in one call.
+    """
+    if fmt == 'json':
+        return _iter_json(report, STREAM_DEPTH)
+    if fmt == 'msgpack':
+        if msgpack is None:
+            raise ImportError("The msgpack format needs the 'msgpack' package (pip install msgpack).")
+        return _iter_msgpack(report, STREAM_DEPTH, msgpack.Packer(use_bin_type=True))
+    raise ValueError(f"Unknown report format '{fmt}', expected one of {FORMATS}.")
+
+def format_for_path(path: str) -> str:
+    return 'msgpack' if os.path.splitext(path)[1].lower() in MSGPACK_EXTENSIONS else 'json'
+
+def write_report(report: Dict[str, Any], f: IO[bytes], fmt: str = 'json') -> str:
+    """
+    Writes the canonical encoding of report to a binary file handle and returns the
+    0x-prefixed SHA-256 of exactly the bytes written, computed in the same pass.
+    """
+    sha256 = hashlib.sha256()
+    for piece in iter_encode(report, fmt):
+        sha256.update(piece)
+        f.write(piece)
+    return "0x" + sha256.hexdigest()
+
+def save_report(report: Dict[str, Any], path: str, fmt: Optional[str] = None) -> str:
+    """write_report to a file; the format follows the extension unless given."""
+    with open(path, 'wb') as f:
+        return write_report(report, f, fmt or format_for_path(path))
+
+def report_sha256(report: Dict[str, Any], fmt: str = 'json') -> str:
+    """The hash save_report would return, without writing a file."""
+    sha256 = hashlib.sha256()
+    for piece in iter_encode(report, fmt):
+        sha256.update(piece)
+    return "0x" + sha256.hexdigest()
+
+def load_report(path: str, fmt: Optional[str] = None) -> Dict[str, Any]:
+    with open(path, 'rb') as f:
+        if (fmt or format_for_path(path)) == 'msgpack':
+            if msgpack is None:
+                raise ImportError("Reading a msgpack report needs the 'msgpack' package (pip install msgpack).")
+            return msgpack.unpack(f, raw=False, strict_map_key=False)
+        return json.load(f)
@@ -0,0 +1,115 @@
+import math
+from typing import List, Optional
+import numpy as np
+
+class MomentSketch:
+    """
+    Count, mean and sum of squared deviations, updated per batch and merged with
+    Chan et al.'s parallel formula (numerically stable, unlike sum/sum-of-squares).
+    """
+    def __init__(self):
+        self.count = 0
+        self.mean = 0.0
+        self.m2 = 0.0
+
+    def update(self, values: np.ndarray) -> None:
+        values = values[~np.isnan(values)]
+        if values.size == 0:
+            return
+        batch = MomentSketch()
+        batch.count = values.size
+        batch.mean = float(values.mean())
+        batch.m2 = float(((values - batch.mean) ** 2).sum())
+        self.merge(batch)
+
+    def merge(self, other: "MomentSketch") -> None:
+        if other.count == 0:
+            return
+        total = self.count + other.count
+        delta = other.mean - self.mean
+        self.mean += delta * other.count / total
+        self.m2 += other.m2 + delta ** 2 * self.count * other.count / total
+        self.count = total
+
+    @property
+    def std(self) -> float:
+        """Population standard deviation (ddof=0, as scipy.stats.zscore)."""
+        return math.sqrt(self.m2 / self.count) if self.count else float('nan')
+
+class KLLSketch:
+    """
+    KLL quantile sketch (Karnin, Lang & Liberty, 2016).
+
+    Items live in a stack of compactors; an item at level h stands for 2^h inputs.
+    Level capacities shrink geometrically (factor 2/3) below the top level, which holds k.
+    When the sketch is full, the lowest over-capacity level is sorted and every other
+    item, from a random offset, is promoted one level up. Memory is O(k) whatever the
+    stream length. Two sketches with the same k merge by concatenating their levels and
+    compacting, so sketches built on separate chunks or partitions combine into one.
+
+    rank_error is the normalized rank error that holds with 99% confidence for a
+    single query, using the empirical fit 2.296 / k^0.9723 published for Apache
+    DataSketches' KLL implementation.
+    """
+    CAPACITY_DECAY = 2.0 / 3.0
+
+    def __init__(self, k: int = 200, seed: Optional[int] = None):
+        self.k = k
+        self.count = 0
+        self.levels: List[np.ndarray] = [np.empty(0)]
+        self._rng = np.random.default_rng(seed)
+
+    @classmethod
+    def from_accuracy(cls, epsilon: float, seed: Optional[int] = None) -> "KLLSketch":
+        """Smallest k whose rank error is at most epsilon."""
+        return cls(k=max(8, math.ceil((2.296 / epsilon) ** (1 / 0.9723))), seed=seed)
+
+    @property
+    def rank_error(self) -> float:
+        return 2.296 / self.k ** 0.9723
+
+    def _capacity(self, level: int) -> int:
+        depth = len(self.levels) - 1 - level
+        return max(2, int(math.ceil(self.k * self.CAPACITY_DECAY ** depth)))
+
+    def update(self, values: np.ndarray) -> None:
+        values = values[~np.isnan(values)]
+        if values.size == 0:
+            return
+        self.count += values.size
+        self.levels[0] = np.concatenate([self.levels[0], values.astype(float, copy=False)])
+        self._compress()
+
+    def merge(self, other: "KLLSketch") -> None:
+        if other.k != self.k:
+            raise ValueError("Cannot merge KLL sketches with different k.")
+        while len(self.levels) < len(other.levels):
+            self.levels.append(np.empty(0))
+        for level, items in enumerate(other.levels):
+            self.levels[level] = np.concatenate([self.levels[level], items])
+        self.count += other.count
+        self._compress()
+
+    def _compress(self) -> None:
+        while sum(len(items) for items in self.levels) > sum(self._capacity(h) for h in range(len(self.levels))):
+            level = next(h for h in range(len(self.levels)) if len(self.levels[h]) > self._capacity(h))
+            if level == len(self.levels) - 1:
+                self.levels.append(np.empty(0))
+
+            items = np.sort(self.levels[level])
+            keep = items[:len(items) % 2]
+            pairs = items[len(items) % 2:]
+            promoted = pairs[int(self._rng.integers(2))::2]
+
+            self.levels[level] = keep
+            self.levels[level + 1] = np.concatenate([self.levels[level + 1], promoted])
+
+    def quantile(self, q: float) -> float:
+        if self.count == 0:
+            return float('nan')
+        items = np.concatenate(self.levels)
+        weights = np.concatenate([np.full(len(level_items), 2.0 ** h) for h, level_items in enumerate(self.levels)])
+        order = np.argsort(items, kind='stable')
+        cumulative = np.cumsum(weights[order])
+        position = np.searchsorted(cumulative, q * cumulative[-1], side='left')
+        return float(items[order][min(position, len(items) - 1)])
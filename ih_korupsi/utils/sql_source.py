@@ -0,0 +1,151 @@
+import hashlib
+import json
+import sqlite3
+from typing import Any, Dict, Iterator, List, Optional, Sequence, Tuple
+import pandas as pd
+from .hashing import file_sha256
+
+class SQLiteSource:
+    """
+    A transactions table in a SQLite file, optionally restricted to a date range and
+    to given values of some columns. Detectors query it through DetectorAccumulator.update_from_sql():
+    GROUP BY aggregates (monthly sums, per-entity max/sum/count, edge totals) run inside
+    SQLite and only their result rows reach Python. Row-level statistics read just the
+    columns they need, chunksize rows at a time, in table order.
+
+    Date filters compare the stored text, so the date column must hold ISO-8601 text
+    ('YYYY-MM-DD' or 'YYYY-MM-DD HH:MM:SS', as written by DataFrame.to_sql). start and
+    end are whole days, both inclusive.
+    filters maps a column to the values it may take, e.g. {"unit_id": ["U001", "U002"]}.
+    """
+    def __init__(self, path: str, table: str = 'transactions', date_col: str = 'date',
+                 start: Optional[str] = None, end: Optional[str] = None,
+                 filters: Optional[Dict[str, Sequence[Any]]] = None):
+        self.path = path
+        self.table = table
+        self.date_col = date_col
+        self.start = pd.Timestamp(start).normalize() if start else None
+        self.end = pd.Timestamp(end).normalize() if end else None
+        self.filters = {col: list(values) for col, values in (filters or {}).items()}
+        # A missing file would otherwise be created empty by sqlite3.connect.
+        self.conn = sqlite3.connect(f"file:{path}?mode=ro", uri=True)
+
+        self.columns = [row[1] for row in self.conn.execute(f"PRAGMA table_info({self.quote(table)})")]
+        if not self.columns:
+            raise ValueError(f"Table '{table}' not found in {path}.")
+        for col in [*self.filters, *([date_col] if self.start or self.end else [])]:
+            if col not in self.columns:
+                raise ValueError(f"Column '{col}' not found in table '{table}'.")
+
+        # Views and WITHOUT ROWID tables have no stable row order; their rows come back
+        # in whatever order SQLite scans them.
+        kind = self.conn.execute("SELECT type, sql FROM sqlite_master WHERE name = ?", (table,)).fetchone()
+        self.has_rowid = kind is not None and kind[0] == 'table' and 'WITHOUT ROWID' not in (kind[1] or '').upper()
+        self._where, self._params = self._base_where()
+        self._staged = 0
+
+    @staticmethod
+    def quote(name: str) -> str:
+        """Quotes an identifier for SQL."""
+        return '"' + name.replace('"', '""') + '"'
+
+    def _base_where(self) -> Tuple[str, List[Any]]:
+        clauses, params = [], []
+        date = self.quote(self.date_col)
+        if self.start is not None:
+            clauses.append(f"{date} >= ?")
+            params.append(self.start.strftime('%Y-%m-%d'))
+        if self.end is not None:
+            clauses.append(f"{date} < ?")
+            params.append((self.end + pd.Timedelta(days=1)).strftime('%Y-%m-%d'))
+        for col, values in self.filters.items():
+            clauses.append(f"{self.quote(col)} IN ({', '.join('?' * len(values))})")
+            params.extend(values)
+        return " AND ".join(clauses) or "1", params
+
+    def _sql(self, select: str, where: Optional[str], tail: str) -> str:
+        condition = self._where if where is None else f"{self._where} AND ({where})"
+        return f"SELECT {select} FROM {self.quote(self.table)} WHERE {condition} {tail}"
+
+    def sql(self, select: str, where: Optional[str] = None, tail: str = '', params: Sequence[Any] = ()) -> Tuple[str, List[Any]]:
+        """
+        SELECT <select> FROM <table> WHERE <filters> AND (<where>) <tail> and its parameters:
+        the filter parameters, then those of where and tail. select itself must not
+        contain placeholders. Can be nested as a subquery.
+        """
+        return self._sql(select, where, tail), [*self._params, *params]
+
+    def query(self, select: str, where: Optional[str] = None, tail: str = '', params: Sequence[Any] = ()) -> pd.DataFrame:
+        """Runs the statement built by sql() and returns the result."""
+        statement, params = self.sql(select, where, tail, params)
+        return pd.read_sql_query(statement, self.conn, params=params)
+
+    def iter_chunks(self, chunksize: int, columns: Optional[List[str]] = None, where: Optional[str] = None,
+                    params: Sequence[Any] = ()) -> Iterator[pd.DataFrame]:
+        """Streams the filtered rows (only `columns`, default all) in table order."""
+        yield from pd.read_sql_query(self._rows_sql(columns, where), self.conn, params=[*self._params, *params], chunksize=chunksize)
+
+    def read(self, columns: Optional[List[str]] = None) -> pd.DataFrame:
+        """The filtered rows as one DataFrame."""
+        return pd.read_sql_query(self._rows_sql(columns, None), self.conn, params=self._params)
+
+    def _rows_sql(self, columns: Optional[List[str]], where: Optional[str]) -> str:
+        select = ", ".join(self.quote(col) for col in columns) if columns else "*"
+        return self._sql(select, where, "ORDER BY rowid" if self.has_rowid else "")
+
+    def stage(self, frame: pd.DataFrame) -> str:
+        """
+        Copies a small frame (e.g. a list of keys) into a temporary table on this
+        connection, so later queries can join or filter against it. Returns the quoted name.
+        """
+        self._staged += 1
+        name = f"ih_korupsi_stage_{self._staged}"
+        columns = ", ".join(self.quote(str(col)) for col in frame.columns)
+        self.conn.execute(f"CREATE TEMP TABLE {self.quote(name)} ({columns})")
+        rows = frame.astype(object).where(frame.notna(), None).itertuples(index=False, name=None)
+        self.conn.executemany(f"INSERT INTO temp.{self.quote(name)} VALUES ({', '.join('?' * len(frame.columns))})", rows)
+        return f"temp.{self.quote(name)}"
+
+    def iso_dates(self) -> bool:
+        """True if every non-null date in the filtered rows is ISO-8601 text that SQLite's date functions understand."""
+        date = self.quote(self.date_col)
+        if self.date_col not in self.columns:
+            return False
+        bad = self.conn.execute(self._sql("1", f"{date} IS NOT NULL AND (typeof({date}) != 'text' OR strftime('%Y', {date}) IS NULL)", "LIMIT 1"),
+                                self._params).fetchone()
+        return bad is None
+
+    def totals(self, amount_col: str = 'amount') -> Tuple[int, float]:
+        """Row count and amount total of the filtered rows."""
+        rows, amount = self.conn.execute(self._sql(f"COUNT(*), TOTAL({self.quote(amount_col)})", None, ""), self._params).fetchone()
+        return int(rows), float(amount)
+
+    def describe(self) -> Dict[str, Any]:
+        """Table and filters, for the report metadata."""
+        return {
+            "table": self.table,
+            "start_date": self.start.strftime('%Y-%m-%d') if self.start is not None else None,
+            "end_date": self.end.strftime('%Y-%m-%d') if self.end is not None else None,
+            "filters": self.filters
+        }
+
+    def fingerprint(self) -> Optional[str]:
+        """
+        SHA-256 of the database file combined with the table and filters, for the result
+        cache: the same file read with other filters is different input. Changes still
+        sitting in a WAL file are not covered; checkpoint the database first.
+        """
+        digest = file_sha256(self.path)
+        if digest is None:
+            return None
+        material = json.dumps({"file": digest, **self.describe()}, sort_keys=True, default=str)
+        return "0x" + hashlib.sha256(material.encode('utf-8')).hexdigest()
+
+    def close(self):
+        self.conn.close()
+
+    def __enter__(self) -> "SQLiteSource":
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
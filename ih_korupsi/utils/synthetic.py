@@ -0,0 +1,203 @@
+from typing import Any, Dict, List, Optional, Tuple
+import numpy as np
+import pandas as pd
+
+# Keeping Indonesian names as part of the 'IH-Korupsi' branding context
+PREFIXES = np.array(["PT.", "CV.", "UD.", "Koperasi", "Yayasan"])
+WORDS = np.array(["Maju", "Jaya", "Sumber", "Makmur", "Berdikari", "Sejahtera", "Abadi", "Karya",
+                  "Mandiri", "Nusantara", "Sentosa", "Utama", "Persada", "Bangun", "Konstruksi",
+                  "Teknik", "Global", "Solusi", "Sarana", "Prima", "Mitra", "Indah", "Lestari"])
+SYLLABLES = np.array(["ka", "ra", "ma", "su", "ti", "no", "la", "wi", "da", "ri", "sa", "to", "ba", "ne", "gu", "pa"])
+
+LABELS = ["normal", "benford", "rsf", "velocity", "year_end", "cycle"]
+SECONDS_PER_YEAR = 365 * 86400
+
+def max_planted_rows(cycles: int = 5, cycle_length: Tuple[int, int] = (3, 5), rsf_vendors: int = 5, velocity_vendors: int = 5,
+                     burst_size: int = 30, dumping_vendors: int = 3, years: int = 1, **kwargs) -> int:
+    """Upper bound of the planted rows generate_ledger() appends with these settings (cycles at their longest)."""
+    return rsf_vendors * 4 + velocity_vendors * burst_size + dumping_vendors * 6 * years + cycles * cycle_length[1]
+
+def generate_ledger(rows: int = 10_000, seed: Optional[int] = None, vendors: Optional[int] = None, units: Optional[int] = None,
+                    partners_per_unit: int = 20, cycles: int = 5, cycle_length: Tuple[int, int] = (3, 5),
+                    duplicate_names: int = 5, benford_rate: float = 0.05, rsf_vendors: int = 5,
+                    velocity_vendors: int = 5, burst_size: int = 30, dumping_vendors: int = 3,
+                    start: str = '2025-01-01', years: int = 1) -> Tuple[pd.DataFrame, Dict[str, Any]]:
+    """
+    Vectorized synthetic ledger with planted anomalies and their ground truth.
+
+    Normal traffic flows from work units (sender_id "U...") to vendors ("V..."). Each unit
+    trades with partners_per_unit random vendors, which sets the graph density. Amounts
+    are lognormal around a per-vendor scale, so they roughly follow Benford's law. Dates
+    are uniform over `years` years at one-second resolution. Planted anomalies:
+
+      - benford:  a benford_rate share of rows gets invented 5XY,000 amounts.
+      - rsf:      rsf_vendors vendors get one payment 100x their usual size.
+      - velocity: velocity_vendors vendors get burst_size payments within 30 minutes,
+                  starting just before midnight.
+      - year_end: dumping_vendors vendors have 60% of their payments moved into December.
+      - cycle:    `cycles` loops of vendor-to-vendor transfers over disjoint vendors, with
+                  legs 1-3 days apart and near-equal amounts. They are the only edges
+                  between vendors, so the graph has exactly `cycles` simple cycles.
+      - duplicate_names extra vendors carry one-letter variants of existing vendor names.
+
+    Planted rows are appended after the normal rows. Id and name columns are
+    categoricals, so 10^8 rows stay within a few GB.
+
+    Returns (df, truth). truth["labels"] is a categorical row label aligned with df, and
+    the other truth entries list the planted entities, name pairs and cycles.
+    """
+    rng = np.random.default_rng(seed)
+    vendors = vendors or max(50, rows // 500)
+    units = units or max(10, rows // 5000)
+
+    planted_vendors = rsf_vendors + velocity_vendors + dumping_vendors + cycles * cycle_length[1]
+    if planted_vendors > vendors:
+        raise ValueError(f"{vendors} vendors cannot host {planted_vendors} planted vendors; raise `vendors`.")
+    lengths = rng.integers(cycle_length[0], cycle_length[1] + 1, size=cycles)
+    planted_rows = rsf_vendors * 4 + velocity_vendors * burst_size + dumping_vendors * 6 * years + int(lengths.sum())
+    if rows < 1:
+        raise ValueError("rows must be at least 1.")
+    if planted_rows > rows // 2:
+        raise ValueError(f"{rows} rows are too few for {planted_rows} planted rows.")
+
+    names = _vendor_names(rng, vendors)
+    duplicate_of = rng.choice(vendors, size=duplicate_names, replace=False)
+    names = np.concatenate([names, [_typo(rng, names[v]) for v in duplicate_of]])
+    vendor_count = len(names)
+
+    roles = rng.permutation(vendors)[:planted_vendors]
+    rsf_ids, roles = roles[:rsf_vendors], roles[rsf_vendors:]
+    velocity_ids, roles = roles[:velocity_vendors], roles[velocity_vendors:]
+    dumping_ids, cycle_pool = roles[:dumping_vendors], roles[dumping_vendors:]
+
+    log_scale = rng.normal(np.log(5_000_000), 1.0, size=vendor_count)
+    origin = np.datetime64(pd.Timestamp(start).floor('s').to_datetime64(), 's')
+    span = years * SECONDS_PER_YEAR
+
+    # Normal traffic.
+    n = rows - planted_rows
+    partners = rng.integers(vendor_count, size=(units, partners_per_unit))
+    # Both names of every duplicate pair must trade, or String Detective never sees them.
+    paired = np.concatenate([duplicate_of, np.arange(vendors, vendor_count)])
+    partners.flat[rng.choice(partners.size, size=len(paired), replace=False)] = paired
+    sender = rng.integers(units, size=n)
+    vendor = partners[sender, rng.integers(partners_per_unit, size=n)]
+    amount = np.round(np.exp(log_scale[vendor] + 0.8 * rng.standard_normal(n)), 2)
+    offset = rng.integers(span, size=n)
+    label = np.zeros(n, dtype=np.int8)
+
+    fabricated = rng.random(n) < benford_rate
+    amount[fabricated] = 500_000 + rng.integers(100, size=int(fabricated.sum())) * 1_000.0
+    label[fabricated] = LABELS.index("benford")
+
+    dumped = np.isin(vendor, dumping_ids) & (rng.random(n) < 0.6)
+    offset[dumped] = _december(rng, offset[dumped] // SECONDS_PER_YEAR, origin)
+    label[dumped] = LABELS.index("year_end")
+
+    blocks = [(sender, vendor, amount, offset, label)]
+
+    # RSF: three ordinary payments plus one 100x payment per vendor.
+    rsf_vendor = np.repeat(rsf_ids, 4)
+    rsf_amount = np.exp(log_scale[rsf_vendor])
+    rsf_amount[3::4] *= 100
+    rsf_label = np.zeros(len(rsf_vendor), dtype=np.int8)
+    rsf_label[3::4] = LABELS.index("rsf")
+    blocks.append((rng.integers(units, size=len(rsf_vendor)), rsf_vendor, np.round(rsf_amount, 2),
+                   rng.integers(span, size=len(rsf_vendor)), rsf_label))
+
+    # Velocity: bursts that start between 23:40 and 23:55 and last up to 30 minutes.
+    burst_vendor = np.repeat(velocity_ids, burst_size)
+    burst_day = np.repeat(rng.integers(span // 86400, size=velocity_vendors), burst_size)
+    burst_start = burst_day * 86400 + 23 * 3600 + np.repeat(rng.integers(40, 56, size=velocity_vendors), burst_size) * 60
+    blocks.append((rng.integers(units, size=len(burst_vendor)), burst_vendor,
+                   np.round(np.exp(log_scale[burst_vendor] + 0.8 * rng.standard_normal(len(burst_vendor))), 2),
+                   np.minimum(burst_start + rng.integers(1800, size=len(burst_vendor)), span - 1),
+                   np.full(len(burst_vendor), LABELS.index("velocity"), dtype=np.int8)))
+
+    # Year-end: six December payments per dumping vendor and year, so small ledgers show the spike too.
+    dump_vendor = np.repeat(dumping_ids, 6 * years)
+    dump_year = np.tile(np.repeat(np.arange(years), 6), dumping_vendors)
+    blocks.append((rng.integers(units, size=len(dump_vendor)), dump_vendor,
+                   np.round(np.exp(log_scale[dump_vendor] + 0.8 * rng.standard_normal(len(dump_vendor))), 2),
+                   _december(rng, dump_year, origin), np.full(len(dump_vendor), LABELS.index("year_end"), dtype=np.int8)))
+
+    # Cycles over disjoint vendors: vendor i pays vendor i+1, the last pays the first.
+    cycle_nodes: List[List[int]] = []
+    cycle_rows = []
+    for k, length in enumerate(lengths.tolist()):
+        nodes = cycle_pool[k * cycle_length[1]:k * cycle_length[1] + length]
+        cycle_nodes.append(nodes.tolist())
+        times = int(rng.integers(span - 15 * 86400)) + np.cumsum(rng.integers(86400, 3 * 86400, size=length))
+        amounts = np.round(np.exp(log_scale[nodes[0]]) * 0.99 ** np.arange(length), 2)
+        cycle_rows.append((nodes, np.roll(nodes, -1), amounts, times))
+    cycle_senders = None
+    if cycle_rows:
+        cycle_senders, cycle_receivers, cycle_amounts, cycle_times = (np.concatenate(parts) for parts in zip(*cycle_rows))
+
+    sender = np.concatenate([b[0] for b in blocks])
+    vendor = np.concatenate([b[1] for b in blocks])
+    amount = np.concatenate([b[2] for b in blocks])
+    offset = np.concatenate([b[3] for b in blocks])
+    label = np.concatenate([b[4] for b in blocks])
+
+    unit_ids = np.char.add("U", np.char.zfill(np.arange(units).astype(str), 5))
+    vendor_ids = np.char.add("V", np.char.zfill(np.arange(vendor_count).astype(str), 6))
+    # Senders index one table of units followed by vendors, so vendor-to-vendor legs share codes with receivers.
+    parties = pd.Index(np.concatenate([unit_ids, vendor_ids]))
+    sender_codes = sender
+    if cycle_senders is not None:
+        sender_codes = np.concatenate([sender, units + cycle_senders])
+        vendor = np.concatenate([vendor, cycle_receivers])
+        amount = np.concatenate([amount, cycle_amounts])
+        offset = np.concatenate([offset, cycle_times])
+        label = np.concatenate([label, np.full(len(cycle_receivers), LABELS.index("cycle"), dtype=np.int8)])
+
+    vendor_categories = pd.Index(vendor_ids)
+    df = pd.DataFrame({
+        "transaction_id": np.arange(len(vendor), dtype=np.int64),
+        "date": (origin + offset.astype('timedelta64[s]')).astype('datetime64[ns]'),
+        "amount": amount,
+        "vendor_name": pd.Categorical.from_codes(vendor, categories=pd.Index(names)),
+        "vendor_id": pd.Categorical.from_codes(vendor, categories=vendor_categories),
+        "sender_id": pd.Categorical.from_codes(sender_codes, categories=parties),
+        "receiver_id": pd.Categorical.from_codes(vendor, categories=vendor_categories)
+    })
+
+    truth = {
+        "labels": pd.Categorical.from_codes(label, categories=LABELS),
+        "rsf_vendors": vendor_ids[rsf_ids].tolist(),
+        "velocity_vendors": vendor_ids[velocity_ids].tolist(),
+        "dumping_vendors": vendor_ids[dumping_ids].tolist(),
+        "duplicate_name_pairs": [(names[v], names[vendors + i]) for i, v in enumerate(duplicate_of)],
+        "cycles": [vendor_ids[nodes].tolist() for nodes in cycle_nodes]
+    }
+    return df, truth
+
+def _vendor_names(rng: np.random.Generator, count: int) -> np.ndarray:
+    """Prefix, two stock words and an invented three-syllable word, unique per vendor."""
+    prefix = PREFIXES[rng.integers(len(PREFIXES), size=count)]
+    words = WORDS[rng.integers(len(WORDS), size=(count, 2))]
+    syllables = SYLLABLES[rng.integers(len(SYLLABLES), size=(count, 3))]
+    invented = np.char.capitalize(np.char.add(np.char.add(syllables[:, 0], syllables[:, 1]), syllables[:, 2]))
+    names = [f"{p} {w1} {w2} {inv}" for p, (w1, w2), inv in zip(prefix, words, invented)]
+    names = pd.Series(names)
+    # Guarantee unique names; repeated draws get a numbered suffix.
+    repeat = names.groupby(names).cumcount()
+    names[repeat > 0] = names[repeat > 0] + " " + (repeat[repeat > 0] + 1).astype(str)
+    return names.to_numpy(dtype=object)
+
+def _typo(rng: np.random.Generator, name: str) -> str:
+    """One letter of the name replaced by another, past the legal-form prefix."""
+    position = int(rng.integers(len(name) // 2, len(name)))
+    while not name[position].isalpha():
+        position -= 1
+    letters = [c for c in "aeiounrst" if c != name[position].lower()]
+    letter = letters[int(rng.integers(len(letters)))]
+    return name[:position] + (letter.upper() if name[position].isupper() else letter) + name[position + 1:]
+
+def _december(rng: np.random.Generator, year: np.ndarray, origin: np.datetime64) -> np.ndarray:
+    """Random second offsets (from origin) inside December of the given year offsets."""
+    first_year = origin.astype('datetime64[Y]').astype(np.int64)
+    december = (np.asarray(year) + first_year).astype('datetime64[Y]').astype('datetime64[M]') + np.timedelta64(11, 'M')
+    base = (december.astype('datetime64[s]') - origin).astype(np.int64)
+    return base + rng.integers(31 * 86400, size=len(base))
@@ -0,0 +1,131 @@
+import time
+from bisect import bisect_left, bisect_right
+from typing import Iterator, List, Optional
+import numpy as np
+
+class TemporalCycleEnumerator:
+    """
+    Lazily yields time-respecting cycles from a list of timestamped transfers.
+
+    A temporal cycle is a sequence of transfers e1 -> e2 -> ... -> ek where each
+    transfer leaves the node the previous one arrived at, happens strictly after it,
+    every transfer falls within `window` of e1, no node is visited twice, and the last
+    transfer returns to the sender of e1. With amount_tolerance set, each leg must also
+    move an amount within that relative tolerance of the previous leg.
+
+    Timestamps strictly increase along a cycle, so its first transfer is always the
+    earliest one. Each cycle is therefore found exactly once, from that transfer. At
+    every step only the outgoing transfers inside (last_time, start_time + window] are
+    considered, via binary search on per-node time-sorted edge lists. That prunes far
+    more than static enumeration, which has to consider every neighbour.
+
+    With strict=False a leg may also happen at the same time as the previous one. This
+    is meant for date-only data, where every transfer of a day has the same timestamp
+    and their order within the day is unknown. A loop whose legs are all on one day can
+    then be started from any of its legs; it is only reported from its lowest-indexed
+    leg, so each cycle is still found exactly once.
+
+    Cycles are yielded as lists of edge indices into the input arrays. Node ids must be
+    non-negative; drop transfers with a missing sender or receiver first.
+    """
+    CHECK_EVERY = 1024
+
+    def __init__(self, sources: np.ndarray, targets: np.ndarray, timestamps: np.ndarray, amounts: np.ndarray,
+                 window: int, amount_tolerance: Optional[float] = None, max_length: Optional[int] = None,
+                 time_budget: Optional[float] = None, strict: bool = True):
+        self.window = window
+        self.strict = strict
+        self.amount_tolerance = amount_tolerance
+        self.max_length = max_length
+        self.time_budget = time_budget
+        self.exhausted = False
+        self.timed_out = False
+
+        self._sources = sources.tolist()
+        self._targets = targets.tolist()
+        self._times = timestamps.tolist()
+        self._amounts = amounts.tolist()
+
+        # Outgoing transfers of every node, sorted by time (CSR layout).
+        order = np.lexsort((timestamps, sources))
+        n_nodes = int(max(sources.max(initial=-1), targets.max(initial=-1))) + 1
+        self._indptr = np.concatenate(([0], np.cumsum(np.bincount(sources, minlength=n_nodes)))).tolist()
+        self._out_edges = order.tolist()
+        self._out_times = timestamps[order].tolist()
+
+    def __iter__(self) -> Iterator[List[int]]:
+        deadline = None if self.time_budget is None else time.perf_counter() + self.time_budget
+        steps = 0
+        first_edges = sorted(range(len(self._times)), key=self._times.__getitem__)
+
+        for first in first_edges:
+            origin = self._sources[first]
+            if self._targets[first] == origin:
+                yield [first]
+                continue
+
+            horizon = self._times[first] + self.window
+            path = [first]
+            visited = {origin, self._targets[first]}
+            frames = [self._candidates(first, horizon)]
+
+            while frames:
+                steps += 1
+                if deadline is not None and steps % self.CHECK_EVERY == 0 and time.perf_counter() > deadline:
+                    self.timed_out = True
+                    return
+
+                frame = frames[-1]
+                advanced = False
+                while frame[0] < frame[1]:
+                    edge = self._out_edges[frame[0]]
+                    frame[0] += 1
+                    if not self._conserves(path[-1], edge):
+                        continue
+                    target = self._targets[edge]
+                    if target == origin:
+                        if (self.max_length is None or len(path) < self.max_length) and self._canonical(path, edge):
+                            yield path + [edge]
+                        continue
+                    if target in visited:
+                        continue
+                    if self.max_length is not None and len(path) + 2 > self.max_length:
+                        continue
+                    path.append(edge)
+                    visited.add(target)
+                    frames.append(self._candidates(edge, horizon))
+                    advanced = True
+                    break
+
+                if not advanced:
+                    frames.pop()
+                    visited.discard(self._targets[path.pop()])
+
+        self.exhausted = True
+
+    def _candidates(self, edge: int, horizon: int) -> List[int]:
+        """
+        Position range of the transfers leaving edge's target after it (or at the same
+        time, unless strict) and no later than horizon.
+        """
+        node = self._targets[edge]
+        lo, hi = self._indptr[node], self._indptr[node + 1]
+        start = (bisect_right if self.strict else bisect_left)(self._out_times, self._times[edge], lo, hi)
+        stop = bisect_right(self._out_times, horizon, lo, hi)
+        return [start, stop]
+
+    def _canonical(self, path: List[int], last: int) -> bool:
+        """
+        False for a repeat of a cycle found from another start. Without strict order, a
+        cycle can be started from another leg only when all legs share one timestamp;
+        it is then reported from its lowest-indexed leg.
+        """
+        if self.strict or self._times[last] != self._times[path[0]]:
+            return True
+        return path[0] < last and path[0] == min(path)
+
+    def _conserves(self, previous: int, edge: int) -> bool:
+        if self.amount_tolerance is None:
+            return True
+        before = self._amounts[previous]
+        return abs(self._amounts[edge] - before) <= self.amount_tolerance * abs(before)
@@ -0,0 +1,66 @@
+import re
+from typing import Dict, Sequence, Tuple
+import numpy as np
+import pandas as pd
+
+def as_datetime(series: pd.Series) -> pd.Series:
+    """
+    Returns series as datetime64 without touching the caller's frame. A column the
+    engine (or loader) already parsed is returned as is, so the string parse runs once
+    per dataset instead of once per detector.
+    """
+    if pd.api.types.is_datetime64_any_dtype(series):
+        return series
+    return pd.to_datetime(series)
+
+DAY_SECONDS = 86_400
+
+def window_seconds(window: str) -> int:
+    # Lower-case 'd'/'w' units ("7d") are deprecated in pandas; read them as 'D'/'W'.
+    window = re.sub(r'(?<=[\d\s])([dw])$', lambda m: m.group(1).upper(), window.strip())
+    return int(pd.Timedelta(window).total_seconds())
+
+def is_date_only(timestamps: pd.Series) -> bool:
+    """True if there is at least one timestamp and every non-null one falls on midnight, i.e. the data has no time of day."""
+    values = timestamps.dropna()
+    return len(values) > 0 and bool((values == values.dt.normalize()).all())
+
+def sliding_window_counts(entities: pd.Series, timestamps: pd.Series, windows: Sequence[str]) -> Tuple[pd.DataFrame, Dict[str, np.ndarray]]:
+    """
+    For every transaction, the number of transactions of the same entity in the
+    trailing window (t - w, t], for several window lengths in one pass.
+
+    Rows are sorted once by (entity, time). Entity code and time offset are then packed
+    into one int64 key, code * stride + seconds, where stride exceeds the whole time
+    span plus the longest window. A window of a transaction can then never reach into
+    the previous entity. For each window, one np.searchsorted over the keys gives the
+    first row inside it. Windows are not tied to calendar days, so a burst that spans
+    midnight is counted as one burst. Time resolution is one second.
+
+    Returns the sorted rows (entity, time) and, per window, an array of the counts and an
+    array of the first row in the window (positions into the sorted rows).
+    """
+    codes, labels = pd.factorize(entities)
+    seconds = timestamps.to_numpy(dtype='datetime64[ns]').astype('datetime64[s]').astype(np.int64)
+    valid = (codes >= 0) & ~pd.isna(timestamps.to_numpy())
+    codes, seconds = codes[valid].astype(np.int64), seconds[valid]
+
+    order = np.lexsort((seconds, codes))
+    codes, seconds = codes[order], seconds[order]
+    rows = pd.DataFrame({"entity": labels.take(codes), "time": seconds.astype('datetime64[s]')})
+    if len(codes) == 0 or not windows:
+        return rows, {w: (np.zeros(0, dtype=np.int64), np.zeros(0, dtype=np.int64)) for w in windows}
+
+    offsets = seconds - seconds.min()
+    stride = int(offsets.max()) + max(window_seconds(w) for w in windows) + 1
+    if len(labels) * stride >= 2 ** 63:
+        raise ValueError("Time span too long for the packed (entity, time) key; split the data by period.")
+    keys = codes * stride + offsets
+
+    # One past the last row at the same instant, so simultaneous transactions all see each other.
+    stop = np.searchsorted(keys, keys, side='right')
+    result = {}
+    for w in windows:
+        first = np.searchsorted(keys, keys - window_seconds(w), side='right')
+        result[w] = (stop - first, first)
+    return rows, result
@@ -1,8 +1,18 @@
 import argparse
+import cProfile
+import pstats
+import sqlite3
 import sys
 import json
+import os
 from ih_korupsi.utils.data_loader import DataLoader
 from ih_korupsi.core.engine import FraudEngine
+from ih_korupsi.core.batch import BatchAuditor
+from ih_korupsi.core.registry import registry
+from ih_korupsi.core.cache import ResultCache
+from ih_korupsi.core.instrumentation import measure
+from ih_korupsi.utils.hashing import file_sha256
+from ih_korupsi.utils.sql_source import SQLiteSource
 from ih_korupsi.utils.report_generator import ReportGenerator
 
 try:
@@ -10,38 +20,225 @@ try:
 except ImportError:
     EvidenceReporter = None
 
+def add_detector_arguments(parser: argparse.ArgumentParser):
+    """Detector options, shared by single-file runs and the batch subcommand."""
+    parser.add_argument("--detectors", type=str, help="Comma-separated detectors to run (default: all), e.g. mathematician,chronologist; see --list-detectors")
+    parser.add_argument("--skip", type=str, help="Comma-separated detectors not to run, e.g. connector")
+    parser.add_argument("--list-detectors", action="store_true", help="Print the registered detectors and exit")
+    parser.add_argument("--brute-force-strings", action="store_true", help="Compare every vendor-name pair instead of using the q-gram candidate index (for cross-checking)")
+    parser.add_argument("--max-cycle-length", type=int, help="Only report circular trading loops up to this many hops")
+    parser.add_argument("--cycle-time-budget", type=float, default=30.0, help="Seconds allowed for cycle enumeration before the count is reported as a lower bound")
+    parser.add_argument("--temporal-window-days", type=float, default=30.0, help="Maximum span (days) of a time-respecting circular trading loop")
+    parser.add_argument("--amount-tolerance", type=float, help="If set, each leg of a temporal loop must move an amount within this relative tolerance of the previous leg (e.g. 0.1)")
+    parser.add_argument("--no-temporal-cycles", action="store_true", help="Skip time-respecting loops (they retain every dated transfer in streaming mode)")
+    parser.add_argument("--graph-backend", type=str, choices=['networkx', 'sparse'], default='networkx', help="Graph engine for The Connector (sparse = SciPy CSR, for millions of edges)")
+    parser.add_argument("--betweenness-epsilon", type=float, default=0.05, help="Error bound of sampled betweenness on the sparse backend")
+    parser.add_argument("--outlier-method", type=str, choices=['exact', 'sketch'], default='exact', help="Global outlier quantiles: exact sort, or bounded-memory KLL sketch (two passes in streaming mode)")
+    parser.add_argument("--outlier-accuracy", type=float, default=0.01, help="Rank error bound of the KLL sketch for --outlier-method sketch")
+    parser.add_argument("--no-entity-outliers", action="store_true", help="Skip per-entity robust z-scores (they retain the amount column in streaming mode)")
+    parser.add_argument("--velocity-thresholds", type=str, help="Sliding windows and counts for the velocity check, e.g. '1h=3,24h=5,7d=15' (flag an entity with more transactions than the count inside the window)")
+    parser.add_argument("--no-velocity", action="store_true", help="Skip the velocity check (it retains every (entity, timestamp) pair in streaming mode)")
+    parser.add_argument("--fiscal-year-start", type=int, default=1, help="Month (1-12) the fiscal year starts in, for budget-dumping analysis")
+    parser.add_argument("--fiscal-entity-col", type=str, help="Column to rank budget dumping by, e.g. a spending-unit column (defaults to vendor_id)")
+
+def add_cache_arguments(parser: argparse.ArgumentParser):
+    parser.add_argument("--cache-dir", type=str, default=".ih_korupsi_cache", help="Directory of the detector result cache")
+    parser.add_argument("--cache-size-mb", type=int, default=512, help="Size limit of the result cache; least recently used entries are evicted")
+    parser.add_argument("--no-cache", action="store_true", help="Recompute every detector instead of reusing cached results")
+
+def detector_selection(args: argparse.Namespace) -> dict:
+    """FraudEngine keyword arguments for --detectors / --skip; exits on an unknown name."""
+    if args.list_detectors:
+        print("\n".join(registry.keys()))
+        sys.exit(0)
+    selection = {
+        "detectors": [name for name in args.detectors.split(',') if name.strip()] if args.detectors else None,
+        "skip": [name for name in args.skip.split(',') if name.strip()] if args.skip else []
+    }
+    try:
+        for name in (selection["detectors"] or []) + selection["skip"]:
+            registry.resolve(name)
+    except KeyError as e:
+        print(f"Error: {e.args[0]}")
+        sys.exit(1)
+    return selection
+
+def detector_options_from(args: argparse.Namespace) -> dict:
+    options = {
+        "The Connector": {
+            "max_cycle_length": args.max_cycle_length,
+            "cycle_time_budget": args.cycle_time_budget,
+            "temporal_window_days": args.temporal_window_days,
+            "amount_tolerance": args.amount_tolerance,
+            "backend": args.graph_backend,
+            "betweenness_epsilon": args.betweenness_epsilon,
+            "temporal_cycles": not args.no_temporal_cycles
+        },
+        "The Chronologist": {
+            "fiscal_year_start": args.fiscal_year_start,
+            "fiscal_entity_col": args.fiscal_entity_col,
+            "velocity": not args.no_velocity
+        },
+        "The Mathematician": {
+            "outlier_method": args.outlier_method,
+            "outlier_accuracy": args.outlier_accuracy,
+            "entity_outliers": not args.no_entity_outliers
+        }
+    }
+    if args.velocity_thresholds:
+        thresholds = dict(item.split('=') for item in args.velocity_thresholds.split(','))
+        options["The Chronologist"]["velocity_thresholds"] = {w.strip(): int(n) for w, n in thresholds.items()}
+    if args.brute_force_strings:
+        options["String Detective"] = {"method": "brute"}
+    return options
+
+def batch_main(argv):
+    parser = argparse.ArgumentParser(prog="main.py batch", description="Audit every file of a directory or glob pattern on a process pool")
+    parser.add_argument("inputs", type=str, help="Directory (searched recursively for .csv/.json/.jsonl/.db/.sqlite files) or glob pattern, e.g. 'exports/**/*.csv'")
+    parser.add_argument("--output-dir", type=str, default="reports", help="Directory for the per-file reports and index.json")
+    parser.add_argument("--type", type=str, choices=['csv', 'json', 'sql'], help="Data format of every input (default: by file extension)")
+    parser.add_argument("--table", type=str, default="transactions", help="Table (or view) to analyze in SQLite inputs")
+    parser.add_argument("--jobs", type=int, help="Files audited in parallel (worker processes; default CPU count). Peak memory grows with this")
+    parser.add_argument("--chunksize", type=int, help="Stream each input in chunks of this many rows (out-of-core mode)")
+    parser.add_argument("--html", action="store_true", help="Also write an HTML report next to each JSON report")
+    parser.add_argument("--force", action="store_true", help="Audit every file, even if its input hash is unchanged since the last run")
+    parser.add_argument("--report-url", type=str, help="(Optional) URL to send the evidence of each newly audited file")
+    parser.add_argument("--outbox", type=str, default=".ih_korupsi_outbox.json", help="File of evidence submissions not yet confirmed by --report-url")
+    add_detector_arguments(parser)
+    add_cache_arguments(parser)
+    args = parser.parse_args(argv)
+    selection = detector_selection(args)
+
+    print("--- IH-Korupsi Forensic Toolkit (batch) ---")
+    base, paths = BatchAuditor.discover(args.inputs)
+    if not paths:
+        print(f"Error: no input files found for {args.inputs}")
+        sys.exit(1)
+
+    auditor = BatchAuditor(args.output_dir, jobs=args.jobs, file_type=args.type, detector_options=detector_options_from(args),
+                           chunksize=args.chunksize, table=args.table, html=args.html,
+                           cache_dir=None if args.no_cache else args.cache_dir, cache_bytes=args.cache_size_mb * 1024 * 1024,
+                           force=args.force, **selection)
+    index = auditor.run(paths, base)
+    summary = index["summary"]
+    print(f"Audited {summary['audited']}, skipped {summary['skipped']} unchanged, {summary['errors']} error(s) "
+          f"in {summary['wall_seconds']}s. Index saved to {os.path.join(args.output_dir, BatchAuditor.INDEX)}")
+
+    if args.report_url:
+        if EvidenceReporter is None:
+            print("Error: module 'modules.reporter' not found. Cannot send report.")
+            return
+        fresh = [entry for entry in index["files"].values() if entry.get("status") == "ok" and not entry.get("skipped")]
+        reporter = EvidenceReporter(args.report_url, outbox_path=args.outbox)
+        reporter.resend_pending()
+        print(f"Sending evidence of {len(fresh)} report(s) to: {args.report_url}...")
+        results = reporter.send_batch([(entry["input"], entry["report"]) for entry in fresh])
+        for entry, result in zip(fresh, results):
+            print(f"   {entry['input']}: {result.get('relay_processed_id') or result.get('status')}")
+
 def main():
-    parser = argparse.ArgumentParser(description="IH-Korupsi: Open Source Forensic Data Toolkit")
-    parser.add_argument("--input", type=str, help="Path to input data (CSV/JSON)")
-    parser.add_argument("--type", type=str, choices=['csv', 'json', 'sample'], default='sample', help="Data format")
-    parser.add_argument("--output", type=str, default="fraud_report.json", help="Path to JSON report output")
+    if len(sys.argv) > 1 and sys.argv[1] == 'batch':
+        return batch_main(sys.argv[2:])
+
+    parser = argparse.ArgumentParser(description="IH-Korupsi: Open Source Forensic Data Toolkit",
+                                     epilog="Many files at once: python main.py batch <directory or glob> (see python main.py batch --help)")
+    parser.add_argument("--input", type=str, help="Path to input data (CSV/JSON/SQLite)")
+    parser.add_argument("--type", type=str, choices=['csv', 'json', 'sql', 'sample'], default='sample', help="Data format (sql = SQLite database; aggregations run inside the database)")
+    parser.add_argument("--table", type=str, default="transactions", help="Table (or view) to analyze for --type sql")
+    parser.add_argument("--start-date", type=str, help="Only analyze transactions on or after this day, e.g. 2023-01-01 (--type sql)")
+    parser.add_argument("--end-date", type=str, help="Only analyze transactions on or before this day (--type sql)")
+    parser.add_argument("--filter", type=str, action="append", default=[], metavar="COL=V1,V2", help="Only analyze rows whose column has one of these values; repeat for several columns (--type sql)")
+    parser.add_argument("--sample-rows", type=int, default=500, help="Rows of synthetic data for --type sample")
+    parser.add_argument("--seed", type=int, help="Random seed for --type sample (reproducible synthetic data)")
+    parser.add_argument("--output", type=str, default="fraud_report.json", help="Path to the report output (.json, or .msgpack for compact MessagePack)")
     parser.add_argument("--html", type=str, help="If provided, save a visual HTML report to this path")
+    parser.add_argument("--html-top", type=int, default=ReportGenerator.TOP_N, help="Rows per findings table shown statically in the HTML report; the rest are browsed page by page")
     parser.add_argument("--report-url", type=str, help="(Optional) URL to send the audit evidence (e.g., Blockchain Validator)")
+    parser.add_argument("--outbox", type=str, default=".ih_korupsi_outbox.json", help="File of evidence submissions not yet confirmed by --report-url; they are resent on the next run")
+    parser.add_argument("--executor", type=str, choices=FraudEngine.EXECUTORS, default='serial', help="How detectors are scheduled (serial, thread pool or process pool)")
+    parser.add_argument("--chunksize", type=int, help="Stream the input in chunks of this many rows (out-of-core mode; JSON input must be JSON Lines; default 100000 for --type sql)")
+    parser.add_argument("--trace-memory", action="store_true", help="Record tracemalloc peaks per detector and load stage (slower; ignored with --executor thread)")
+    parser.add_argument("--profile", type=str, help="Run the analysis under cProfile and save the stats to this path (view with snakeviz or python -m pstats; worker processes are not profiled)")
+    add_detector_arguments(parser)
+    add_cache_arguments(parser)
+    parser.add_argument("--workers", type=int, help="Maximum number of parallel workers (defaults to one per detector, capped at CPU count)")
     
     args = parser.parse_args()
+    selection = detector_selection(args)
 
     print("--- IH-Korupsi Forensic Toolkit ---")
+
+    profiler = None
+    if args.profile:
+        profiler = cProfile.Profile()
+        profiler.enable()
     
-    if args.type == 'sample':
-        print("Generating 500 rows of synthetic transaction data...")
-        df = DataLoader.generate_sample_data(500)
-    else:
-        if not args.input:
-            print("Error: --input is required for non-sample data.")
+    if args.type != 'sample' and not args.input:
+        print("Error: --input is required for non-sample data.")
+        sys.exit(1)
+
+    detector_options = detector_options_from(args)
+
+    source = None
+    if args.type == 'sql':
+        filters = {}
+        for item in args.filter:
+            column, _, values = item.partition('=')
+            filters[column.strip()] = [v.strip() for v in values.split(',')]
+        try:
+            source = SQLiteSource(args.input, args.table, start=args.start_date, end=args.end_date, filters=filters)
+        except (ValueError, sqlite3.Error) as e:
+            print(f"Error: {e}")
             sys.exit(1)
-        df = DataLoader.load(args.input, args.type)
 
-    engine = FraudEngine()
-    report = engine.process(df)
+    # Sample data is regenerated on every run, so only real input files are cached.
+    cache = None
+    input_hash = None
+    if args.type != 'sample' and not args.no_cache:
+        cache = ResultCache(args.cache_dir, args.cache_size_mb * 1024 * 1024)
+        input_hash = source.fingerprint() if source is not None else file_sha256(args.input)
+
+    engine = FraudEngine(executor=args.executor, max_workers=args.workers, detector_options=detector_options, cache=cache,
+                         trace_memory=args.trace_memory, **selection)
+
+    # Only the columns the selected detectors read are loaded (see FraudEngine.columns).
+    df = None
+    with measure(trace_memory=args.trace_memory) as load_timer:
+        if args.type == 'sample':
+            if args.sample_rows < 1:
+                parser.error("--sample-rows must be at least 1")
+            print(f"Generating {args.sample_rows:,} rows of synthetic transaction data...")
+            df = DataLoader.generate_sample_data(args.sample_rows, seed=args.seed)
+        elif not args.chunksize and args.type != 'sql':
+            df = DataLoader.load(args.input, args.type, engine.columns())
+    if df is not None:
+        load_timer.rows = len(df)
+        engine.record_stage("load", load_timer)
+    if source is not None:
+        with source:
+            report = engine.process_sql(source, args.chunksize or 100_000, input_hash=input_hash)
+    elif args.chunksize:
+        if df is not None:
+            chunks = lambda: (df.iloc[start:start + args.chunksize] for start in range(0, len(df), args.chunksize))
+        else:
+            chunks = lambda: DataLoader.iter_chunks(args.input, args.type, args.chunksize, engine.columns())
+        report = engine.process_stream(chunks, input_hash=input_hash)
+    else:
+        report = engine.process(df, input_hash=input_hash)
+
+    if profiler is not None:
+        profiler.disable()
+        profiler.dump_stats(args.profile)
+        pstats.Stats(profiler).sort_stats('cumulative').print_stats(15)
+        print(f"Profile saved to {args.profile}")
     
     # Save JSON
-    engine.save_report(report, args.output)
+    output_hash = engine.save_report(report, args.output)
     
     # Save HTML if requested
     if args.html:
-        html_content = ReportGenerator.generate_html(report)
         with open(args.html, 'w', encoding='utf-8') as f:
-            f.write(html_content)
+            ReportGenerator.write_html(report, f, top_n=args.html_top)
         print(f"Visual HTML report saved to {args.html}")
 
     print("Analysis complete. Check the report for detailed mathematical evidence.")
@@ -56,10 +253,11 @@ def main():
             print("Warning: Cannot anchor sample data (no physical input file to hash).")
             print("   Please use a real CSV/JSON file with --input to use this feature.")
         else:
-            reporter = EvidenceReporter(args.report_url)
+            reporter = EvidenceReporter(args.report_url, outbox_path=args.outbox)
+            reporter.resend_pending()
             
             print(f"Sending evidence to: {args.report_url}...")
-            server_response = reporter.send_report(args.input, report)
+            server_response = reporter.send_report(args.input, report, output_hash)
             
             if server_response:
                 if "relay_processed_id" in server_response:
@@ -70,6 +268,15 @@ def main():
                     if "txHash" in val_resp:
                         print(f"Blockchain TX: {val_resp['txHash']}")
                         print(f"Check on explorer : https://sepolia.scrollscan.com/tx/{val_resp['txHash']}")
+
+                    merkle = server_response.get("merkle")
+                    if merkle:
+                        # Only the batch root is on chain; the proof is needed to show this report is in it.
+                        receipt_path = os.path.splitext(args.output)[0] + ".receipt.json"
+                        with open(receipt_path, 'w') as f:
+                            json.dump(server_response, f, indent=2)
+                        print(f"Merkle batch: leaf {merkle['leaf_index'] + 1} of {merkle['leaf_count']}, root {merkle['root']}")
+                        print(f"Inclusion proof saved to {receipt_path}")
                 else:
                     print(f"Server Response: {json.dumps(server_response, indent=2)}")
 
@@ -0,0 +1,20 @@
+from ih_korupsi.core.cache import ResultCache
+from ih_korupsi.core.engine import FraudEngine
+from ih_korupsi.utils import serialization
+from ih_korupsi.utils.data_loader import DataLoader
+
+def test_cache_hit_report_matches_miss_report(tmp_path):
+    df = DataLoader.generate_sample_data(2000, seed=5)
+    cache = ResultCache(str(tmp_path / "cache"))
+    miss = FraudEngine(cache=cache).process(df, input_hash="0xinput")
+    hit = FraudEngine(cache=cache).process(df, input_hash="0xinput")
+    assert miss["metadata"]["cache"]["misses"] == 4
+    assert hit["metadata"]["cache"]["hits"] == 4
+    assert serialization.dumps(hit["findings"]) == serialization.dumps(miss["findings"])
+    assert hit["findings"] == miss["findings"]
+
+def test_findings_are_json_native_without_cache():
+    df = DataLoader.generate_sample_data(500, seed=1)
+    report = FraudEngine().process(df)
+    assert report["findings"] == serialization.normalize(report["findings"])
+    assert list(report["findings"]["The Mathematician"]["benford_test"]["observed"])[0] == "1"
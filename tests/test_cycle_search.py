@@ -0,0 +1,42 @@
+import random
+import networkx as nx
+from ih_korupsi.utils.cycle_search import CycleEnumerator, strongly_connected_components
+
+def random_graph(rng, nodes, edges):
+    graph = nx.DiGraph()
+    graph.add_nodes_from(range(nodes))
+    graph.add_edges_from((rng.randrange(nodes), rng.randrange(nodes)) for _ in range(edges))
+    return graph
+
+def canonical(cycle):
+    start = cycle.index(min(cycle))
+    return tuple(cycle[start:] + cycle[:start])
+
+def adjacency(graph):
+    return [list(graph.successors(v)) for v in range(graph.number_of_nodes())]
+
+def test_components_match_networkx():
+    rng = random.Random(1)
+    for _ in range(100):
+        graph = random_graph(rng, rng.randint(1, 30), rng.randint(0, 60))
+        ours = {frozenset(c) for c in strongly_connected_components(adjacency(graph))}
+        assert ours == {frozenset(c) for c in nx.strongly_connected_components(graph)}
+
+def test_cycles_match_networkx():
+    rng = random.Random(2)
+    for _ in range(150):
+        graph = random_graph(rng, rng.randint(1, 12), rng.randint(0, 30))
+        for max_length in (None, 1, 2, 4):
+            enumerator = CycleEnumerator(adjacency(graph), max_length=max_length)
+            cycles = [canonical(c) for c in enumerator]
+            expected = {canonical(c) for c in nx.simple_cycles(graph, length_bound=max_length)}
+            assert len(cycles) == len(set(cycles)), "a cycle was produced twice"
+            assert set(cycles) == expected
+            assert enumerator.exhausted and not enumerator.timed_out
+
+def test_time_budget_gives_a_lower_bound():
+    complete = nx.complete_graph(9, create_using=nx.DiGraph)
+    enumerator = CycleEnumerator(adjacency(complete), time_budget=0.0)
+    count = sum(1 for _ in enumerator)
+    assert enumerator.timed_out and not enumerator.exhausted
+    assert count < sum(1 for _ in nx.simple_cycles(complete))
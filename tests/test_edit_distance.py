@@ -0,0 +1,39 @@
+import random
+from ih_korupsi.utils.edit_distance import bounded_distance, pattern_masks, similarity_ratios
+
+def levenshtein(a, b):
+    row = list(range(len(b) + 1))
+    for i, ca in enumerate(a, 1):
+        prev, row[0] = row[0], i
+        for j, cb in enumerate(b, 1):
+            prev, row[j] = row[j], min(row[j] + 1, row[j - 1] + 1, prev + (ca != cb))
+    return row[-1]
+
+def random_string(rng, longest):
+    return "".join(rng.choice("abc") for _ in range(rng.randint(0, longest)))
+
+def test_bounded_distance_matches_dynamic_programming():
+    rng = random.Random(3)
+    # Patterns past 64 characters check that the bit-vectors are not limited to one machine word.
+    for longest in (8, 80):
+        for _ in range(400):
+            a, b = random_string(rng, longest), random_string(rng, longest)
+            exact = levenshtein(a, b)
+            for limit in (0, exact - 1, exact, exact + 2, len(a) + len(b)):
+                if limit < 0:
+                    continue
+                expected = exact if exact <= limit else None
+                assert bounded_distance(pattern_masks(a), len(a), b, limit) == expected, (a, b, limit)
+
+def test_similarity_ratios_match_the_reference_ratio():
+    rng = random.Random(5)
+    for _ in range(200):
+        pattern = random_string(rng, 12)
+        candidates = [random_string(rng, 12) for _ in range(10)]
+        for threshold in (0.5, 0.85):
+            expected = []
+            for text in candidates:
+                total = len(pattern) + len(text)
+                ratio = (total - levenshtein(pattern, text)) / total if total else 1.0
+                expected.append(ratio if ratio >= threshold else None)
+            assert similarity_ratios(pattern, candidates, threshold) == expected
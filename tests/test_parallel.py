@@ -0,0 +1,70 @@
+import gc
+import os
+from collections import Counter
+import pandas as pd
+import pytest
+from ih_korupsi.core.engine import FraudEngine
+from ih_korupsi.core.parallel import SharedFrame, attach_frame
+from ih_korupsi.utils.synthetic import generate_ledger
+
+def frame():
+    return pd.DataFrame({
+        "amount": [10.5, 200.0, 3.25, 4000.0],
+        "date": pd.to_datetime(["2024-01-01", "2024-02-01", "2024-03-01", "2024-04-01"]),
+        "vendor_id": pd.Categorical(["V1", "V2", "V1", None]),
+        "vendor_name": ["PT A", "PT B", None, "PT A"],
+    }, index=[3, 1, 4, 1])
+
+def open_blocks(shared):
+    """Descriptors this process holds on each of the frame's shared blocks."""
+    names = {entry["shm"] for entry in shared.spec}
+    links = Counter()
+    for fd in os.listdir('/proc/self/fd'):
+        try:
+            link = os.path.basename(os.readlink(f'/proc/self/fd/{fd}'))
+        except OSError:
+            continue
+        if link in names:
+            links[link] += 1
+    return links
+
+def test_attached_columns_are_read_only_views_of_shared_memory():
+    df = frame()
+    shared = SharedFrame(df)
+    try:
+        attached = attach_frame(shared.spec, shared.index)
+        pd.testing.assert_frame_equal(attached, df)
+        for col in attached.columns:
+            series = attached[col]
+            values = series.array.codes if isinstance(series.dtype, pd.CategoricalDtype) else series.to_numpy()
+            if col != "vendor_name":
+                assert not values.flags.writeable
+                assert not values.flags.owndata
+                with pytest.raises(ValueError):
+                    values[0] = values[1]
+    finally:
+        shared.release()
+
+@pytest.mark.skipif(not os.path.isdir('/proc/self/fd'), reason="needs /proc to list open descriptors")
+def test_blocks_stay_open_while_a_column_is_in_use():
+    shared = SharedFrame(frame())
+    try:
+        # The parent's own handles live in this process too.
+        before = open_blocks(shared)
+        attached = attach_frame(shared.spec, shared.index)
+        kept = attached["amount"].to_numpy()
+        del attached
+        gc.collect()
+        # Only the block under the kept column is still open.
+        assert set(open_blocks(shared) - before) == {shared.spec[0]["shm"]}
+        assert list(kept) == [10.5, 200.0, 3.25, 4000.0]
+        del kept
+        gc.collect()
+        assert open_blocks(shared) == before
+    finally:
+        shared.release()
+
+def test_process_executor_matches_serial():
+    df, _ = generate_ledger(3000, seed=3)
+    serial = FraudEngine().process(df)["findings"]
+    assert FraudEngine(executor='process', max_workers=2).process(df)["findings"] == serial
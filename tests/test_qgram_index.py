@@ -0,0 +1,47 @@
+import random
+import pytest
+from ih_korupsi.detectors.string_detective import StringDetective
+from ih_korupsi.utils.qgram_index import QGramIndex, choose_q
+
+def mutate(rng, name):
+    # One to three random edits, so many pairs sit right around the threshold.
+    chars = list(name)
+    for _ in range(rng.randint(1, 3)):
+        op, pos = rng.choice("isd"), rng.randrange(len(chars) + 1)
+        if op == "i" or not chars:
+            chars.insert(pos, rng.choice("abcd "))
+        elif op == "s":
+            chars[min(pos, len(chars) - 1)] = rng.choice("abcd ")
+        elif len(chars) > 1:
+            del chars[min(pos, len(chars) - 1)]
+    return "".join(chars)
+
+def random_names(rng, count):
+    names = []
+    while len(names) < count:
+        if names and rng.random() < 0.6:
+            names.append(mutate(rng, rng.choice(names)))
+        else:
+            names.append("".join(rng.choice("abcd ") for _ in range(rng.randint(1, 14))))
+    return list(dict.fromkeys(names))
+
+@pytest.mark.parametrize("threshold", [0.76, 0.8, 0.85, 0.9, 0.95])
+def test_candidates_include_every_pair_brute_force_accepts(threshold):
+    ratio = StringDetective().levenshtein_ratio
+    rng = random.Random(int(threshold * 100))
+    q = choose_q(threshold)
+    for _ in range(12):
+        names = random_names(rng, 40)
+        index = QGramIndex(names, threshold, q)
+        assert index.is_exhaustive()
+        accepted = {(i, j) for i in range(len(names)) for j in range(i + 1, len(names)) if ratio(names[i], names[j]) >= threshold}
+        candidates = index.candidate_pairs()
+        assert accepted <= set(candidates)
+        assert candidates == sorted(set(candidates))
+
+def test_index_matches_brute_force_findings():
+    detector = StringDetective()
+    rng = random.Random(7)
+    for _ in range(10):
+        names = [name.upper() for name in random_names(rng, 60)]
+        assert detector.match_names(names, 'index') == detector.match_names(names, 'brute')
@@ -0,0 +1,22 @@
+import pandas as pd
+import pytest
+from ih_korupsi.core.engine import FraudEngine
+from ih_korupsi.core.registry import registry
+
+def test_selection_comes_back_in_registration_order():
+    forward = [detector.name for detector in registry.create(['mathematician', 'chronologist'])]
+    backward = [detector.name for detector in registry.create(['The Chronologist', 'benford', 'chronologist'])]
+    assert forward == backward == ['The Mathematician', 'The Chronologist']
+
+def test_skip_and_unknown_names():
+    assert [detector.name for detector in registry.create(skip=['connector', 'strings'])] == ['The Mathematician', 'The Chronologist']
+    with pytest.raises(KeyError):
+        registry.create(['no_such_detector'])
+
+def test_report_keys_follow_registration_order():
+    df = pd.DataFrame({
+        "vendor_id": ["V1", "V2", "V1"], "amount": [120.0, 3400.0, 56.0],
+        "date": ["2024-01-01 10:00:00", "2024-01-02 11:00:00", "2024-01-03 12:00:00"],
+    })
+    report = FraudEngine(detectors=['chronologist', 'mathematician']).process(df)
+    assert list(report["findings"]) == ['The Mathematician', 'The Chronologist']
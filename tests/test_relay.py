@@ -0,0 +1,29 @@
+import asyncio
+import os
+import sys
+import pytest
+
+pytest.importorskip("fastapi")
+pytest.importorskip("slowapi")
+pytest.importorskip("web3")
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "blockchain-infra", "relay"))
+relay = pytest.importorskip("relay")
+from fastapi.testclient import TestClient
+
+def test_anchor_batch_puts_all_items_in_one_merkle_batch():
+    anchored = []
+    async def anchor(root, count):
+        anchored.append(count)
+        return "0xbatch", {"status": "SUCCESS"}
+
+    with TestClient(relay.app) as client:
+        relay.app.state.batcher = relay.MerkleBatcher(anchor, max_size=64, max_wait=0.05)
+        items = [{"input_hash": "0x" + f"{i:064x}", "output_hash": "0x" + f"{i + 1:064x}", "idempotency_key": str(i)} for i in range(3)]
+        items.append({"input_hash": "not-hex", "output_hash": "0x" + "00" * 32})
+        response = client.post("/relay/anchor-batch", json={"items": items})
+
+    assert response.status_code == 200
+    results = response.json()["results"]
+    assert [r["status"] for r in results] == ["SUCCESS"] * 3 + ["REJECTED"]
+    assert anchored == [3]
+    assert [r["merkle"]["leaf_index"] for r in results[:3]] == [0, 1, 2]
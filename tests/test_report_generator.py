@@ -0,0 +1,38 @@
+import json
+import pandas as pd
+from ih_korupsi.core.engine import FraudEngine
+from ih_korupsi.utils.report_generator import ReportGenerator
+
+def test_chronologist_tables_use_the_configured_entity_column():
+    # Twelve months for unit U1, with a year-end spike and a burst of transactions in December.
+    dates = [f"2024-{month:02d}-10 09:00:00" for month in range(1, 12)] + [f"2024-12-10 09:{minute:02d}:00" for minute in range(6)]
+    df = pd.DataFrame({"unit_id": "U1", "vendor_id": "V1", "amount": [100.0] * 11 + [1000.0] * 6, "date": dates})
+    engine = FraudEngine(detectors=['chronologist'], detector_options={"The Chronologist": {"entity_col": "unit_id"}})
+    report = engine.process(df)
+    chrono = report["findings"]["The Chronologist"]
+    assert chrono["fiscal_cliff"]["top_offenders"] and chrono["velocity_anomalies"]["high_velocity_events"]
+
+    html = ReportGenerator.generate_html(report)
+    assert html.count("<tr><td>U1</td>") == 1 + len(chrono["velocity_anomalies"]["high_velocity_events"])
+
+def embedded(html, key):
+    start = html.index(f'<script type="application/json" id="data-{key}">') + len(f'<script type="application/json" id="data-{key}">')
+    return json.loads(html[start:html.index('</script>', start)])
+
+def test_tables_longer_than_top_n_embed_every_row_for_browsing(monkeypatch):
+    monkeypatch.setattr(ReportGenerator, "JSON_SLICE", 7)
+    pairs = [{"name_1": f"PT Alpha {i}", "name_2": f"PT Alpa {i} </script>", "similarity_score": 0.9} for i in range(30)]
+    html = ReportGenerator.generate_html({"metadata": {}, "findings": {"String Detective": {"potential_ghost_vendors": pairs}}}, top_n=20)
+
+    assert html.count("<tr><td>PT Alpha") == 20
+    assert "Top 20 of 30 rows." in html and 'class="browse"' in html
+    spec = embedded(html, "ghost-vendors")
+    assert spec["columns"][2] == ["Similarity Score", "percent"]
+    assert spec["rows"] == [[p["name_1"], p["name_2"], 0.9] for p in pairs]
+
+def test_embedded_rows_are_capped(monkeypatch):
+    monkeypatch.setattr(ReportGenerator, "MAX_EMBEDDED_ROWS", 12)
+    pairs = [{"name_1": f"PT Alpha {i}", "name_2": f"PT Alpa {i}", "similarity_score": 0.9} for i in range(30)]
+    html = ReportGenerator.generate_html({"metadata": {}, "findings": {"String Detective": {"potential_ghost_vendors": pairs}}}, top_n=5)
+    assert len(embedded(html, "ghost-vendors")["rows"]) == 12
+    assert "Browsing covers the first 12" in html
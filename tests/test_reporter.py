@@ -0,0 +1,65 @@
+import json
+import pytest
+import requests
+from ih_korupsi.utils import reporter as reporter_module
+from ih_korupsi.utils.reporter import EvidenceReporter
+
+def response(status, body, headers=None):
+    r = requests.Response()
+    r.status_code = status
+    r._content = body if isinstance(body, bytes) else json.dumps(body).encode('utf-8')
+    r.headers.update(headers or {})
+    return r
+
+@pytest.fixture
+def sleeps(monkeypatch):
+    waited = []
+    monkeypatch.setattr(reporter_module.time, "sleep", waited.append)
+    return waited
+
+def scripted(reporter, responses):
+    calls = []
+    def post(url, json=None, headers=None, timeout=None):
+        calls.append((url, json))
+        return responses.pop(0)
+    reporter.session.post = post
+    return calls
+
+def entries(reporter, n):
+    return [reporter._submission(f"in{i}.csv", f"{i:064x}", f"{i + 100:064x}", {}) for i in range(n)]
+
+def test_retry_after_is_honoured(sleeps):
+    reporter = EvidenceReporter("http://relay/relay/anchor", backoff=0.01)
+    scripted(reporter, [response(429, {"error": "rate limited"}, {"Retry-After": "12"}), response(200, {"status": "SUCCESS"})])
+    assert reporter._submit_all(entries(reporter, 1)) == [{"status": "SUCCESS"}]
+    assert sleeps == [12.0]
+
+def test_non_json_success_stays_in_outbox(tmp_path, sleeps):
+    reporter = EvidenceReporter("http://relay/relay/anchor", outbox_path=str(tmp_path / "outbox.json"))
+    scripted(reporter, [response(200, b"<html>gateway</html>")])
+    [result] = reporter._submit_all(entries(reporter, 1))
+    assert result["status"] == "failed" and "Invalid JSON" in result["error"]
+    assert len(reporter.outbox.pending()) == 1
+
+def test_batch_goes_through_the_multi_item_endpoint(tmp_path, sleeps):
+    reporter = EvidenceReporter("http://relay/relay/anchor", max_concurrency=1, outbox_path=str(tmp_path / "outbox.json"), batch_size=3)
+    assert reporter.batch_url == "http://relay/relay/anchor-batch"
+    ok = {"status": "SUCCESS", "relay_processed_id": "0x1"}
+    calls = scripted(reporter, [
+        response(200, {"results": [ok, {"status": "FAILED", "validator_error": "down"}, {"status": "REJECTED", "error": "bad hash"}]}),
+        response(200, {"results": [ok, ok]}),
+    ])
+    results = reporter._submit_all(entries(reporter, 5))
+
+    assert [url for url, _ in calls] == ["http://relay/relay/anchor-batch"] * 2
+    assert [len(body["items"]) for _, body in calls] == [3, 2]
+    assert all(item["idempotency_key"] for _, body in calls for item in body["items"])
+    assert [r["status"] for r in results] == ["SUCCESS", "FAILED", "failed", "SUCCESS", "SUCCESS"]
+    # Only the item the validator failed on is left to resend.
+    assert [entry["input_file"] for entry in reporter.outbox.pending()] == ["in1.csv"]
+
+def test_batch_falls_back_to_single_posts_without_the_endpoint(sleeps):
+    reporter = EvidenceReporter("http://relay/relay/anchor")
+    calls = scripted(reporter, [response(404, {"detail": "Not Found"}), response(200, {"status": "SUCCESS"}), response(200, {"status": "SUCCESS"})])
+    assert [r["status"] for r in reporter._submit_all(entries(reporter, 2))] == ["SUCCESS", "SUCCESS"]
+    assert [url for url, _ in calls] == ["http://relay/relay/anchor-batch", "http://relay/relay/anchor", "http://relay/relay/anchor"]
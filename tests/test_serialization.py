@@ -0,0 +1,51 @@
+import io
+import json
+import numpy as np
+import pytest
+from ih_korupsi.utils import serialization
+
+def sample_report():
+    return {
+        "metadata": {"total_rows": np.int64(3), "total_amount": 1e20},
+        "findings": {
+            "The Mathematician": {
+                "benford_test": {"observed": {1: 0.5, 2: np.float32(0.1), 10: 0.0}, "mad": float('nan')},
+                "limits": (np.float64(float('inf')), -float('inf')),
+                "flags": np.array([True, False]),
+            },
+            "The Connector": {"sample": [("A", "B")], "ids": {np.int64(7): "x"}},
+        },
+    }
+
+def test_normalized_encoding():
+    encoded = serialization.dumps(sample_report())
+    assert encoded == (
+        b'{"findings":{"The Connector":{"ids":{"7":"x"},"sample":[["A","B"]]},'
+        b'"The Mathematician":{"benford_test":{"mad":"NaN","observed":{"1":0.5,"10":0.0,"2":0.10000000149011612}},'
+        b'"flags":[true,false],"limits":["Infinity","-Infinity"]}},'
+        b'"metadata":{"total_amount":1e+20,"total_rows":3}}'
+    )
+
+def test_streamed_equals_one_shot():
+    report = sample_report()
+    assert b''.join(serialization.iter_encode(report)) == serialization.dumps(report)
+    buffer = io.BytesIO()
+    digest = serialization.write_report(report, buffer)
+    assert buffer.getvalue() == serialization.dumps(report)
+    assert digest == serialization.report_sha256(report)
+
+def test_report_read_back_encodes_to_the_same_bytes(tmp_path):
+    report = sample_report()
+    path = str(tmp_path / "report.json")
+    digest = serialization.save_report(report, path)
+    loaded = serialization.load_report(path)
+    assert loaded == serialization.normalize(report)
+    assert serialization.report_sha256(loaded) == digest
+    assert serialization.normalize(json.loads(json.dumps(serialization.normalize(report)))) == serialization.normalize(report)
+
+def test_msgpack_read_back_encodes_to_the_same_bytes(tmp_path):
+    pytest.importorskip("msgpack")
+    report = sample_report()
+    path = str(tmp_path / "report.msgpack")
+    digest = serialization.save_report(report, path)
+    assert serialization.report_sha256(serialization.load_report(path), 'msgpack') == digest
@@ -0,0 +1,53 @@
+import numpy as np
+import pytest
+from ih_korupsi.utils.sketches import KLLSketch, MomentSketch
+
+QUANTILES = [0.01, 0.1, 0.25, 0.5, 0.75, 0.9, 0.99]
+
+def chunks(values, rng):
+    cuts = np.sort(rng.integers(0, len(values), size=40))
+    return np.split(values, cuts)
+
+def rank_of(sorted_values, value):
+    # Normalized rank interval of value, so ties count as a hit anywhere inside it.
+    return np.searchsorted(sorted_values, value, side='left') / len(sorted_values), np.searchsorted(sorted_values, value, side='right') / len(sorted_values)
+
+def test_moments_match_numpy_after_merging_chunks():
+    rng = np.random.default_rng(0)
+    values = rng.lognormal(15, 2, size=100_000)
+    merged = MomentSketch()
+    for part in chunks(values, rng):
+        sketch = MomentSketch()
+        sketch.update(np.concatenate([part, [np.nan]]))
+        merged.merge(sketch)
+    assert merged.count == len(values)
+    assert merged.mean == pytest.approx(values.mean(), rel=1e-12)
+    assert merged.std == pytest.approx(values.std(), rel=1e-9)
+
+@pytest.mark.parametrize("epsilon", [0.01, 0.05])
+@pytest.mark.parametrize("distribution", ["lognormal", "integers"])
+def test_kll_quantiles_stay_within_the_rank_error(epsilon, distribution):
+    rng = np.random.default_rng(1)
+    values = rng.lognormal(15, 2, size=200_000) if distribution == "lognormal" else rng.integers(0, 50, size=200_000).astype(float)
+    ordered = np.sort(values)
+
+    streamed = KLLSketch.from_accuracy(epsilon, seed=0)
+    merged = KLLSketch.from_accuracy(epsilon, seed=0)
+    for part in chunks(values, rng):
+        streamed.update(part)
+        partial = KLLSketch.from_accuracy(epsilon, seed=1)
+        partial.update(part)
+        merged.merge(partial)
+
+    assert streamed.rank_error <= epsilon
+    for sketch in (streamed, merged):
+        assert sketch.count == len(values)
+        # Memory is O(k): the geometric capacities sum to less than 3k plus two per level.
+        assert sum(len(level) for level in sketch.levels) <= 3 * sketch.k + 2 * len(sketch.levels)
+        for q in QUANTILES:
+            low, high = rank_of(ordered, sketch.quantile(q))
+            assert low - sketch.rank_error <= q <= high + sketch.rank_error, q
+
+def test_kll_merge_requires_the_same_k():
+    with pytest.raises(ValueError):
+        KLLSketch(k=100).merge(KLLSketch(k=200))
@@ -0,0 +1,54 @@
+import random
+import networkx as nx
+import numpy as np
+import pandas as pd
+from ih_korupsi.utils.sparse_graph import SparseGraph
+
+def random_edges(rng, nodes, edges):
+    return pd.DataFrame({"source": [f"N{rng.randrange(nodes)}" for _ in range(edges)],
+                         "target": [f"N{rng.randrange(nodes)}" for _ in range(edges)]})
+
+def both(edges):
+    graph = SparseGraph(edges["source"], edges["target"])
+    reference = nx.from_pandas_edgelist(edges, "source", "target", create_using=nx.DiGraph)
+    return graph, reference
+
+def as_dict(graph, values):
+    return dict(zip(graph.labels, values))
+
+def test_node_order_and_components_match_networkx():
+    rng = random.Random(1)
+    for _ in range(50):
+        graph, reference = both(random_edges(rng, rng.randint(2, 30), rng.randint(1, 60)))
+        assert list(graph.labels) == list(reference.nodes)
+        for count_labels, expected in ((graph.weak_components(), nx.weakly_connected_components(reference)),
+                                       (graph.strong_components(), nx.strongly_connected_components(reference))):
+            groups = pd.Series(list(graph.labels)).groupby(count_labels[1]).apply(frozenset)
+            assert set(groups) == {frozenset(c) for c in expected}
+
+def test_pagerank_matches_networkx():
+    rng = random.Random(2)
+    for _ in range(30):
+        graph, reference = both(random_edges(rng, rng.randint(2, 60), rng.randint(1, 150)))
+        ours, expected = as_dict(graph, graph.pagerank()), nx.pagerank(reference)
+        assert max(abs(ours[node] - expected[node]) for node in expected) < 1e-5
+
+def test_exact_betweenness_matches_networkx():
+    rng = random.Random(3)
+    for _ in range(30):
+        graph, reference = both(random_edges(rng, rng.randint(3, 40), rng.randint(2, 100)))
+        scores, pivots, exact = graph.betweenness()
+        assert exact and pivots == graph.n
+        expected = nx.betweenness_centrality(reference)
+        ours = as_dict(graph, scores)
+        assert max(abs(ours[node] - expected[node]) for node in expected) < 1e-9
+
+def test_sampled_betweenness_stays_within_epsilon():
+    rng = random.Random(4)
+    graph, reference = both(random_edges(rng, 600, 2000))
+    epsilon = 0.1
+    scores, pivots, exact = graph.betweenness(epsilon=epsilon, delta=0.1, seed=0)
+    assert not exact and pivots < graph.n
+    expected = nx.betweenness_centrality(reference)
+    ours = as_dict(graph, scores)
+    assert max(abs(ours[node] - expected[node]) for node in expected) <= epsilon
@@ -0,0 +1,63 @@
+import json
+import sqlite3
+import pandas as pd
+from ih_korupsi.core.engine import FraudEngine
+from ih_korupsi.detectors.mathematician import Mathematician
+from ih_korupsi.utils import serialization
+from ih_korupsi.utils.sql_source import SQLiteSource
+
+def same(a, b):
+    # Empty sketch quantiles are NaN, which never compares equal to itself.
+    return json.dumps(a, sort_keys=True, default=str) == json.dumps(b, sort_keys=True, default=str)
+
+EMPTY = pd.DataFrame({"vendor_id": pd.Series([], dtype=object), "amount": pd.Series([], dtype=float)})
+
+def test_mathematician_finalize_without_chunks_matches_empty_run():
+    detector = Mathematician()
+    assert detector.accumulator().finalize() == detector.run(EMPTY)
+    assert same(detector.accumulator(outlier_method='sketch').finalize(), detector.run(EMPTY, outlier_method='sketch'))
+
+LEDGER = EMPTY.assign(
+    vendor_name=pd.Series([], dtype=object), sender_id=pd.Series([], dtype=object),
+    receiver_id=pd.Series([], dtype=object), date=pd.Series([], dtype='datetime64[ns]')
+)
+
+def empty_findings():
+    return {detector.name: serialization.normalize(detector.run(LEDGER)) for detector in FraudEngine().detectors}
+
+def test_stream_without_chunks():
+    report = FraudEngine().process_stream([])
+    assert report["findings"] == empty_findings()
+    assert len(report["findings"]) == 4
+
+def test_sql_filter_without_rows(tmp_path):
+    path = str(tmp_path / "ledger.db")
+    with sqlite3.connect(path) as conn:
+        pd.DataFrame({
+            "vendor_id": ["V1", "V2"], "vendor_name": ["PT Satu", "PT Dua"], "sender_id": ["A", "B"], "receiver_id": ["B", "A"],
+            "amount": [100.0, 250.0], "date": ["2024-01-01", "2024-01-02"]
+        }).to_sql("transactions", conn, index=False)
+    with SQLiteSource(path, filters={"vendor_id": ["NONE"]}) as source:
+        report = FraudEngine().process_sql(source)
+    assert report["findings"] == empty_findings()
+
+def test_bounded_switches_keep_no_rows():
+    df = pd.DataFrame({
+        "vendor_id": ["V1", "V2", "V1"], "vendor_name": ["PT Satu", "PT Dua", "PT Satu"], "sender_id": ["A", "B", "C"],
+        "receiver_id": ["B", "C", "A"], "amount": [100.0, 250.0, 80.0], "date": pd.to_datetime(["2024-01-01", "2024-01-02", "2024-01-03"])
+    })
+    options = {
+        "The Mathematician": {"outlier_method": "sketch", "entity_outliers": False},
+        "The Connector": {"temporal_cycles": False},
+        "The Chronologist": {"velocity": False},
+    }
+    engine = FraudEngine(detector_options=options)
+    for detector in engine.detectors:
+        accumulator = detector.accumulator(**options.get(detector.name, {}))
+        accumulator.update(df)
+        assert not getattr(accumulator, "columns", []) and not getattr(accumulator, "transfers", []) and not getattr(accumulator, "events", [])
+
+    streamed = engine.process_stream([df.iloc[:2], df.iloc[2:]])["findings"]
+    assert streamed["The Chronologist"]["velocity_anomalies"] == {"error": "Velocity check disabled."}
+    assert streamed["The Connector"]["temporal_circular_trading"] == {"error": "Temporal cycle detection disabled."}
+    assert streamed["The Chronologist"]["fiscal_cliff"] == engine.process(df)["findings"]["The Chronologist"]["fiscal_cliff"]
@@ -0,0 +1,15 @@
+import pytest
+from ih_korupsi.core.engine import FraudEngine
+from ih_korupsi.utils.data_loader import DataLoader
+from ih_korupsi.utils.synthetic import generate_ledger
+
+@pytest.mark.parametrize("rows", [1, 2, 10, 37, 38, 99, 100])
+def test_small_samples(rows):
+    df = DataLoader.generate_sample_data(rows, seed=rows)
+    assert len(df) == rows
+    report = FraudEngine().process(df)
+    assert not any("error" in findings for findings in report["findings"].values())
+
+def test_explicit_anomalies_must_fit():
+    with pytest.raises(ValueError):
+        generate_ledger(10, seed=0)
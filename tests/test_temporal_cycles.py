@@ -0,0 +1,83 @@
+import itertools
+import random
+import networkx as nx
+import numpy as np
+import pandas as pd
+from ih_korupsi.detectors.connector import Connector
+from ih_korupsi.utils.temporal_cycles import TemporalCycleEnumerator
+
+def temporal(rows):
+    df = pd.DataFrame(rows, columns=["sender_id", "receiver_id", "date", "amount"])
+    df["date"] = pd.to_datetime(df["date"])
+    return Connector().detect_temporal_cycles(df, "sender_id", "receiver_id", "amount", "date")
+
+def test_missing_party_is_skipped():
+    result = temporal([
+        ("A", "B", "2024-01-01 09:00", 100.0),
+        ("B", None, "2024-01-01 10:00", 100.0),
+        (np.nan, "A", "2024-01-01 11:00", 100.0),
+        ("B", "A", "2024-01-01 12:00", 100.0),
+    ])
+    assert result["cycles_count"] == 1
+    assert [(leg["from"], leg["to"]) for leg in result["sample_cycles"][0]] == [("A", "B"), ("B", "A")]
+
+def test_same_day_loop_found_once_on_date_only_data():
+    result = temporal([
+        ("A", "B", "2024-03-05", 100.0),
+        ("B", "C", "2024-03-05", 100.0),
+        ("C", "A", "2024-03-05", 100.0),
+    ])
+    assert result["date_only"] is True
+    assert result["cycles_count"] == 1
+
+def test_same_instant_is_not_chronological_with_times_of_day():
+    result = temporal([
+        ("A", "B", "2024-03-05 10:00", 100.0),
+        ("B", "A", "2024-03-05 10:00", 100.0),
+        ("A", "C", "2024-03-05 10:30", 100.0),
+        ("C", "A", "2024-03-05 11:00", 100.0),
+    ])
+    assert result["date_only"] is False
+    assert result["cycles_count"] == 1
+
+def reference(sources, targets, times, amounts, window, tolerance, max_length, strict):
+    """Every static simple cycle (networkx), every rotation and every choice of parallel transfers, filtered by the rules."""
+    graph = nx.DiGraph(zip(sources, targets))
+    legs = {}
+    for i, pair in enumerate(zip(sources, targets)):
+        legs.setdefault(pair, []).append(i)
+    found = set()
+    for cycle in nx.simple_cycles(graph, length_bound=max_length):
+        for r in range(len(cycle)):
+            nodes = cycle[r:] + cycle[:r]
+            hops = [legs[(nodes[k], nodes[(k + 1) % len(nodes)])] for k in range(len(nodes))]
+            for path in itertools.product(*hops):
+                ordered = all(times[b] > times[a] if strict else times[b] >= times[a] for a, b in zip(path, path[1:]))
+                inside = times[path[-1]] <= times[path[0]] + window
+                conserved = tolerance is None or all(abs(amounts[b] - amounts[a]) <= tolerance * abs(amounts[a]) for a, b in zip(path, path[1:]))
+                if ordered and inside and conserved:
+                    # A loop is one set of transfers, whichever leg it is read from.
+                    found.add(frozenset(path))
+    return found
+
+def test_temporal_cycles_match_a_networkx_reference():
+    rng = random.Random(11)
+    total = 0
+    for trial in range(200):
+        nodes, edges = rng.randint(1, 6), rng.randint(1, 14)
+        sources = np.array([rng.randrange(nodes) for _ in range(edges)])
+        targets = np.array([rng.randrange(nodes) for _ in range(edges)])
+        times = np.array([rng.randrange(6) for _ in range(edges)])
+        amounts = np.array([rng.choice([100.0, 104.0, 130.0]) for _ in range(edges)])
+        window = rng.choice([2, 10])
+        tolerance = rng.choice([None, 0.05])
+        max_length = rng.choice([None, 2, 3])
+        for strict in (True, False):
+            enumerator = TemporalCycleEnumerator(sources, targets, times, amounts, window, tolerance, max_length, strict=strict)
+            cycles = [frozenset(c) for c in enumerator]
+            assert len(cycles) == len(set(cycles)), "a loop was reported twice"
+            expected = reference(sources.tolist(), targets.tolist(), times.tolist(), amounts.tolist(),
+                                            window, tolerance, max_length, strict)
+            total += len(expected)
+            assert set(cycles) == expected, trial
+    assert total > 200
@@ -0,0 +1,41 @@
+import sqlite3
+import pandas as pd
+from ih_korupsi.core.engine import FraudEngine
+from ih_korupsi.detectors.chronologist import Chronologist
+from ih_korupsi.utils.sql_source import SQLiteSource
+
+def ledger(dates):
+    return pd.DataFrame({"vendor_id": "V1", "amount": 100.0, "date": dates})
+
+def test_sub_day_windows_skipped_on_date_only_data():
+    # Four transactions a day is ordinary spending, not four within one hour.
+    df = ledger(["2024-03-05"] * 4 + ["2024-03-06"] * 4)
+    velocity = Chronologist().run(df)["velocity_anomalies"]
+    assert velocity["date_only"] is True
+    assert velocity["skipped_windows"] == ["1h"]
+    assert set(velocity["windows"]) == {"24h", "7d"}
+    assert all(event["window"] != "1h" for event in velocity["high_velocity_events"])
+
+def test_sub_day_windows_kept_with_times_of_day():
+    df = ledger([f"2024-03-05 10:{minute:02d}" for minute in range(4)])
+    velocity = Chronologist().run(df)["velocity_anomalies"]
+    assert velocity["date_only"] is False
+    assert velocity["skipped_windows"] == []
+    assert velocity["windows"]["1h"]["entities_flagged"] == 1
+
+def test_sql_decides_date_only_over_all_rows(tmp_path):
+    # Only V1 is busy enough to be streamed, but V2's time of day means the data is not date-only.
+    df = pd.concat([ledger(["2024-03-05 00:00:00"] * 6), ledger(["2024-03-05 14:30:00"]).assign(vendor_id="V2")], ignore_index=True)
+    path = str(tmp_path / "ledger.db")
+    with sqlite3.connect(path) as conn:
+        df.to_sql("transactions", conn, index=False)
+    with SQLiteSource(path) as source:
+        report = FraudEngine(detectors=['chronologist']).process_sql(source)
+    velocity = report["findings"]["The Chronologist"]["velocity_anomalies"]
+    assert velocity["date_only"] is False
+    assert velocity == FraudEngine(detectors=['chronologist']).process(df)["findings"]["The Chronologist"]["velocity_anomalies"]
+
+def test_only_sub_day_windows_on_date_only_data():
+    velocity = Chronologist().run(ledger(["2024-03-05"] * 8), velocity_thresholds={"1h": 3})["velocity_anomalies"]
+    assert velocity["skipped_windows"] == ["1h"]
+    assert velocity["windows"] == {} and velocity["high_velocity_events"] == []